@@ -0,0 +1,416 @@
+"""Drive the bot's real handlers with synthetic Discord events.
+
+    python bench/bench_bot.py [--guilds 20] [--users 5000] [--events 20000] [--concurrency 50]
+                              [--scenarios messages,commands,reactions,reminders,ask]
+                              [--database-url postgresql://...] [--explain] [--json]
+
+No token or network is needed: messages, channels and users are small
+fakes, Context.send is pointed at the fake channel, and /ask talks to a
+local stub of the Hugging Face streaming endpoint. The bot's own
+background tasks (XP flusher, scheduler, poll flusher) run as they would
+in production against a throwaway SQLite file, or against --database-url
+(whose tables it writes to; SQL statement counts are SQLite-only).
+
+Per scenario it reports events/sec, p50/p99 handler latency, DB calls,
+SQL statements and channel sends per event, and event-loop lag while the
+scenario ran. Reminders are dispatched the way the scheduler does it, in
+batches (of 100 here), so their latency figures are per batch and include
+the outbox merge window.
+
+With --explain (SQLite only) it also records every distinct statement the
+handlers issued, adds the startup, maintenance and per-guild queries, and
+runs EXPLAIN QUERY PLAN on each; it exits with status 1 if any statement
+that filters rows walks a whole table, or a whole index that doesn't
+cover it (see migrations.full_scans).
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import itertools
+import tempfile
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# bongosorous.config reads the environment on import, so only modules that
+# don't depend on it are imported here; the rest waits until bench() sets it
+from bongosorous.storage import DB_QUERY_SECONDS  # noqa: E402
+
+WORDS = "the quick brown fox jumps over lazy dog discord bot level coins poll trivia hello world".split()
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def start_hf_stub(port: int, token_delay: float):
+    """Minimal OpenAI-style SSE endpoint that streams a canned answer."""
+    async def completions(request: web.Request):
+        body = await request.json()
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        for word in f"Stub answer to: {body['messages'][-1]['content']}".split():
+            chunk = {"choices": [{"delta": {"content": word + " "}}]}
+            await resp.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if token_delay:
+                await asyncio.sleep(token_delay)
+        await resp.write(b"data: [DONE]\n\n")
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+ids = itertools.count(10 ** 17)
+
+class FakeUser:
+    def __init__(self, uid: int, bot: bool = False):
+        self.id = uid
+        self.bot = bot
+        self.name = f"user{uid}"
+        self.display_name = self.name
+        self.mention = f"<@{uid}>"
+        self.roles = []
+
+class FakeGuild:
+    def __init__(self, gid: int):
+        self.id = gid
+        self.name = f"guild{gid}"
+        self.shard_id = 0
+        self.me = None
+
+    def get_member(self, uid):
+        return None
+
+class FakeMessage:
+    _state = None
+
+    def __init__(self, content: str, author: FakeUser, channel: "FakeChannel"):
+        self.id = next(ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.mentions = []
+        self.reactions = []
+        self.attachments = []
+
+    async def edit(self, **kwargs):
+        self.channel.sent += 1
+        await asyncio.sleep(0)
+
+    async def add_reaction(self, emoji):
+        pass
+
+class FakeChannel:
+    total_sent = 0
+
+    def __init__(self, cid: int, guild: FakeGuild):
+        self.id = cid
+        self.guild = guild
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        # yield like a real HTTP call would
+        self.sent += 1
+        FakeChannel.total_sent += 1
+        await asyncio.sleep(0)
+        return FakeMessage(content or "", FakeUser(0, bot=True), self)
+
+class Stats:
+    def __init__(self, explain: bool = False):
+        self.statements = 0
+        # statement shape -> first statement seen with it, kept only for --explain
+        self.shapes: Optional[Dict[str, str]] = {} if explain else None
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+async def measure_lag(samples: List[float], stop: asyncio.Event, interval: float = 0.01):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+def db_calls(histogram) -> int:
+    # bucket counts (including +Inf) precede the running sum
+    return sum(sum(series[:-1]) for series in histogram.series.values())
+
+async def run_scenario(name: str, app, stats: Stats, make_event: Callable[[int], Callable],
+                       events: int, concurrency: int) -> Dict:
+    await app.xp_buffer.flush()
+    await app.poll_engine.flush()
+    calls_before, statements_before = db_calls(DB_QUERY_SECONDS), stats.statements
+    sends_before = FakeChannel.total_sent
+    latencies: List[float] = []
+    lag: List[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.ensure_future(measure_lag(lag, stop))
+    queue = iter(range(events))
+
+    async def worker():
+        for i in queue:
+            handler = make_event(i)
+            start = time.perf_counter()
+            await handler()
+            latencies.append(time.perf_counter() - start)
+            # the gateway hands events over one at a time; don't let a worker monopolize the loop
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    # count the batched writes the events caused, not just the inline ones
+    await app.xp_buffer.flush()
+    await app.poll_engine.flush()
+    elapsed = time.perf_counter() - start
+    # announcements queued in the outbox go out after their merge window
+    while app.outbox.workers:
+        await asyncio.sleep(0.05)
+    stop.set()
+    await lag_task
+    return {
+        "scenario": name,
+        "events": events,
+        "events_per_sec": round(events / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "db_calls_per_event": round((db_calls(DB_QUERY_SECONDS) - calls_before) / events, 4),
+        "statements_per_event": round((stats.statements - statements_before) / events, 4),
+        "sends_per_event": round((FakeChannel.total_sent - sends_before) / events, 4),
+        "loop_lag_p99_ms": round(percentile(lag, 0.99) * 1000, 3),
+        "loop_lag_max_ms": round(max(lag, default=0.0) * 1000, 3),
+    }
+
+async def bench(args):
+    port = free_port()
+    tmp = tempfile.mkdtemp(prefix="bongo-bench-")
+    os.environ.update({
+        "DISCORD_BOT_TOKEN": "bench",
+        "HUGGINGFACE_API_KEY": "bench",
+        "HF_API_URL": f"http://127.0.0.1:{port}/v1/chat/completions",
+        "BOT_DB_PATH": os.path.join(tmp, "bench.db"),
+        "AI_MAX_QUEUE": str(10 ** 6),
+        "BOT_DATABASE_URL": args.database_url,
+    })
+    hf_stub = await start_hf_stub(port, args.token_delay)
+
+    import logging
+    logging.disable(logging.WARNING)
+    from discord.ext import commands
+    from bongosorous import create_app, create_bot, polls, reminders, trivia
+    from bongosorous.config import NUMBER_EMOJIS
+    from bongosorous.migrations import full_scans, statement_shape
+
+    app = create_app()
+    bot = create_bot(app)
+    stats = Stats(args.explain)
+    connect = app.db._connect
+
+    def count_statement(sql):
+        stats.statements += 1
+        if stats.shapes is not None:
+            stats.shapes.setdefault(statement_shape(sql), sql)
+
+    def traced_connect():
+        conn = connect()
+        conn.set_trace_callback(count_statement)
+        return conn
+
+    if app.db.dialect == "sqlite":
+        app.db._connect = traced_connect
+        for conn in app.db._all:
+            conn.set_trace_callback(count_statement)
+
+    rng = random.Random(args.seed)
+    guilds = [FakeGuild(next(ids)) for _ in range(args.guilds)]
+    channels = [FakeChannel(next(ids), g) for g in guilds for _ in range(args.channels)]
+    channel_map = {c.id: c for c in channels}
+    users = [FakeUser(next(ids)) for _ in range(args.users)]
+
+    bot._connection.user = FakeUser(next(ids), bot=True)
+    bot.get_channel = channel_map.get
+    bot.get_guild = lambda gid: None
+
+    async def ready():
+        return None
+
+    bot.wait_until_ready = ready
+
+    async def ctx_send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    commands.Context.send = ctx_send
+    app.ai_scheduler.user_limit = app.ai_scheduler.guild_limit = (10 ** 9, 10 ** 9)
+
+    tasks = [asyncio.ensure_future(t) for t in (app.xp_buffer.run(), app.scheduler.run(), app.poll_engine.run())]
+
+    def message(content: str) -> Callable:
+        channel = rng.choice(channels)
+        return lambda: bot.on_message(FakeMessage(content, rng.choice(users), channel))
+
+    # a few channels always have an open trivia question so answer checks are exercised
+    for channel in channels[::10]:
+        await trivia.start_trivia(app, channel.id, channel.guild.id)
+
+    poll_ids = []
+    for channel in channels[:max(1, len(channels) // 4)]:
+        async def post(embed, channel=channel):
+            return await channel.send(embed=embed)
+        await polls.open_poll(app, post, channel.guild.id, users[0].id, "Bench?", ["a", "b", "c", "d"], 3600)
+        poll_ids.append(max(app.poll_engine.polls))
+    for g in guilds:
+        app.reaction_roles[(g.id, next(ids), "⭐")] = next(ids)
+    role_keys = list(app.reaction_roles)
+
+    def chatter(i):
+        return message(" ".join(rng.choices(WORDS, k=rng.randint(3, 12))))
+
+    prefix_commands = ["!rps rock", "!balance", "!daily", "!trivia", "!leaderboard", "!leaderboard coins global",
+                       "!rank", "!remindme 1h bench", "!help"]
+
+    def command(i):
+        return message(rng.choice(prefix_commands))
+
+    def reaction(i):
+        uid = rng.choice(users).id
+        if rng.random() < 0.7:
+            mid, emoji = rng.choice(poll_ids), rng.choice(NUMBER_EMOJIS[:4])
+            gid = app.poll_engine.polls[mid].guild_id
+        else:
+            gid, mid, emoji = rng.choice(role_keys)
+        payload = SimpleNamespace(message_id=mid, user_id=uid, guild_id=gid, emoji=emoji, member=None)
+        handler = bot.on_raw_reaction_add if rng.random() < 0.75 else bot.on_raw_reaction_remove
+        return lambda: handler(payload)
+
+    questions = [f"bench question {n}" for n in range(max(1, args.events // 20))]
+
+    def ask(i):
+        return message("!ask " + rng.choice(questions))
+
+    reminder_ids: List[int] = []
+
+    async def seed_reminders(n: int):
+        now = int(time.time())
+        for _ in range(n):
+            channel = rng.choice(channels)
+            rid = await app.db.write(reminders.add_reminder, rng.choice(users).id, channel.guild.id, channel.id, now, "bench")
+            reminder_ids.append(rid)
+
+    def reminder_batch(i):
+        batch = reminder_ids[i * 100:(i + 1) * 100]
+        return lambda: reminders.dispatch_reminders(app, batch)
+
+    scenarios = {
+        "messages": (chatter, args.events),
+        "commands": (command, max(1, args.events // 10)),
+        "reactions": (reaction, args.events),
+        "ask": (ask, max(1, args.events // 20)),
+    }
+    results = []
+    for name in args.scenarios.split(","):
+        if name == "reminders":
+            count = max(100, args.events // 10)
+            await seed_reminders(count)
+            result = await run_scenario(name, app, stats, reminder_batch, count // 100, 1)
+            result["events"] = count
+            result["events_per_sec"] = round(result["events_per_sec"] * 100, 1)
+            for key in ("db_calls_per_event", "statements_per_event", "sends_per_event"):
+                result[key] = round(result[key] / 100, 4)
+            results.append(result)
+            reminder_ids.clear()
+        elif name in scenarios:
+            make, events = scenarios[name]
+            results.append(await run_scenario(name, app, stats, make, events, args.concurrency))
+        else:
+            raise SystemExit(f"unknown scenario {name!r}")
+
+    scans: Dict[str, List[str]] = {}
+    if stats.shapes is not None:
+        await exercise_background_queries(app, guilds[0].id, users[0].id)
+        with app.db.connection() as conn:
+            scans = full_scans(conn, list(stats.shapes.values()))
+
+    for t in tasks:
+        t.cancel()
+    await app.outbox.close(5)
+    await app.hf_client.close()
+    await hf_stub.cleanup()
+    app.db.close()
+    return results, scans
+
+async def exercise_background_queries(app, guild_id: int, uid: int):
+    """Run the queries the scenarios don't reach: startup warm-up, scheduled jobs, pruning and owner tools."""
+    from bongosorous import ai, economy, leaderboards, maintenance, polls, reminders, roles, trivia
+
+    db = app.db
+    await db.read(reminders.pending_reminders)
+    await db.read(roles.load_reaction_roles)
+    await db.read(roles.guild_reaction_roles, guild_id)
+    await db.read(roles.guild_reaction_roles, guild_id, 1)
+    await db.read(polls.load_open_polls)
+    await db.read(trivia.load_trivia_channels)
+    await db.write(ai.load_ai_cache, int(time.time()) - 3600, 100)
+    for board in leaderboards.BOARDS:
+        await db.read(leaderboards.load_board, board)
+        await db.read(leaderboards.load_board, board, guild_id)
+    # as if the settle window had passed, so the aggregate actually runs
+    await db.write(economy.snapshot_balances, int(time.time()) + 3600)
+    await db.read(economy.audit_balances, uid)
+    await db.write(economy.remove_guild_member, guild_id, uid)
+    await maintenance.prune(None, db)
+    await db.read(maintenance.reminder_page, 0, 100)
+    await db.read(maintenance.known_guild_ids)
+    await db.read(maintenance.empty_user_page, 0, 100)
+    await db.write(maintenance.delete_users, [0])
+    await db.write(maintenance.prune_guild_members, 0, 100)
+    for table in ("reminders", "reaction_roles"):
+        await db.write(maintenance.prune_guild_rows, table, 0, 100)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=5, help="channels per guild")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scenarios", default="messages,commands,reactions,reminders,ask")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between stub HF tokens")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", default="", help="benchmark a PostgreSQL server instead of SQLite")
+    parser.add_argument("--explain", action="store_true", help="fail if any filtering query does a full table scan")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    if args.explain and args.database_url:
+        parser.error("--explain needs SQLite")
+    results, scans = asyncio.run(bench(args))
+    if args.json:
+        print(json.dumps({"scenarios": results, "full_scans": scans} if args.explain else results, indent=2))
+    else:
+        print(f"{args.guilds} guilds x {args.channels} channels, {args.users} users, concurrency {args.concurrency}")
+        cols = list(results[0])
+        print("  ".join(f"{c:>20}" for c in cols))
+        for r in results:
+            print("  ".join(f"{r[c]!s:>20}" for c in cols))
+        if args.explain:
+            print(f"full table scans: {len(scans)}")
+            for shape, steps in scans.items():
+                print(f"  {shape}\n    {'; '.join(steps)}")
+    sys.exit(1 if scans else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Check that database writes never stall the event loop.
+
+    python bench/bench_db_lag.py [--writers 50] [--writes 300] [--rows 2000] [--max-lag-ms 25]
+                                 [--database-url postgresql://...] [--json]
+
+A ticker sleeps 10 ms at a time on the event loop and records how late
+each wake-up is. It runs three times against a throwaway SQLite file (or
+--database-url):
+
+- idle: no database work, the baseline.
+- async: --writers coroutines together await --writes db.write() calls,
+  each flushing XP for --rows users through the same flush_xp() the bot
+  uses.
+- inline (SQLite only, for contrast): the same writes run directly on the
+  loop, the way the handlers used to.
+
+Exits with status 1 if the loop's p99 lag under async writes is more than
+--max-lag-ms above idle.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bongosorous.storage import init_db, open_database  # noqa: E402
+from bongosorous.xp import flush_xp  # noqa: E402
+
+TICK = 0.01
+USERS = 100_000
+
+def percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+async def ticker(samples: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        samples.append(max(0.0, time.perf_counter() - start - TICK))
+
+def batch(rng: random.Random, rows: int):
+    return {rng.randrange(1, USERS): rng.randint(1, 20) for _ in range(rows)}, set()
+
+async def measure(name: str, load) -> dict:
+    samples: List[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(samples, stop))
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    await load()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return {"phase": name, "seconds": round(elapsed, 3), "ticks": len(samples),
+            "lag_p50_ms": round(percentile(samples, 0.5) * 1000, 2),
+            "lag_p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+            "lag_max_ms": round(max(samples, default=0.0) * 1000, 2)}
+
+async def bench(db, args) -> List[dict]:
+    rng = random.Random(args.seed)
+    batches = [batch(rng, args.rows) for _ in range(args.writes)]
+
+    async def idle():
+        await asyncio.sleep(1.0)
+
+    async def async_writes():
+        pending = list(batches)
+
+        async def writer():
+            while pending:
+                await db.write(flush_xp, *pending.pop())
+        await asyncio.gather(*(writer() for _ in range(args.writers)))
+
+    async def inline_writes():
+        for xp, members in batches:
+            with db.transaction() as conn:
+                flush_xp(conn, xp, members)
+            await asyncio.sleep(0)
+
+    results = [await measure("idle", idle), await measure("async", async_writes)]
+    if db.dialect == "sqlite":
+        results.append(await measure("inline", inline_writes))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=50, help="coroutines issuing writes at once")
+    parser.add_argument("--writes", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=2000, help="users per XP flush")
+    parser.add_argument("--max-lag-ms", type=float, default=25, help="allowed p99 lag over idle")
+    parser.add_argument("--database-url", default="", help="check a PostgreSQL server instead of SQLite")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bongo-lag-") as tmp:
+        db = open_database(args.database_url or os.path.join(tmp, "lag.db"))
+        init_db(db)
+        try:
+            results = asyncio.run(bench(db, args))
+        finally:
+            db.close()
+
+    phases = {r["phase"]: r for r in results}
+    extra = phases["async"]["lag_p99_ms"] - phases["idle"]["lag_p99_ms"]
+    ok = extra <= args.max_lag_ms
+    if args.json:
+        print(json.dumps({"phases": results, "async_extra_p99_ms": round(extra, 2), "ok": ok}, indent=2))
+    else:
+        print(f"{args.writes} writes of {args.rows} rows, {args.writers} writers")
+        for r in results:
+            print(f"{r['phase']:>7}  {r['seconds']:7.3f} s  lag p50 {r['lag_p50_ms']:7.2f} ms  "
+                  f"p99 {r['lag_p99_ms']:7.2f} ms  max {r['lag_max_ms']:7.2f} ms")
+        print(f"async p99 over idle: {extra:.2f} ms (limit {args.max_lag_ms:g}) {'ok' if ok else 'FAILED'}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Load-test the HTTP endpoints while the bot's loop is busy.
+
+    python bench/bench_http.py [--clients 60] [--requests 6000] [--writers 10] [--rows 2000]
+                               [--max-p99-ms 250] [--max-errors 0] [--json]
+
+Serves /, /health and /metrics with start_web_server() from a real
+create_bot() against a throwaway SQLite file, marked ready so /health
+takes its full path (gateway check, DB ping, stats). While --writers
+coroutines keep flushing XP batches of --rows users through db.write()
+and bumping metrics on the same loop, a separate process runs --clients
+keep-alive clients that send --requests requests spread over the three
+paths.
+
+Exits with status 1 if the p99 latency of any path is above --max-p99-ms
+or more than --max-errors requests fail or get a non-200 answer. The
+clients share the machine with the server, so on few cores most of the
+latency is queueing behind them; the default limit is set to catch the
+loop stalling (a blocking handler or inline DB write costs hundreds of
+milliseconds), not to rank hardware.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PATHS = ("/", "/health", "/metrics")
+USERS = 100_000
+
+def percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def _clients(port: int, clients: int, requests: int) -> dict:
+    import aiohttp
+
+    latencies: Dict[str, List[float]] = {path: [] for path in PATHS}
+    errors: Dict[str, int] = {}
+    pending = [PATHS[i % len(PATHS)] for i in range(requests)]
+    random.Random(1).shuffle(pending)
+
+    async def client(session):
+        while pending:
+            path = pending.pop()
+            start = time.perf_counter()
+            try:
+                async with session.get(f"http://127.0.0.1:{port}{path}") as resp:
+                    await resp.read()
+                    status = resp.status
+            except Exception as e:
+                status = type(e).__name__
+            latencies[path].append(time.perf_counter() - start)
+            if status != 200:
+                errors[f"{path} {status}"] = errors.get(f"{path} {status}", 0) + 1
+
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "latencies": latencies, "errors": errors}
+
+def run_clients(port: int, clients: int, requests: int) -> dict:
+    return asyncio.run(_clients(port, clients, requests))
+
+async def bench(args) -> dict:
+    tmp = tempfile.mkdtemp(prefix="bongo-http-")
+    os.environ.update({
+        "DISCORD_BOT_TOKEN": "bench",
+        "HUGGINGFACE_API_KEY": "bench",
+        "BOT_DB_PATH": os.path.join(tmp, "http.db"),
+    })
+
+    import logging
+    logging.disable(logging.WARNING)
+    from bongosorous import create_app, create_bot, metrics
+    from bongosorous.http import start_web_server
+    from bongosorous.xp import flush_xp
+
+    app = create_app()
+    bot = create_bot(app)
+    # no gateway here: report connected so /health does all of its work and answers 200
+    bot.is_ready = lambda: True
+    bot.ws = SimpleNamespace(latency=0.05)
+    port = free_port()
+    runner = await start_web_server(bot, port)
+
+    rng = random.Random(args.seed)
+    stop = asyncio.Event()
+    writes = 0
+    events = metrics.Counter("bench_http_events_total", "Synthetic events handled while load testing")
+
+    async def writer():
+        nonlocal writes
+        while not stop.is_set():
+            xp = {rng.randrange(1, USERS): rng.randint(1, 20) for _ in range(args.rows)}
+            await app.db.write(flush_xp, xp, set())
+            writes += 1
+
+    async def churn():
+        while not stop.is_set():
+            for _ in range(200):
+                events.inc()
+            await asyncio.sleep(0)
+
+    load = [asyncio.ensure_future(writer()) for _ in range(args.writers)] + [asyncio.ensure_future(churn())]
+    try:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            loop = asyncio.get_running_loop()
+            # warm up the pool process and every route before timing
+            await loop.run_in_executor(pool, run_clients, port, len(PATHS), len(PATHS) * 10)
+            result = await loop.run_in_executor(pool, run_clients, port, args.clients, args.requests)
+    finally:
+        stop.set()
+        await asyncio.gather(*load, return_exceptions=True)
+        await runner.cleanup()
+        await app.hf_client.close()
+        app.db.close()
+
+    paths = []
+    for path, samples in result["latencies"].items():
+        paths.append({"path": path, "requests": len(samples),
+                      "p50_ms": round(percentile(samples, 0.5) * 1000, 2),
+                      "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+                      "max_ms": round(max(samples, default=0.0) * 1000, 2)})
+    return {"requests_per_sec": round(args.requests / result["seconds"], 1), "paths": paths,
+            "errors": result["errors"], "xp_writes": writes}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=60, help="keep-alive connections")
+    parser.add_argument("--requests", type=int, default=6000)
+    parser.add_argument("--writers", type=int, default=10, help="coroutines flushing XP during the test")
+    parser.add_argument("--rows", type=int, default=2000, help="users per XP flush")
+    parser.add_argument("--max-p99-ms", type=float, default=250, help="allowed p99 latency per path")
+    parser.add_argument("--max-errors", type=int, default=0, help="allowed failed or non-200 requests")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    result = asyncio.run(bench(args))
+    failed = sum(result["errors"].values())
+    slow = [p["path"] for p in result["paths"] if p["p99_ms"] > args.max_p99_ms]
+    ok = failed <= args.max_errors and not slow
+    if args.json:
+        print(json.dumps(dict(result, ok=ok), indent=2))
+    else:
+        print(f"{args.requests} requests from {args.clients} clients, {args.writers} XP writers "
+              f"({result['xp_writes']} flushes of {args.rows} rows during the test)")
+        print(f"{result['requests_per_sec']:.1f} req/s")
+        for p in result["paths"]:
+            print(f"{p['path']:>9}  {p['requests']:6d} req  p50 {p['p50_ms']:7.2f} ms  "
+                  f"p99 {p['p99_ms']:7.2f} ms  max {p['max_ms']:7.2f} ms")
+        for error, count in sorted(result["errors"].items()):
+            print(f"  {count} x {error}")
+        print(f"errors {failed} (limit {args.max_errors}), p99 limit {args.max_p99_ms:g} ms: "
+              f"{'ok' if ok else 'FAILED'}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
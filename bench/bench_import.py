@@ -0,0 +1,83 @@
+"""Cold-start import budget.
+
+    python bench/bench_import.py [--runs 5] [--light-ms 150] [--app-ms 250] [--bot-ms 1000] [--json]
+
+Each step runs in a fresh interpreter and the best of --runs is kept:
+
+- light: import main and every module create_app() needs. discord.py and
+  aiohttp must stay unloaded.
+- app: light plus create_app() against a throwaway database. It must not
+  load discord.py or aiohttp either.
+- bot: create_bot(create_app()), i.e. everything up to the gateway login.
+
+Exits with status 1 if a step is over its budget or loads a heavy
+dependency it shouldn't, so it can gate CI or a deploy.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("discord", "aiohttp")
+
+STEPS = {
+    "light": ("import main, bongosorous.app", False),
+    "app": ("import main; from bongosorous import create_app; create_app()", False),
+    "bot": ("from bongosorous import create_app, create_bot; create_bot(create_app())", True),
+}
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, sorted(m for m in {heavy!r} if m in sys.modules)]))
+"""
+
+def measure(code: str, env: dict):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    elapsed, loaded = json.loads(out.strip().splitlines()[-1])
+    return elapsed, loaded
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--light-ms", type=float, default=150)
+    parser.add_argument("--app-ms", type=float, default=250)
+    parser.add_argument("--bot-ms", type=float, default=1000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    budgets = {"light": args.light_ms, "app": args.app_ms, "bot": args.bot_ms}
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bongo-import-") as tmp:
+        env = dict(os.environ, BOT_DB_PATH=os.path.join(tmp, "import.db"))
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        # compile once so every run measures a warm bytecode cache, like a restarted deploy
+        subprocess.run([sys.executable, "-m", "compileall", "-q", "main.py", "bongosorous"], cwd=ROOT, check=True)
+        for step, (code, heavy_ok) in STEPS.items():
+            samples, loaded = [], []
+            for _ in range(args.runs):
+                elapsed, loaded = measure(code, env)
+                samples.append(elapsed)
+            best = min(samples) * 1000
+            leaked = [] if heavy_ok else loaded
+            results.append({"step": step, "best_ms": round(best, 1), "budget_ms": budgets[step],
+                            "heavy_loaded": loaded, "leaked": leaked, "ok": best <= budgets[step] and not leaked})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            status = "ok" if r["ok"] else "LOADS " + ", ".join(r["leaked"]) if r["leaked"] else "OVER BUDGET"
+            heavy = ", ".join(r["heavy_loaded"]) or "-"
+            print(f"{r['step']:>6}  {r['best_ms']:8.1f} ms  budget {r['budget_ms']:7.1f} ms  heavy: {heavy:<16} {status}")
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+if __name__ == "__main__":
+    main()
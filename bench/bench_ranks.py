@@ -0,0 +1,77 @@
+"""Rank lookup latency for a large user base.
+
+    python bench/bench_ranks.py [--users 1000000] [--queries 100000] [--sqlite]
+
+Builds a RankIndex the way the bot does at startup and times rank lookups,
+score updates and top-10 reads. With --sqlite it also fills a temporary
+database with the same users, times building the index from the covering
+index and compares against answering the rank with a COUNT(*) query.
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bongosorous.ranks import RankIndex  # noqa: E402
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6
+    return f"p50 {pick(0.5):8.2f} us   p99 {pick(0.99):8.2f} us   max {samples[-1] * 1e6:8.2f} us"
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100_000)
+    parser.add_argument("--sqlite", action="store_true", help="also benchmark loading from and querying SQLite")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    scores = {uid: rng.randint(1, 500_000) for uid in range(1, args.users + 1)}
+    start = time.perf_counter()
+    index = RankIndex.build(sorted((s, u) for u, s in scores.items()))
+    print(f"build {len(index):,} users from sorted rows: {time.perf_counter() - start:.2f}s")
+
+    lookups = [(scores[rng.randint(1, args.users)],) for _ in range(args.queries)]
+    print("rank    ", percentiles(timed(index.rank, lookups)))
+
+    updates = []
+    for _ in range(min(args.queries, 20_000)):
+        uid = rng.randint(1, args.users)
+        new = scores[uid] + rng.randint(1, 3)
+        updates.append((uid, scores[uid], new))
+        scores[uid] = new
+    print("update  ", percentiles(timed(index.update, updates)))
+    print("top 10  ", percentiles(timed(index.top, [(10,)] * 1000)))
+
+    if not args.sqlite:
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        conn.execute("CREATE TABLE users (user_id INTEGER PRIMARY KEY, coins INTEGER DEFAULT 0, xp INTEGER DEFAULT 0)")
+        conn.executemany("INSERT INTO users (user_id, xp) VALUES (?, ?)", scores.items())
+        conn.execute("CREATE INDEX idx_users_xp ON users(xp, user_id)")
+        conn.commit()
+        start = time.perf_counter()
+        RankIndex.build(conn.execute("SELECT xp, user_id FROM users WHERE xp > 0 ORDER BY xp, user_id"))
+        print(f"build from SQLite covering index: {time.perf_counter() - start:.2f}s")
+        sample = lookups[:min(len(lookups), 200)]
+        count = lambda s: conn.execute("SELECT COUNT(*) + 1 FROM users WHERE xp > ?", (s,)).fetchone()
+        print("sql rank", percentiles(timed(count, sample)))
+        conn.close()
+
+if __name__ == "__main__":
+    main()
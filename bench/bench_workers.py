@@ -0,0 +1,167 @@
+"""Check that shared state stays consistent with several bot processes.
+
+    python bench/bench_workers.py [--workers 4] [--reminders 2000] [--polls 200] [--trivia 200]
+                                  [--transfers 2000] [--database-url postgresql://...] [--json]
+
+Every worker process opens its own connections to one database (a
+throwaway SQLite file, or --database-url) and races the others through
+the same claim functions the bot uses: each reminder, poll and trivia
+round is offered to every worker, and all of them move coins between the
+same users at once. Afterwards it checks that every reminder was sent
+exactly once, every poll closed once, every trivia round paid out once,
+the coin total only grew by the trivia rewards and audit_balances() finds
+nothing. Exits with status 1 if any check fails.
+
+Rows it creates use ids from ID_BASE up, and are deleted before and
+after the run, so it can point at a database that holds real data.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bongosorous.storage import init_db, open_database  # noqa: E402
+from bongosorous import economy, polls, reminders, trivia  # noqa: E402
+
+ID_BASE = 9 * 10 ** 17
+USERS = 50
+START_COINS = 1000
+REWARD = 10
+TABLES = (("reminders", "id"), ("polls", "message_id"), ("poll_votes", "poll_id"),
+          ("trivia_channels", "channel_id"), ("ledger", "user_id"), ("balance_snapshots", "user_id"),
+          ("users", "user_id"))
+
+def clear(conn):
+    for table, column in TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE {column} >= ?", (ID_BASE,))
+
+def seed(conn, args):
+    clear(conn)
+    now = time.time()
+    users = [ID_BASE + i for i in range(USERS)]
+    for uid in users:
+        economy.credit_coins(conn, uid, START_COINS, "bench")
+    conn.executemany("INSERT INTO reminders (id, user_id, guild_id, channel_id, remind_at, content) "
+                     "VALUES (?, ?, NULL, 1, ?, 'bench')",
+                     [(ID_BASE + i, users[i % USERS], int(now)) for i in range(args.reminders)])
+    for i in range(args.polls):
+        polls.create_poll(conn, ID_BASE + i, None, 1, users[0], "bench", ["a", "b"], int(now))
+        polls.save_votes(conn, {(ID_BASE + i, uid): uid % 2 for uid in users[:5]})
+    for i in range(args.trivia):
+        trivia.save_trivia_round(conn, ID_BASE + i, None, [0, 1, 0], 0, "bench", now + 3600, now)
+
+async def race(db, worker_id: str, args, rng: random.Random):
+    sent, closed, won, moved = [], [], [], 0
+    ids = [ID_BASE + i for i in range(args.reminders)]
+    rng.shuffle(ids)
+    for i in range(0, len(ids), 100):
+        rows, _ = await db.write(reminders.claim_reminders, ids[i:i + 100], worker_id, time.time(), 60)
+        done = [r["id"] for r in rows]
+        sent.extend(done)
+        if done:
+            await db.write(reminders.delete_reminders, done, worker_id)
+    poll_ids = [ID_BASE + i for i in range(args.polls)]
+    rng.shuffle(poll_ids)
+    for i in range(0, len(poll_ids), 20):
+        results = await db.write(polls.close_polls, poll_ids[i:i + 20])
+        closed.extend(pid for pid, tallies in results.items() if tallies == {0: 3, 1: 2})
+    deadlines = {r["channel_id"]: r["deadline"] for r in await db.read(trivia.load_trivia_channels)}
+    channels = [ID_BASE + i for i in range(args.trivia)]
+    rng.shuffle(channels)
+    for ch in channels:
+        uid = ID_BASE + rng.randrange(USERS)
+        if await db.write(trivia.claim_trivia_answer, ch, deadlines[ch], uid, REWARD) is not None:
+            won.append(ch)
+    for _ in range(args.transfers):
+        src, dst = rng.sample(range(USERS), 2)
+        if await db.write(economy.transfer_coins, ID_BASE + src, ID_BASE + dst, rng.randint(1, 50)):
+            moved += 1
+    return sent, closed, won, moved
+
+def worker(target: str, worker_id: str, args, seed_value: int, out):
+    db = open_database(target, size=2)
+    try:
+        out.put(asyncio.run(race(db, worker_id, args, random.Random(seed_value))))
+    finally:
+        db.close()
+
+def check(conn, args, sent, closed, won):
+    users = [ID_BASE + i for i in range(USERS)]
+    marks = ",".join("?" * USERS)
+    total = conn.execute(f"SELECT SUM(coins) FROM users WHERE user_id IN ({marks})", users).fetchone()[0]
+    mismatches = [m for uid in users for m in economy.audit_balances(conn, uid)]
+    left = conn.execute("SELECT COUNT(*) FROM reminders WHERE id >= ?", (ID_BASE,)).fetchone()[0]
+    return {
+        "reminders_sent_once": sorted(sent) == [ID_BASE + i for i in range(args.reminders)] and left == 0,
+        "polls_closed_once": sorted(closed) == [ID_BASE + i for i in range(args.polls)],
+        "trivia_paid_once": sorted(won) == [ID_BASE + i for i in range(args.trivia)],
+        "coins_conserved": total == USERS * START_COINS + REWARD * len(won),
+        "ledger_matches": not mismatches,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--reminders", type=int, default=2000)
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--trivia", type=int, default=200)
+    parser.add_argument("--transfers", type=int, default=2000, help="transfers per worker")
+    parser.add_argument("--database-url", default="", help="check a PostgreSQL server instead of SQLite")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bongo-workers-") as tmp:
+        target = args.database_url or os.path.join(tmp, "workers.db")
+        db = open_database(target)
+        init_db(db)
+        asyncio.run(db.write(seed, args))
+
+        ctx = multiprocessing.get_context("spawn")
+        out = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(target, f"bench-{i}", args, args.seed + i, out))
+                 for i in range(args.workers)]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        sent = [i for r in results for i in r[0]]
+        closed = [i for r in results for i in r[1]]
+        won = [i for r in results for i in r[2]]
+        with db.connection() as conn:
+            checks = check(conn, args, sent, closed, won)
+        asyncio.run(db.write(clear))
+        db.close()
+
+    report = {
+        "backend": db.dialect,
+        "workers": args.workers,
+        "seconds": round(elapsed, 3),
+        "reminders_per_worker": [len(r[0]) for r in results],
+        "transfers_done": sum(r[3] for r in results),
+        "checks": checks,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['backend']}, {args.workers} workers, {report['seconds']} s")
+        print(f"reminders sent per worker: {report['reminders_per_worker']}, "
+              f"transfers done: {report['transfers_done']}")
+        for name, ok in checks.items():
+            print(f"{name:>22}  {'ok' if ok else 'FAILED'}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Bongosorous Discord bot.
+
+Importing the package (or any module in it except ``bot`` and ``http``)
+does not import discord.py or aiohttp, open the database or read the
+token; ``create_app()`` and ``create_bot()`` do the setup.
+"""
+
+__all__ = ["create_app", "create_bot"]
+
+def __getattr__(name):
+    # resolved on first use so ``import bongosorous`` stays cheap
+    if name == "create_app":
+        from .app import create_app
+        return create_app
+    if name == "create_bot":
+        from .bot import create_bot
+        return create_bot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,415 @@
+import re
+import json
+import math
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import (AI_EDIT_INTERVAL, AI_GUILD_BURST, AI_GUILD_PER_MINUTE, AI_USER_BURST, AI_USER_PER_MINUTE,
+                     HF_API_URL, HF_MODEL, HF_POOL_SIZE, MAX_RESPONSE_LENGTH)
+from .metrics import Counter, Histogram
+from .storage import Backend
+
+if TYPE_CHECKING:
+    import aiohttp
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+HF_SECONDS = Histogram("bongo_hf_query_seconds", "Time spent streaming an answer from Hugging Face")
+HF_ERRORS = Counter("bongo_hf_errors_total", "Failed Hugging Face queries", ["reason"])
+AI_QUEUE_WAIT_SECONDS = Histogram("bongo_ai_queue_wait_seconds", "Time AI requests waited for a slot")
+AI_INFERENCE_SECONDS = Histogram("bongo_ai_inference_seconds", "Time AI requests held a slot")
+
+class HFError(Exception):
+    pass
+
+class HFClient:
+    """Streaming client for the Hugging Face OpenAI-compatible chat endpoint on a pooled aiohttp session."""
+
+    def __init__(self, token: str, url: str = HF_API_URL, model: str = HF_MODEL):
+        self.token = token
+        self.url = url
+        self.model = model
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=HF_POOL_SIZE, keepalive_timeout=60),
+                headers={"Authorization": f"Bearer {self.token}"},
+                timeout=aiohttp.ClientTimeout(sock_connect=10, sock_read=30),
+            )
+        return self._session
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a friendly, concise assistant."},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 400,
+            "temperature": 0.8,
+            "stream": True,
+        }
+        async with self._get_session().post(self.url, json=payload) as resp:
+            if resp.status != 200:
+                body = await resp.text()
+                raise HFError(f"HTTP {resp.status}: {body[:200]}")
+            async for raw in resp.content:
+                line = raw.decode("utf-8", "replace").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta") or {}
+                except (ValueError, KeyError, IndexError):
+                    continue
+                if delta.get("content"):
+                    yield delta["content"]
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+def clip_response(text: str) -> str:
+    if len(text) > MAX_RESPONSE_LENGTH:
+        return text[:MAX_RESPONSE_LENGTH] + "..."
+    return text
+
+async def hf_query(client: Optional[HFClient], prompt: str, timeout: int = 20,
+                   on_progress: Optional[Callable[[str], Awaitable[None]]] = None) -> Tuple[Optional[str], Optional[str]]:
+    """Stream an answer, calling on_progress with the partial text at most every AI_EDIT_INTERVAL seconds."""
+    if not client:
+        return None, "HF not configured"
+    parts: List[str] = []
+
+    async def consume():
+        last = time.monotonic()
+        async for token in client.stream(prompt):
+            parts.append(token)
+            now = time.monotonic()
+            if on_progress and now - last >= AI_EDIT_INTERVAL:
+                last = now
+                try:
+                    await on_progress("".join(parts))
+                except Exception:
+                    logger.exception("Progress update failed")
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(consume(), timeout=timeout)
+    except asyncio.TimeoutError:
+        HF_ERRORS.inc("timeout")
+        # a partial answer is still shown, but the error keeps it out of the cache
+        return ("".join(parts).strip() + " …") if parts else None, "HF timeout"
+    except Exception as e:
+        HF_ERRORS.inc(type(e).__name__)
+        logger.exception("Error during HF query")
+        return None, str(e)
+    finally:
+        HF_SECONDS.observe(time.perf_counter() - start)
+    text = "".join(parts).strip()
+    if not text:
+        HF_ERRORS.inc("empty")
+        return None, "Empty response"
+    return text, None
+
+class TokenBucket:
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= 1
+
+    def take(self):
+        self.tokens -= 1
+
+    def retry_after(self) -> float:
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class LatencyStats:
+    def __init__(self, window: int = 512):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def summary(self) -> dict:
+        recent = sorted(self.recent)
+        pct = lambda q: round(recent[min(len(recent) - 1, int(q * len(recent)))], 4) if recent else 0.0
+        return {"count": self.count, "avg": round(self.total / self.count, 4) if self.count else 0.0,
+                "p50": pct(0.5), "p95": pct(0.95)}
+
+class AIBusy(Exception):
+    pass
+
+class AIScheduler:
+    """Admission control for AI requests: per-user and per-guild token buckets,
+    a global concurrency cap and load shedding once the wait queue is full."""
+
+    def __init__(self, concurrency: int, max_queue: int,
+                 user_limit: Tuple[float, float] = (AI_USER_BURST, AI_USER_PER_MINUTE),
+                 guild_limit: Tuple[float, float] = (AI_GUILD_BURST, AI_GUILD_PER_MINUTE)):
+        self.max_queue = max_queue
+        self.user_limit = user_limit
+        self.guild_limit = guild_limit
+        self._slots = asyncio.Semaphore(concurrency)
+        self.users: Dict[int, TokenBucket] = {}
+        self.guilds: Dict[int, TokenBucket] = {}
+        self.waiting = 0
+        self.active = 0
+        self.shed = 0
+        self.limited = 0
+        self.queue_wait = LatencyStats()
+        self.inference = LatencyStats()
+
+    def _bucket(self, table: Dict[int, TokenBucket], key: int, burst: float, per_minute: float) -> TokenBucket:
+        bucket = table.get(key)
+        if bucket is None:
+            if len(table) > 10000:
+                for k in [k for k, b in table.items() if b.ready() and b.tokens >= b.capacity]:
+                    del table[k]
+            bucket = table[key] = TokenBucket(burst, per_minute)
+        return bucket
+
+    def admit(self, guild_id: Optional[int], user_id: int):
+        if self.waiting >= self.max_queue:
+            self.shed += 1
+            raise AIBusy("I'm answering a lot of questions right now — try again in a minute!")
+        user = self._bucket(self.users, user_id, *self.user_limit)
+        guild = self._bucket(self.guilds, guild_id, *self.guild_limit) if guild_id else None
+        if not user.ready():
+            self.limited += 1
+            raise AIBusy(f"Slow down a little — you can ask again in {math.ceil(user.retry_after())}s.")
+        if guild and not guild.ready():
+            self.limited += 1
+            raise AIBusy(f"This server is asking a lot — try again in {math.ceil(guild.retry_after())}s.")
+        user.take()
+        if guild:
+            guild.take()
+
+    async def run(self, guild_id: Optional[int], user_id: int, fn: Callable[[], Awaitable]):
+        self.admit(guild_id, user_id)
+        queued = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started = time.monotonic()
+        self.queue_wait.observe(started - queued)
+        AI_QUEUE_WAIT_SECONDS.observe(started - queued)
+        self.active += 1
+        try:
+            return await fn()
+        finally:
+            self.active -= 1
+            self._slots.release()
+            self.inference.observe(time.monotonic() - started)
+            AI_INFERENCE_SECONDS.observe(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        return {"active": self.active, "waiting": self.waiting, "shed": self.shed, "rate_limited": self.limited,
+                "queue_wait": self.queue_wait.summary(), "inference": self.inference.summary()}
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt.lower()).strip().rstrip("?!. ")
+
+def cache_key(prompt: str) -> str:
+    return hashlib.sha1(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+
+ProgressFn = Callable[[str], Awaitable[None]]
+
+class InFlight:
+    """One upstream call and everyone waiting on it, so each of them sees its progress."""
+    __slots__ = ("task", "listeners")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Future] = None
+        self.listeners: List[ProgressFn] = []
+
+    async def progress(self, partial: str):
+        results = await asyncio.gather(*(fn(partial) for fn in list(self.listeners)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Progress update failed", exc_info=result)
+
+class ResponseCache:
+    """LRU + TTL cache of AI answers that also coalesces identical in-flight questions.
+
+    Only the caller that starts an upstream call goes through its compute
+    (and so admission control); callers asking the same question meanwhile
+    wait for that answer, get its progress updates, and only start their
+    own call if the first one was refused with AIBusy. Answers are also
+    written to SQLite, and reloaded at startup, when a db is given.
+    """
+
+    def __init__(self, size: int, ttl: int, db: Optional[Backend] = None):
+        self.size = size
+        self.ttl = ttl
+        self.db = db
+        self.persist = db is not None
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.inflight: Dict[str, InFlight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        if entry[0] + self.ttl < time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, text: str, created_at: Optional[float] = None):
+        self.entries[key] = (created_at or time.time(), text)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    async def load(self):
+        if not self.persist:
+            return
+        try:
+            rows = await self.db.write(load_ai_cache, int(time.time()) - self.ttl, self.size)
+        except Exception:
+            logger.exception("Failed to load AI response cache")
+            return
+        for r in reversed(rows):
+            self.put(r["key"], r["response"], r["created_at"])
+        logger.info("Loaded %d cached AI responses.", len(rows))
+
+    async def fetch(self, prompt: str, compute: Callable[[ProgressFn], Awaitable[Tuple[Optional[str], Optional[str]]]],
+                    on_progress: Optional[ProgressFn] = None):
+        """Answer prompt from the cache, an identical call in flight, or ``compute(progress)``."""
+        key = cache_key(prompt)
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text, None
+        flight = self.inflight.get(key)
+        if flight:
+            self.coalesced += 1
+            if on_progress:
+                flight.listeners.append(on_progress)
+            try:
+                return await asyncio.shield(flight.task)
+            except AIBusy:
+                # the first asker was turned away; that says nothing about this one
+                self.coalesced -= 1
+                text = self.get(key)
+                if text is not None:
+                    return text, None
+                return await self.fetch(prompt, compute, on_progress)
+            finally:
+                if on_progress in flight.listeners:
+                    flight.listeners.remove(on_progress)
+        self.misses += 1
+        flight = self.inflight[key] = InFlight()
+        if on_progress:
+            flight.listeners.append(on_progress)
+        flight.task = asyncio.ensure_future(self._compute(key, lambda: compute(flight.progress)))
+        flight.task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(flight.task)
+
+    async def _compute(self, key: str, compute):
+        text, err = await compute()
+        if text and not err:
+            now = int(time.time())
+            self.put(key, text, now)
+            if self.persist:
+                try:
+                    await self.db.write(save_ai_response, key, text, now)
+                except Exception:
+                    logger.exception("Failed to persist AI response")
+        return text, err
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+def load_ai_cache(conn, cutoff: int, limit: int) -> list:
+    conn.execute("DELETE FROM ai_cache WHERE created_at < ?", (cutoff,))
+    return conn.execute("SELECT key, response, created_at FROM ai_cache ORDER BY created_at DESC LIMIT ?",
+                        (limit,)).fetchall()
+
+def save_ai_response(conn, key: str, text: str, created_at: int):
+    conn.execute("INSERT INTO ai_cache (key, response, created_at) VALUES (?, ?, ?) "
+                 "ON CONFLICT(key) DO UPDATE SET response = excluded.response, created_at = excluded.created_at",
+                 (key, text, created_at))
+
+def register(bot: "BongoBot"):
+    import discord
+    from discord import app_commands
+
+    app = bot.app
+
+    @bot.tree.command(name="ask", description="Ask the AI (Hugging Face)")
+    @app_commands.describe(question="Your question")
+    async def ask_slash(interaction: discord.Interaction, question: str):
+        await interaction.response.defer(thinking=True)
+
+        async def progress(partial: str):
+            await interaction.edit_original_response(content=f"✨ {clip_response(partial)} ▌")
+
+        try:
+            text, err = await app.ai_cache.fetch(question, lambda fan_out: app.ai_scheduler.run(
+                interaction.guild_id, interaction.user.id,
+                lambda: hf_query(app.hf_client, question, on_progress=fan_out)), on_progress=progress)
+        except AIBusy as e:
+            await interaction.edit_original_response(content=f"⏳ {e}")
+            return
+        if text:
+            await interaction.edit_original_response(content=f"✨ {clip_response(text)}")
+        else:
+            await interaction.edit_original_response(content=f"❌ AI error: {err}")
+
+    @bot.command(name="ask")
+    async def ask_prefix(ctx, *, question: str):
+        thinking = await ctx.send("🤖 Thinking...")
+
+        async def progress(partial: str):
+            await thinking.edit(content=f"✨ {clip_response(partial)} ▌")
+
+        try:
+            text, err = await app.ai_cache.fetch(question, lambda fan_out: app.ai_scheduler.run(
+                ctx.guild.id if ctx.guild else None, ctx.author.id,
+                lambda: hf_query(app.hf_client, question, on_progress=fan_out)), on_progress=progress)
+        except AIBusy as e:
+            await thinking.edit(content=f"⏳ {e}")
+            return
+        if text:
+            await thinking.edit(content=f"✨ {clip_response(text)}")
+        else:
+            await thinking.edit(content=f"❌ AI error: {err}")
@@ -0,0 +1,101 @@
+import time
+import logging
+from contextlib import contextmanager
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from . import config, economy, maintenance, reminders
+from .ai import AIScheduler, HFClient, ResponseCache
+from .leaderboards import Leaderboards, rebuild_leaderboards
+from .metrics import Counter, Gauge
+from .outbox import Outbox
+from .polls import PollEngine
+from .profiling import Watchdog
+from .roles import RoleDispatcher
+from .scheduler import Scheduler
+from .storage import Backend, init_db, open_database
+from .trivia import QuestionBank, TriviaEngine, expire_trivia
+from .xp import XPBuffer
+
+if TYPE_CHECKING:
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+class App:
+    """The bot's state outside Discord: database, scheduler and each feature's in-memory engine.
+
+    Built by create_app() without importing discord.py; create_bot()
+    attaches the bot as ``app.bot``.
+    """
+
+    def __init__(self, db: Backend, started: float):
+        self.db = db
+        self.started = started
+        # seconds spent in each startup phase, logged once ready and shown on /health
+        self.startup_phases: Dict[str, float] = {}
+        self.bot: Optional["BongoBot"] = None
+        self.scheduler = Scheduler()
+        self.outbox = Outbox()
+        self.leaderboards = Leaderboards(db, config.RANK_GUILD_BOARDS)
+        self.xp_buffer = XPBuffer(db, self.leaderboards, self.outbox)
+        # the bank is only indexed when the first question is asked
+        self.trivia_engine = TriviaEngine(QuestionBank(config.TRIVIA_BANK), config.TRIVIA_TIMEOUT)
+        self.poll_engine = PollEngine(self)
+        self.hf_client = HFClient(config.HF_KEY) if config.HF_KEY else None
+        self.ai_scheduler = AIScheduler(config.AI_MAX_CONCURRENCY, config.AI_MAX_QUEUE)
+        self.ai_cache = ResponseCache(config.AI_CACHE_SIZE, config.AI_CACHE_TTL,
+                                      db if config.AI_CACHE_PERSIST else None)
+        # (guild_id, message_id, emoji) -> role_id, so reactions on ordinary messages never reach SQLite
+        self.reaction_roles: Dict[Tuple[int, int, str], int] = {}
+        self.role_dispatcher = RoleDispatcher(self)
+        self.watchdog = Watchdog()
+
+    @contextmanager
+    def startup_phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_phases[name] = round(time.perf_counter() - start, 3)
+
+def create_app(db_path: Optional[str] = None, started: Optional[float] = None) -> App:
+    """Open the database, create missing tables and wire up the scheduled jobs.
+
+    ``db_path`` is a SQLite file or a postgresql:// URL and defaults to
+    BOT_DATABASE_URL, then BOT_DB_PATH. ``started`` is the perf_counter()
+    reading taken when the process began, so the time spent importing shows
+    up as the first startup phase.
+    """
+    now = time.perf_counter()
+    db = open_database(db_path or config.DATABASE_URL or config.DB_FILE, size=config.DB_POOL_SIZE)
+    app = App(db, started or now)
+    if started:
+        app.startup_phases["import"] = round(now - started, 3)
+    with app.startup_phase("init_db"):
+        init_db(app.db)
+    if app.hf_client:
+        logger.info("Hugging Face client initialized.")
+    else:
+        logger.info("Hugging Face not configured — /ask will be disabled.")
+
+    app.scheduler.register("reminder", partial(reminders.dispatch_reminders, app))
+    app.scheduler.register("snapshot", partial(economy.run_balance_snapshot, app))
+    app.scheduler.register("ranks", partial(rebuild_leaderboards, app))
+    app.scheduler.register("trivia", partial(expire_trivia, app))
+    app.scheduler.register("poll", app.poll_engine.close)
+    app.scheduler.register("prune", partial(maintenance.run_prune, app))
+    app.scheduler.register("backup", partial(maintenance.run_backup, app))
+
+    ai_cache = app.ai_cache
+    Counter("bongo_cache_requests_total", "Cache lookups by result", ["cache", "result"],
+            fn=lambda: {("ai", "hit"): ai_cache.hits, ("ai", "miss"): ai_cache.misses,
+                        ("ai", "coalesced"): ai_cache.coalesced})
+    Gauge("bongo_cache_hit_ratio", "Share of cache lookups answered without an upstream call", ["cache"],
+          fn=lambda: {("ai",): ai_cache.stats()["hit_rate"]})
+    Gauge("bongo_role_queue_depth", "Members with reaction-role changes waiting to be applied",
+          fn=lambda: {(): app.role_dispatcher.depth()})
+    Gauge("bongo_open_polls", "Polls waiting to close", fn=lambda: {(): len(app.poll_engine.polls)})
+    Gauge("bongo_outbox_depth", "Messages waiting in the outbox", ["priority"],
+          fn=lambda: {(p,): n for p, n in app.outbox.depth().items()})
+    return app
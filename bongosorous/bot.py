@@ -0,0 +1,234 @@
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from . import ai, economy, general, leaderboards, polls, profiling, reminders, roles, trivia
+from .app import App, create_app
+from .config import (BACKUP_DIR, BACKUP_INTERVAL, BALANCE_SNAPSHOT_INTERVAL, BOT_NAME, BOT_OWNER_ID, FORCE_SLASH_SYNC, LOOP_LAG_INTERVAL,
+                     OUTBOX_CLOSE_TIMEOUT, PRUNE_INTERVAL, SHARD_COUNT, SHARD_IDS, SHARDED, SLASH_SYNC_RETRIES, SLASH_SYNC_WAIT,
+                     owns_guild)
+from .economy import remove_guild_member
+from .leaderboards import BOARDS
+from .metrics import Gauge, Histogram
+from .outbox import RATE_LIMIT_LOG
+from .storage import get_meta, set_meta
+
+logger = logging.getLogger(__name__)
+
+COMMAND_SECONDS = Histogram("bongo_command_seconds", "Command handling time", ["command", "kind", "status"])
+ON_MESSAGE_SECONDS = Histogram("bongo_on_message_seconds", "on_message handling time, excluding command dispatch")
+LOOP_LAG_SECONDS = Histogram("bongo_event_loop_lag_seconds", "Extra delay seen by a periodic asyncio.sleep")
+
+# modules whose register(bot) adds commands to the bot
+COMMAND_MODULES = (general, ai, trivia, polls, reminders, economy, leaderboards, roles, profiling)
+
+async def monitor_loop_lag():
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL))
+
+class BongoTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started"] = time.perf_counter()
+        if interaction.command:
+            profiling.label_current_task("/" + interaction.command.qualified_name)
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        started = interaction.extras.get("started")
+        if started and interaction.command:
+            COMMAND_SECONDS.observe(time.perf_counter() - started, interaction.command.qualified_name, "slash", "error")
+        await super().on_error(interaction, error)
+
+class BongoBot(commands.AutoShardedBot if SHARDED else commands.Bot):
+    def __init__(self, app: App):
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        intents.messages = True
+        shard_options = {"shard_count": SHARD_COUNT, "shard_ids": SHARD_IDS} if SHARDED else {}
+        super().__init__(command_prefix="!", intents=intents, tree_cls=BongoTree, help_command=None,
+                         owner_id=BOT_OWNER_ID or None, **shard_options)
+        self.app = app
+        app.bot = self
+        self.before_invoke(self.start_command_timer)
+        self.after_invoke(self.stop_command_timer)
+
+    async def setup_hook(self):
+        app = self.app
+        app.watchdog.start(self.loop)
+        self.loop.create_task(app.xp_buffer.run(), name="xp_flusher")
+        self.loop.create_task(monitor_loop_lag(), name="loop_lag_monitor")
+        self.loop.create_task(app.poll_engine.run(), name="poll_flusher")
+        with app.startup_phase("warm"):
+            await asyncio.gather(*(self.warm(name, fn) for name, fn in (
+                ("reminders", reminders.warm_reminders),
+                ("reaction_roles", roles.warm_reaction_roles),
+                ("ai_cache", lambda _: app.ai_cache.load()),
+                ("polls", lambda _: app.poll_engine.load()),
+                ("trivia", trivia.warm_trivia),
+            )))
+        if owns_guild(None):
+            app.scheduler.schedule(time.time() + BALANCE_SNAPSHOT_INTERVAL, "snapshot", None)
+            if BACKUP_DIR:
+                app.scheduler.schedule(time.time() + BACKUP_INTERVAL, "backup", None)
+        app.scheduler.schedule(time.time() + PRUNE_INTERVAL, "prune", None)
+        app.scheduler.schedule(time.time(), "ranks", None)
+        self.loop.create_task(app.scheduler.run(), name="scheduler")
+        app.startup_phases["setup"] = round(time.perf_counter() - app.started, 3)
+
+    async def warm(self, name: str, fn: Callable[[App], Awaitable[None]]):
+        with self.app.startup_phase(f"warm:{name}"):
+            await fn(self.app)
+
+    async def close(self):
+        if self.is_closed():
+            return
+        app = self.app
+        try:
+            await app.xp_buffer.flush()
+        except Exception:
+            logger.exception("Final XP flush failed")
+        try:
+            await app.poll_engine.flush()
+        except Exception:
+            logger.exception("Final poll vote flush failed")
+        await app.outbox.close(OUTBOX_CLOSE_TIMEOUT)
+        if app.hf_client:
+            await app.hf_client.close()
+        await super().close()
+        app.watchdog.stop()
+        app.db.close()
+
+    async def start_command_timer(self, ctx):
+        ctx.started = time.perf_counter()
+        profiling.label_current_task("!" + ctx.command.qualified_name)
+
+    async def stop_command_timer(self, ctx):
+        started = getattr(ctx, "started", None)
+        if started:
+            COMMAND_SECONDS.observe(time.perf_counter() - started, ctx.command.qualified_name, "prefix",
+                                    "error" if ctx.command_failed else "ok")
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        started = interaction.extras.get("started")
+        if started:
+            COMMAND_SECONDS.observe(time.perf_counter() - started, command.qualified_name, "slash", "ok")
+
+    async def on_ready(self):
+        logger.info("Logged in as %s (id=%s)", self.user, self.user.id)
+        try:
+            await self.change_presence(activity=discord.Game(f"{BOT_NAME} — /help"))
+        except Exception:
+            pass
+        phases = self.app.startup_phases
+        if "ready" in phases:
+            return  # reconnect
+        phases["ready"] = round(time.perf_counter() - self.app.started, 3)
+        if owns_guild(None):
+            with self.app.startup_phase("tree_sync"):
+                await self.sync_command_tree()
+        else:
+            logger.info("Slash command sync is left to the process running shard 0.")
+        logger.info("Startup phases (s): %s", ", ".join(f"{k}={v}" for k, v in phases.items()))
+
+    def command_tree_hash(self) -> str:
+        payload = []
+        for cmd in self.tree.get_commands():
+            try:
+                payload.append(cmd.to_dict(self.tree))
+            except TypeError:  # discord.py < 2.4
+                payload.append(cmd.to_dict())
+        payload.sort(key=lambda c: (c.get("type", 1), c["name"]))
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    async def sync_command_tree(self):
+        """Sync slash commands only when the tree differs from the last successful sync."""
+        db = self.app.db
+        key = f"command_tree_hash:{self.application_id}"
+        digest = self.command_tree_hash()
+        if not FORCE_SLASH_SYNC and await db.read(get_meta, key) == digest:
+            logger.info("Slash commands unchanged, skipping sync.")
+            return
+        for attempt in range(SLASH_SYNC_RETRIES):
+            try:
+                synced = await self.tree.sync()
+                logger.info("Synced %d slash commands", len(synced))
+                await db.write(set_meta, key, digest)
+                return
+            except Exception:
+                logger.exception("Slash sync attempt %d failed", attempt + 1)
+                await asyncio.sleep(SLASH_SYNC_WAIT)
+        logger.error("Failed to sync slash commands after retries.")
+
+    async def on_message(self, message: discord.Message):
+        if message.author.bot:
+            return
+        app = self.app
+        start = time.perf_counter()
+        # one dict lookup unless this channel has an open question
+        solved = app.trivia_engine.check(message.channel.id, message.content)
+        if solved:
+            await trivia.reward_answer(app, message, solved)
+        app.xp_buffer.add(message.author.id, random.randint(1, 3), message.channel,
+                          message.guild.id if message.guild else None)
+        ON_MESSAGE_SECONDS.observe(time.perf_counter() - start)
+        await self.process_commands(message)
+
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if payload.user_id == self.user.id:
+            return
+        app = self.app
+        if not (payload.member and payload.member.bot):
+            app.poll_engine.react(payload.message_id, payload.user_id, str(payload.emoji), True)
+        role_id = app.reaction_roles.get((payload.guild_id, payload.message_id, str(payload.emoji)))
+        if role_id:
+            app.role_dispatcher.queue(payload.guild_id, payload.user_id, role_id, True)
+
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        app = self.app
+        app.poll_engine.react(payload.message_id, payload.user_id, str(payload.emoji), False)
+        role_id = app.reaction_roles.get((payload.guild_id, payload.message_id, str(payload.emoji)))
+        if role_id:
+            app.role_dispatcher.queue(payload.guild_id, payload.user_id, role_id, False)
+
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        scores = await self.app.db.write(remove_guild_member, payload.guild_id, payload.user.id)
+        if scores:
+            self.app.leaderboards.remove_member(payload.guild_id, payload.user.id, {b: scores[b] for b in BOARDS})
+
+    def shard_stats(self) -> List[dict]:
+        guilds: Dict[int, int] = {}
+        for g in self.guilds:
+            guilds[g.shard_id] = guilds.get(g.shard_id, 0) + 1
+        if not SHARDED:
+            return [{"id": 0, "latency": self.latency, "guilds": guilds.get(0, 0),
+                     "connected": self.is_ready() and not self.is_closed()}]
+        stats = []
+        for sid, shard in sorted(self.shards.items()):
+            stats.append({"id": sid, "latency": shard.latency, "guilds": guilds.get(sid, 0),
+                          "connected": not shard.is_closed()})
+        return stats
+
+def create_bot(app: Optional[App] = None) -> BongoBot:
+    """Build the bot around app (a fresh create_app() by default) with every command registered."""
+    bot = BongoBot(app or create_app())
+    for module in COMMAND_MODULES:
+        module.register(bot)
+    # discord.py retries 429s itself and only logs them
+    logging.getLogger("discord.http").addFilter(RATE_LIMIT_LOG)
+    Gauge("bongo_gateway_latency_seconds", "Discord gateway heartbeat latency", fn=lambda: {(): bot.latency})
+    Gauge("bongo_shard_latency_seconds", "Gateway heartbeat latency per shard", ["shard"],
+          fn=lambda: {(str(s["id"]),): s["latency"] for s in bot.shard_stats()})
+    Gauge("bongo_shard_guilds", "Guilds served per shard", ["shard"],
+          fn=lambda: {(str(s["id"]),): s["guilds"] for s in bot.shard_stats()})
+    return bot
@@ -0,0 +1,111 @@
+import os
+import socket
+from pathlib import Path
+from typing import List, Optional
+
+# Settings are read from the environment once, on first import. Nothing
+# here touches the network or the disk; main.py checks the required ones.
+
+BOT_NAME = "bongosorous"
+DB_FILE = os.environ.get("BOT_DB_PATH", "bongobot.db")
+# postgresql://... to share state between bot processes on several hosts; SQLite at DB_FILE otherwise
+DATABASE_URL = os.environ.get("BOT_DATABASE_URL", "")
+HF_MODEL = "meta-llama/Llama-3.2-3B-Instruct"
+HF_API_URL = os.environ.get("HF_API_URL", "https://router.huggingface.co/v1/chat/completions")
+HF_POOL_SIZE = 8
+AI_EDIT_INTERVAL = 1.0
+AI_MAX_CONCURRENCY = int(os.environ.get("AI_MAX_CONCURRENCY", 4))
+AI_MAX_QUEUE = int(os.environ.get("AI_MAX_QUEUE", 16))
+AI_USER_BURST = 3
+AI_USER_PER_MINUTE = 4
+AI_GUILD_BURST = 10
+AI_GUILD_PER_MINUTE = 30
+MAX_RESPONSE_LENGTH = 1900
+OUTBOX_MERGE_WINDOW = float(os.environ.get("OUTBOX_MERGE_WINDOW", 0.5))
+OUTBOX_CONCURRENCY = int(os.environ.get("OUTBOX_CONCURRENCY", 8))
+OUTBOX_CLOSE_TIMEOUT = 5
+REMINDER_RETRY = 60
+REMINDER_LEASE = 60
+REMINDER_BATCH = 100
+XP_FLUSH_INTERVAL = 10
+XP_FLUSH_THRESHOLD = 500
+SLASH_SYNC_RETRIES = 3
+SLASH_SYNC_WAIT = 2
+FORCE_SLASH_SYNC = os.environ.get("BOT_FORCE_SYNC", "0") == "1"
+HEALTH_DB_TIMEOUT = 2
+POLL_FLUSH_INTERVAL = 5
+POLL_MIN_DURATION = 5
+POLL_MAX_DURATION = 7 * 86400
+ROLE_BATCH_WINDOW = 0.5
+ROLE_EDIT_INTERVAL = 0.25
+BALANCE_SNAPSHOT_INTERVAL = 3600
+BALANCE_SNAPSHOT_SETTLE = 60
+RANK_REBUILD_INTERVAL = 900
+PRUNE_INTERVAL = 6 * 3600
+PRUNE_BATCH = 500
+PRUNE_PAUSE = 0.05
+# opt-in: users in no guild with the bot and holding no coins are deleted, XP included
+PRUNE_USERS = os.environ.get("BOT_PRUNE_USERS", "0") == "1"
+POLL_RETENTION = 30 * 86400
+VACUUM_PAGES = 1024
+BACKUP_DIR = os.environ.get("BOT_BACKUP_DIR", "")
+BACKUP_INTERVAL = 86400
+BACKUP_KEEP = int(os.environ.get("BOT_BACKUP_KEEP", 7))
+RANK_GUILD_BOARDS = 64
+LEADERBOARD_SIZE = 10
+TRIVIA_REWARD = 10
+TRIVIA_TIMEOUT = int(os.environ.get("TRIVIA_TIMEOUT", 45))
+TRIVIA_BANK = os.environ.get("TRIVIA_BANK", str(Path(__file__).parent.parent / "data" / "trivia.tsv"))
+LOOP_LAG_INTERVAL = 0.5
+# a callback holding the event loop longer than this gets its stack logged; 0 turns the watchdog off
+SLOW_CALLBACK_THRESHOLD = int(os.environ.get("BOT_SLOW_CALLBACK_MS", 250)) / 1000
+PROFILE_INTERVAL = 0.005
+PROFILE_MAX_SECONDS = 60
+PROFILE_TOP = 15
+DB_POOL_SIZE = int(os.environ.get("BOT_DB_POOL_SIZE", 4))
+AI_CACHE_SIZE = int(os.environ.get("AI_CACHE_SIZE", 512))
+AI_CACHE_TTL = int(os.environ.get("AI_CACHE_TTL", 3600))
+AI_CACHE_PERSIST = os.environ.get("AI_CACHE_PERSIST", "1") == "1"
+
+NUMBER_EMOJIS = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣"]
+
+DISCORD_TOKEN = os.environ.get("DISCORD_BOT_TOKEN")
+HF_KEY = os.environ.get("HUGGINGFACE_API_KEY")
+BOT_OWNER_ID = int(os.environ.get("BOT_OWNER_ID", "0") or 0)
+PORT = int(os.environ.get("PORT", 5000))
+# names this process in claims on shared rows (reminders); unique per running process
+WORKER_ID = os.environ.get("BOT_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+def parse_shard_ids(spec: str) -> Optional[List[int]]:
+    ids: List[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            ids.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            ids.append(int(part))
+    return sorted(set(ids)) or None
+
+SHARD_COUNT = int(os.environ.get("BOT_SHARD_COUNT", "0") or 0) or None
+SHARD_IDS = parse_shard_ids(os.environ.get("BOT_SHARD_IDS", ""))
+SHARDED = os.environ.get("BOT_SHARDED", "0") == "1" or SHARD_COUNT is not None
+
+def shard_for(guild_id: Optional[int]) -> int:
+    """Discord's shard formula; DMs always arrive on shard 0."""
+    if not guild_id or not SHARD_COUNT:
+        return 0
+    return (guild_id >> 22) % SHARD_COUNT
+
+def owns_guild(guild_id: Optional[int]) -> bool:
+    """True if this process runs the shard that receives events for guild_id."""
+    return SHARD_IDS is None or shard_for(guild_id) in SHARD_IDS
+
+def problems() -> List[str]:
+    """Settings that make starting the bot pointless."""
+    found = []
+    if not DISCORD_TOKEN:
+        found.append("DISCORD_BOT_TOKEN missing.")
+    if SHARD_IDS and not SHARD_COUNT:
+        found.append("BOT_SHARD_IDS requires BOT_SHARD_COUNT.")
+    return found
@@ -0,0 +1,178 @@
+import time
+import random
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .config import BALANCE_SNAPSHOT_INTERVAL, BALANCE_SNAPSHOT_SETTLE
+from .storage import get_meta, set_meta
+
+if TYPE_CHECKING:
+    from .app import App
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_LEDGER_KEY = "balance_snapshot_ledger_id"
+
+# Economy. Every operation below runs inside one db.write() transaction,
+# changes balances with a single conditional statement and appends the
+# movement to the ledger, so it stays correct with several bot processes
+# writing to one database.
+
+def record_ledger(conn, uid: int, delta: int, balance: int, reason: str, counterparty: Optional[int] = None):
+    conn.execute("INSERT INTO ledger (user_id, delta, balance, reason, counterparty, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                 (uid, delta, balance, reason, counterparty, int(time.time())))
+
+def credit_coins(conn, uid: int, amount: int, reason: str, counterparty: Optional[int] = None) -> int:
+    coins = conn.execute(
+        "INSERT INTO users(user_id, coins) VALUES(?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET coins = users.coins + excluded.coins RETURNING coins",
+        (uid, amount)).fetchone()["coins"]
+    record_ledger(conn, uid, amount, coins, reason, counterparty)
+    return coins
+
+def get_coins(conn, uid: int) -> int:
+    row = conn.execute("SELECT coins FROM users WHERE user_id = ?", (uid,)).fetchone()
+    return row["coins"] if row else 0
+
+def claim_daily(conn, uid: int, now: int, reward: int) -> Optional[int]:
+    """Pay the daily reward unless it was claimed in the last 24h; returns the new balance."""
+    row = conn.execute(
+        "INSERT INTO users(user_id, coins, last_daily) VALUES(?, ?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET coins = users.coins + excluded.coins, last_daily = excluded.last_daily "
+        "WHERE COALESCE(users.last_daily, 0) <= ? RETURNING coins",
+        (uid, reward, now, now - 86400)).fetchone()
+    if not row:
+        return None
+    record_ledger(conn, uid, reward, row["coins"], "daily")
+    return row["coins"]
+
+def transfer_coins(conn, src: int, dst: int, amount: int) -> Optional[Tuple[int, int]]:
+    """Move coins if src can cover them; returns both new balances."""
+    row = conn.execute("UPDATE users SET coins = coins - ? WHERE user_id = ? AND coins >= ? RETURNING coins",
+                       (amount, src, amount)).fetchone()
+    if not row:
+        return None
+    record_ledger(conn, src, -amount, row["coins"], "give", dst)
+    return row["coins"], credit_coins(conn, dst, amount, "give", src)
+
+def snapshot_balances(conn, now: Optional[int] = None) -> int:
+    """Roll snapshots forward over the ledger entries written since the last run; returns users updated.
+
+    The last ledger id covered is kept in meta, so each run reads only the
+    new id range. Entries younger than BALANCE_SNAPSHOT_SETTLE wait for the
+    next run: on PostgreSQL a transaction can still commit a lower id than
+    one already visible.
+    """
+    now = int(time.time()) if now is None else now
+    done = get_meta(conn, SNAPSHOT_LEDGER_KEY)
+    after = int(done or 0)
+    top = conn.execute("SELECT MAX(id) FROM ledger WHERE id > ? AND created_at <= ?",
+                       (after, now - BALANCE_SNAPSHOT_SETTLE)).fetchone()[0]
+    if top is None:
+        return 0
+    if done is None and conn.execute("SELECT 1 FROM balance_snapshots LIMIT 1").fetchone():
+        # snapshots written before the high-water mark existed are each at their own ledger id; catch up once
+        updated = conn.execute("""
+            INSERT INTO balance_snapshots (user_id, ledger_id, coins)
+            SELECT l.user_id, MAX(l.id), COALESCE(s.coins, 0) + SUM(l.delta)
+            FROM ledger l LEFT JOIN balance_snapshots s ON s.user_id = l.user_id
+            WHERE l.id > COALESCE(s.ledger_id, 0) AND l.id <= ?
+            GROUP BY l.user_id, s.coins
+            ON CONFLICT(user_id) DO UPDATE SET ledger_id = excluded.ledger_id, coins = excluded.coins
+        """, (top,)).rowcount
+    else:
+        updated = conn.execute("""
+            INSERT INTO balance_snapshots (user_id, ledger_id, coins)
+            SELECT user_id, MAX(id), SUM(delta) FROM ledger WHERE id > ? AND id <= ? GROUP BY user_id
+            ON CONFLICT(user_id) DO UPDATE SET ledger_id = excluded.ledger_id,
+                                               coins = balance_snapshots.coins + excluded.coins
+        """, (after, top)).rowcount
+    set_meta(conn, SNAPSHOT_LEDGER_KEY, str(top))
+    return updated
+
+def audit_balances(conn, uid: Optional[int] = None) -> List[Tuple[int, int, int]]:
+    """Return (user_id, coins, ledger_total) for every user whose balance disagrees with the ledger."""
+    sql = """
+        SELECT u.user_id, u.coins,
+               COALESCE(s.coins, 0) + COALESCE((SELECT SUM(l.delta) FROM ledger l
+                                                WHERE l.user_id = u.user_id AND l.id > COALESCE(s.ledger_id, 0)), 0) AS expected
+        FROM users u LEFT JOIN balance_snapshots s ON s.user_id = u.user_id
+    """
+    args: tuple = ()
+    if uid is not None:
+        sql += " WHERE u.user_id = ?"
+        args = (uid,)
+    return [(r["user_id"], r["coins"], r["expected"]) for r in conn.execute(sql, args) if r["coins"] != r["expected"]]
+
+def get_user_stats(conn, uid: int) -> Dict[str, int]:
+    row = conn.execute("SELECT xp, level, coins FROM users WHERE user_id = ?", (uid,)).fetchone()
+    return {k: (row[k] or 0) if row else 0 for k in ("xp", "level", "coins")}
+
+def remove_guild_member(conn, guild_id: int, uid: int) -> Optional[Dict[str, int]]:
+    """Drop a guild membership; returns the user's scores if there was one."""
+    if not conn.execute("DELETE FROM guild_members WHERE guild_id = ? AND user_id = ?", (guild_id, uid)).rowcount:
+        return None
+    return get_user_stats(conn, uid)
+
+async def run_balance_snapshot(app: "App", _):
+    try:
+        updated = await app.db.write(snapshot_balances)
+        logger.info("Balance snapshot updated %d user(s).", updated)
+    finally:
+        app.scheduler.schedule(time.time() + BALANCE_SNAPSHOT_INTERVAL, "snapshot", None)
+
+def register(bot: "BongoBot"):
+    import discord
+    from discord.ext import commands
+
+    app = bot.app
+
+    @bot.command(name="balance")
+    async def balance_cmd(ctx, member: discord.Member = None):
+        member = member or ctx.author
+        coins = await app.db.read(get_coins, member.id)
+        await ctx.send(f"{member.mention} has **{coins}** coins")
+
+    @bot.tree.command(name="daily", description="Claim your daily coins")
+    async def daily_slash(interaction: discord.Interaction):
+        reward = random.randint(50, 150)
+        coins = await app.db.write(claim_daily, interaction.user.id, int(time.time()), reward)
+        if coins is None:
+            await interaction.response.send_message("You already claimed daily.")
+        else:
+            app.leaderboards.update("coins", interaction.user.id, coins - reward, coins)
+            await interaction.response.send_message(f"🎉 You claimed **{reward}** coins!")
+
+    @bot.command(name="daily")
+    async def daily_cmd(ctx):
+        reward = random.randint(50, 150)
+        coins = await app.db.write(claim_daily, ctx.author.id, int(time.time()), reward)
+        if coins is None:
+            await ctx.send("You already claimed daily.")
+        else:
+            app.leaderboards.update("coins", ctx.author.id, coins - reward, coins)
+            await ctx.send(f"🎉 You claimed **{reward}** coins!")
+
+    @bot.command(name="give")
+    async def give_cmd(ctx, member: discord.Member, amount: int):
+        if amount <= 0:
+            await ctx.send("Amount must be > 0.")
+            return
+        balances = await app.db.write(transfer_coins, ctx.author.id, member.id, amount)
+        if not balances:
+            await ctx.send("Not enough coins.")
+            return
+        app.leaderboards.update("coins", ctx.author.id, balances[0] + amount, balances[0])
+        app.leaderboards.update("coins", member.id, balances[1] - amount, balances[1])
+        await ctx.send(f"{ctx.author.mention} gave {member.mention} **{amount}** coins!")
+
+    @bot.command(name="audit")
+    @commands.is_owner()
+    async def audit_cmd(ctx, member: discord.User = None):
+        mismatches = await app.db.read(audit_balances, member.id if member else None)
+        if not mismatches:
+            await ctx.send("✅ Balances match the ledger.")
+            return
+        lines = [f"<@{uid}>: balance {coins}, ledger {expected}" for uid, coins, expected in mismatches[:20]]
+        await ctx.send(f"⚠️ {len(mismatches)} balance(s) disagree with the ledger:\n" + "\n".join(lines))
@@ -0,0 +1,95 @@
+import random
+from typing import TYPE_CHECKING
+
+from .config import BOT_NAME
+
+if TYPE_CHECKING:
+    from .bot import BongoBot
+
+HELP_TEXT = f"""
+**{BOT_NAME} — Help**
+/ask <question> — Ask the AI (requires HF key)
+/trivia — Play trivia
+/rps <choice> — Rock Paper Scissors
+/poll <question> <opt1,opt2,...> [duration] — Poll (slash)
+!poll Question | opt1, opt2, opt3 | duration — Poll (prefix)
+!remindme 10m message — Reminder (prefix)
+/daily, !balance, !give @user amount — Economy
+/leaderboard [xp|coins] [server|global], /rank [@user] — Rankings (also !leaderboard, !rank)
+!kick, !ban, !purge — Moderation (requires perms)
+!createreactionrole <msg_id> <emoji> <@role>, !deletereactionrole <msg_id> <emoji> — Reaction roles
+!syncreactionroles [msg_id] [remove] — Re-sync reaction roles from current reactions
+"""
+
+def register(bot: "BongoBot"):
+    import discord
+    from discord import app_commands
+    from discord.ext import commands
+
+    @bot.tree.command(name="help", description="Show help")
+    async def help_slash(interaction: discord.Interaction):
+        await interaction.response.send_message(HELP_TEXT)
+
+    @bot.command(name="help")
+    async def help_prefix(ctx):
+        await ctx.send(HELP_TEXT)
+
+    @bot.tree.command(name="rps", description="Play rock-paper-scissors")
+    @app_commands.describe(choice="rock/paper/scissors")
+    async def rps_slash(interaction: discord.Interaction, choice: str):
+        opts = ["rock", "paper", "scissors"]
+        choice = choice.lower()
+        if choice not in opts:
+            await interaction.response.send_message("Choose rock / paper / scissors")
+            return
+        bot_choice = random.choice(opts)
+        if choice == bot_choice:
+            res = "Tie!"
+        elif (choice == "rock" and bot_choice == "scissors") or (choice == "paper" and bot_choice == "rock") or (choice == "scissors" and bot_choice == "paper"):
+            res = "You win!"
+        else:
+            res = "I win!"
+        await interaction.response.send_message(f"You: {choice} | Bot: {bot_choice} — {res}")
+
+    @bot.command(name="rps")
+    async def rps_prefix(ctx, choice: str):
+        opts = ["rock", "paper", "scissors"]
+        choice = choice.lower()
+        if choice not in opts:
+            await ctx.send("Choose rock / paper / scissors")
+            return
+        bot_choice = random.choice(opts)
+        if choice == bot_choice:
+            res = "Tie!"
+        elif (choice == "rock" and bot_choice == "scissors") or (choice == "paper" and bot_choice == "rock") or (choice == "scissors" and bot_choice == "paper"):
+            res = "You win!"
+        else:
+            res = "I win!"
+        await ctx.send(f"You: {choice} | Bot: {bot_choice} — {res}")
+
+    @bot.command(name="kick")
+    @commands.has_permissions(kick_members=True)
+    async def kick_cmd(ctx, member: discord.Member, *, reason: str = "No reason provided"):
+        try:
+            await member.kick(reason=reason)
+            await ctx.send(f"👢 {member.mention} was kicked.")
+        except Exception as e:
+            await ctx.send(f"Kick failed: {e}")
+
+    @bot.command(name="ban")
+    @commands.has_permissions(ban_members=True)
+    async def ban_cmd(ctx, member: discord.Member, *, reason: str = "No reason provided"):
+        try:
+            await member.ban(reason=reason)
+            await ctx.send(f"🔨 {member.mention} was banned.")
+        except Exception as e:
+            await ctx.send(f"Ban failed: {e}")
+
+    @bot.command(name="purge")
+    @commands.has_permissions(manage_messages=True)
+    async def purge_cmd(ctx, amount: int):
+        if amount < 1 or amount > 100:
+            await ctx.send("Amount must be 1-100.")
+            return
+        deleted = await ctx.channel.purge(limit=amount)
+        await ctx.send(f"Deleted {len(deleted)} messages.", delete_after=5)
@@ -0,0 +1,60 @@
+import math
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+from . import metrics
+from .config import BOT_NAME, HEALTH_DB_TIMEOUT
+from .storage import ping_db
+
+if TYPE_CHECKING:
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+def create_web_app(bot: "BongoBot") -> web.Application:
+    app = bot.app
+    routes = web.RouteTableDef()
+
+    @routes.get("/")
+    async def root(request: web.Request):
+        return web.json_response({"status": "online", "bot": BOT_NAME})
+
+    @routes.get("/health")
+    async def health(request: web.Request):
+        gateway = bot.is_ready() and not bot.is_closed() and math.isfinite(bot.latency)
+        try:
+            db_ok = await asyncio.wait_for(app.db.read(ping_db), timeout=HEALTH_DB_TIMEOUT)
+        except Exception:
+            db_ok = False
+        ok = gateway and db_ok
+        return web.json_response({
+            "ok": ok,
+            "bot": BOT_NAME,
+            "gateway": {"connected": gateway, "latency": bot.latency if gateway else None},
+            "shards": [dict(s, latency=s["latency"] if math.isfinite(s["latency"]) else None)
+                       for s in bot.shard_stats()],
+            "db": {"reachable": db_ok},
+            "ai_cache": app.ai_cache.stats(),
+            "ai": app.ai_scheduler.stats(),
+            "startup": app.startup_phases,
+        }, status=200 if ok else 503)
+
+    @routes.get("/metrics")
+    async def metrics_endpoint(request: web.Request):
+        return web.Response(body=metrics.render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    web_app = web.Application()
+    web_app.add_routes(routes)
+    return web_app
+
+async def start_web_server(bot: "BongoBot", port: int) -> web.AppRunner:
+    """Serve the health and metrics endpoints on the bot's event loop; call cleanup() on the result to stop."""
+    runner = web.AppRunner(create_web_app(bot), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    logger.info("HTTP server listening on port %s", port)
+    return runner
@@ -0,0 +1,240 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from .config import LEADERBOARD_SIZE, RANK_REBUILD_INTERVAL
+from .economy import get_user_stats
+from .ranks import RankIndex
+from .storage import Backend
+
+if TYPE_CHECKING:
+    import discord
+    from .app import App
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+BOARDS = {"xp": "xp", "coins": "coins"}
+
+def load_board(conn, board: str, guild_id: Optional[int] = None) -> Tuple[RankIndex, Optional[Set[int]]]:
+    """Build a board's RankIndex from the covering index; guild boards also return the member set."""
+    col = BOARDS[board]
+    if guild_id is None:
+        rows = conn.execute(f"SELECT {col}, user_id FROM users WHERE {col} > 0 ORDER BY {col}, user_id")
+        return RankIndex.build(rows), None
+    rows = conn.execute(
+        f"SELECT COALESCE(u.{col}, 0), u.user_id FROM guild_members m JOIN users u ON u.user_id = m.user_id "
+        f"WHERE m.guild_id = ? ORDER BY 1, 2", (guild_id,)).fetchall()
+    return RankIndex.build(r for r in rows if r[0] > 0), {r[1] for r in rows}
+
+def apply_change(index: RankIndex, uid: int, chain: List[int]):
+    """Move uid to chain[-1], dropping whichever earlier score of the chain the index still holds."""
+    for score in reversed(chain):
+        if index.remove(uid, score):
+            break
+    if chain[-1] > 0:
+        index.insert(uid, chain[-1])
+
+class Leaderboards:
+    """In-memory rankings for every board, globally and for recently used guilds.
+
+    Global boards are built at startup and kept current from each score
+    change; guild boards are built on first use and the least recently
+    used ones are dropped past RANK_GUILD_BOARDS. Changes that land while
+    a board is being built are replayed onto it afterwards. Boards are
+    rebuilt every RANK_REBUILD_INTERVAL to pick up writes made by other
+    shard processes.
+    """
+
+    def __init__(self, db: Backend, max_guilds: int):
+        self.db = db
+        self.max_guilds = max_guilds
+        self.boards: Dict[Tuple[str, Optional[int]], RankIndex] = {}
+        self.members: "OrderedDict[int, Set[int]]" = OrderedDict()
+        self.loading: Dict[Tuple[str, Optional[int]], asyncio.Future] = {}
+        self.changes: Dict[Tuple[str, Optional[int]], Dict[int, List[int]]] = {}
+        self.joining: Dict[int, Set[int]] = {}
+
+    def _keys(self, board: str, uid: int) -> List[Tuple[str, Optional[int]]]:
+        keys = [(board, None)]
+        keys.extend((board, gid) for gid, members in self.members.items() if uid in members)
+        keys.extend(k for k in self.changes if k[0] == board and k[1] is not None and k not in keys)
+        return keys
+
+    def update(self, board: str, uid: int, old: int, new: int):
+        if old == new:
+            return
+        for key in self._keys(board, uid):
+            pending = self.changes.get(key)
+            if pending is not None:
+                pending.setdefault(uid, [old]).append(new)
+            index = self.boards.get(key)
+            if index is not None:
+                apply_change(index, uid, [old, new])
+
+    def add_member(self, guild_id: int, uid: int, scores: Dict[str, int]):
+        members = self.members.get(guild_id)
+        if members is not None and uid not in members:
+            members.add(uid)
+            for board, score in scores.items():
+                if (board, guild_id) in self.boards:
+                    apply_change(self.boards[(board, guild_id)], uid, [score])
+        if guild_id in self.joining:
+            self.joining[guild_id].add(uid)
+            for board, score in scores.items():
+                pending = self.changes.get((board, guild_id))
+                if pending is not None:
+                    pending.setdefault(uid, []).append(score)
+
+    def remove_member(self, guild_id: int, uid: int, scores: Dict[str, int]):
+        members = self.members.get(guild_id)
+        if members is None or uid not in members:
+            return
+        members.discard(uid)
+        for board, score in scores.items():
+            index = self.boards.get((board, guild_id))
+            if index is not None:
+                index.remove(uid, score)
+
+    def drop_user(self, uid: int, scores: Dict[str, int]):
+        """Take a deleted user off every loaded board."""
+        for board, score in scores.items():
+            for key in self._keys(board, uid):
+                index = self.boards.get(key)
+                if index is not None:
+                    index.remove(uid, score)
+
+    def drop_guild(self, guild_id: int):
+        """Forget a guild's boards, e.g. after the bot has left it."""
+        self.members.pop(guild_id, None)
+        for board in BOARDS:
+            self.boards.pop((board, guild_id), None)
+
+    async def board(self, board: str, guild_id: Optional[int] = None) -> RankIndex:
+        key = (board, guild_id)
+        index = self.boards.get(key)
+        if index is not None:
+            if guild_id is not None:
+                self.members.move_to_end(guild_id)
+            return index
+        return await asyncio.shield(self._start(board, guild_id))
+
+    def _start(self, board: str, guild_id: Optional[int]) -> asyncio.Future:
+        key = (board, guild_id)
+        task = self.loading.get(key)
+        if task is None:
+            task = self.loading[key] = asyncio.ensure_future(self._load(board, guild_id))
+        return task
+
+    async def _load(self, board: str, guild_id: Optional[int]) -> RankIndex:
+        key = (board, guild_id)
+        self.changes[key] = {}
+        if guild_id is not None:
+            self.joining.setdefault(guild_id, set())
+        try:
+            start = time.perf_counter()
+            index, members = await self.db.read(load_board, board, guild_id)
+            if guild_id is not None:
+                members |= self.joining.get(guild_id, set())
+            for uid, chain in self.changes[key].items():
+                if members is None or uid in members:
+                    apply_change(index, uid, chain)
+            self.boards[key] = index
+            if guild_id is not None:
+                self.members[guild_id] = members | self.members.get(guild_id, set())
+                self.members.move_to_end(guild_id)
+                self._evict()
+            logger.info("Built %s leaderboard for %s: %d ranked in %.2fs", board, guild_id or "all users",
+                        len(index), time.perf_counter() - start)
+            return index
+        finally:
+            self.changes.pop(key, None)
+            self.loading.pop(key, None)
+            if guild_id is not None and not any(k[1] == guild_id for k in self.loading):
+                self.joining.pop(guild_id, None)
+
+    def _evict(self):
+        while len(self.members) > self.max_guilds:
+            guild_id, _ = self.members.popitem(last=False)
+            for board in BOARDS:
+                self.boards.pop((board, guild_id), None)
+
+    async def rebuild(self):
+        """Rebuild the global boards in the background; guild boards reload on next use."""
+        for guild_id in list(self.members):
+            for board in BOARDS:
+                self.boards.pop((board, guild_id), None)
+        self.members.clear()
+        for board in BOARDS:
+            await asyncio.shield(self._start(board, None))
+
+async def rebuild_leaderboards(app: "App", _):
+    try:
+        await app.leaderboards.rebuild()
+    finally:
+        app.scheduler.schedule(time.time() + RANK_REBUILD_INTERVAL, "ranks", None)
+
+BOARD_LABELS = {"xp": "XP", "coins": "coins"}
+
+async def leaderboard_embed(app: "App", board: str, guild: Optional["discord.Guild"], scope: str) -> "discord.Embed":
+    import discord
+
+    guild_id = guild.id if guild and scope == "server" else None
+    index = await app.leaderboards.board(board, guild_id)
+    label = BOARD_LABELS[board]
+    lines = [f"**#{index.rank(score)}** <@{uid}> — {score:,} {label}" for uid, score in index.top(LEADERBOARD_SIZE)]
+    embed = discord.Embed(title=f"🏆 {label} leaderboard — {guild.name if guild_id else 'global'}",
+                          description="\n".join(lines) or "Nobody is ranked yet.")
+    embed.set_footer(text=f"{len(index):,} ranked")
+    return embed
+
+async def rank_text(app: "App", user: "discord.abc.User", guild: Optional["discord.Guild"]) -> str:
+    stats = await app.db.read(get_user_stats, user.id)
+    lines = [f"📊 {user.mention} — level **{stats['level']}**"]
+    for board, label in BOARD_LABELS.items():
+        score = stats[board]
+        if score <= 0:
+            lines.append(f"{label}: 0 (unranked)")
+            continue
+        where = [f"#{(await app.leaderboards.board(board)).rank(score):,} global"]
+        if guild:
+            where.insert(0, f"#{(await app.leaderboards.board(board, guild.id)).rank(score):,} in {guild.name}")
+        lines.append(f"{label}: {score:,} — " + ", ".join(where))
+    return "\n".join(lines)
+
+def register(bot: "BongoBot"):
+    import discord
+    from discord import app_commands
+
+    app = bot.app
+    no_pings = discord.AllowedMentions.none()
+
+    @bot.tree.command(name="leaderboard", description="Top users by XP or coins")
+    @app_commands.describe(board="What to rank by", scope="This server or everyone")
+    @app_commands.choices(
+        board=[app_commands.Choice(name="XP", value="xp"), app_commands.Choice(name="Coins", value="coins")],
+        scope=[app_commands.Choice(name="This server", value="server"), app_commands.Choice(name="Global", value="global")])
+    async def leaderboard_slash(interaction: discord.Interaction, board: str = "xp", scope: str = "server"):
+        await interaction.response.defer()
+        await interaction.followup.send(embed=await leaderboard_embed(app, board, interaction.guild, scope))
+
+    @bot.command(name="leaderboard", aliases=["lb"])
+    async def leaderboard_prefix(ctx, board: str = "xp", scope: str = "server"):
+        board, scope = board.lower(), scope.lower()
+        if board not in BOARDS or scope not in ("server", "global"):
+            await ctx.send("Usage: !leaderboard [xp|coins] [server|global]")
+            return
+        await ctx.send(embed=await leaderboard_embed(app, board, ctx.guild, scope))
+
+    @bot.tree.command(name="rank", description="Show a member's XP and coin rank")
+    @app_commands.describe(member="Member to look up (defaults to you)")
+    async def rank_slash(interaction: discord.Interaction, member: Optional[discord.Member] = None):
+        await interaction.response.defer()
+        await interaction.followup.send(await rank_text(app, member or interaction.user, interaction.guild),
+                                        allowed_mentions=no_pings)
+
+    @bot.command(name="rank")
+    async def rank_prefix(ctx, member: discord.Member = None):
+        await ctx.send(await rank_text(app, member or ctx.author, ctx.guild), allowed_mentions=no_pings)
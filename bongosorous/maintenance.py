@@ -0,0 +1,407 @@
+"""Database upkeep: online backups, export/import and pruning.
+
+    python -m bongosorous.maintenance backup DEST
+    python -m bongosorous.maintenance export FILE [--tables users,ledger]
+    python -m bongosorous.maintenance import FILE [--merge]
+    python -m bongosorous.maintenance prune
+    python -m bongosorous.maintenance compact [--full]
+
+Each takes --database (default BOT_DATABASE_URL, then BOT_DB_PATH) and is
+safe to run next to the live bot, except ``compact --full``, which
+rewrites the whole file. The bot itself prunes every PRUNE_INTERVAL and,
+when BOT_BACKUP_DIR is set, backs up every BACKUP_INTERVAL.
+"""
+import os
+import gzip
+import json
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from . import config
+from .storage import Backend
+
+if TYPE_CHECKING:
+    from .app import App
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT = "bongosorous-export"
+EXPORT_VERSION = 1
+# in import order: nothing references a table listed after it
+EXPORT_TABLES = ("users", "guild_members", "ledger", "balance_snapshots", "reminders", "reaction_roles",
+                 "polls", "poll_votes", "trivia_channels", "ai_cache", "meta")
+IMPORT_BATCH = 1000
+BACKUP_PREFIX = "bongobot-"
+
+def backup_sqlite(conn, dest: str) -> int:
+    """Copy the live database to dest with SQLite's backup API; returns the file size.
+
+    The copy reads one snapshot, which in WAL mode doesn't block writers,
+    and is checked before it replaces dest.
+    """
+    import sqlite3
+
+    tmp = dest + ".tmp"
+    target = sqlite3.connect(tmp)
+    try:
+        conn.backup(target)
+        check = target.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        target.close()
+    if check != "ok":
+        os.remove(tmp)
+        raise RuntimeError(f"backup failed its integrity check: {check}")
+    os.replace(tmp, dest)
+    return os.path.getsize(dest)
+
+def export_tables(conn, path: str, tables: Sequence[str], snapshot: str, dialect: str) -> Dict[str, int]:
+    """Stream tables to a gzipped JSON-lines file; returns rows written per table.
+
+    The first line is a header, then each table is a {"table", "columns"}
+    line followed by one JSON array per row. Every table is read from the
+    same snapshot.
+    """
+    counts: Dict[str, int] = {}
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as out:
+        out.write(json.dumps({"format": EXPORT_FORMAT, "version": EXPORT_VERSION, "dialect": dialect,
+                              "created_at": int(time.time())}) + "\n")
+        conn.execute(snapshot)
+        try:
+            for table in tables:
+                cur = conn.execute(f"SELECT * FROM {table}")
+                out.write(json.dumps({"table": table, "columns": [d[0] for d in cur.description]}) + "\n")
+                n = 0
+                for row in cur:
+                    out.write(json.dumps(list(row), separators=(",", ":"), ensure_ascii=False) + "\n")
+                    n += 1
+                counts[table] = n
+        finally:
+            conn.execute("ROLLBACK")
+    os.replace(tmp, path)
+    return counts
+
+def import_tables(db: Backend, path: str, merge: bool = False, batch: int = IMPORT_BATCH) -> Dict[str, int]:
+    """Load an export into db in transactions of ``batch`` rows; returns rows inserted per table.
+
+    Rows whose key already exists are skipped, and columns the target
+    doesn't have are dropped. Unless merge is set the target tables must
+    be empty.
+    """
+    counts: Dict[str, int] = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != EXPORT_FORMAT or header.get("version") != EXPORT_VERSION:
+            raise ValueError(f"{path} is not a {EXPORT_FORMAT} v{EXPORT_VERSION} file")
+        table: Optional[str] = None
+        sql = ""
+        keep: List[int] = []
+        rows: list = []
+
+        def flush():
+            if rows:
+                with db.transaction() as conn:
+                    inserted = sum(conn.execute(sql, row).rowcount for row in rows)
+                counts[table] = counts.get(table, 0) + inserted
+                rows.clear()
+
+        for line in f:
+            item = json.loads(line)
+            if isinstance(item, list):
+                rows.append([item[i] for i in keep])
+                if len(rows) >= batch:
+                    flush()
+                continue
+            flush()
+            if table:
+                with db.transaction() as conn:
+                    db.sync_ids(conn, table)
+            table = item["table"]
+            if table not in EXPORT_TABLES:
+                raise ValueError(f"unknown table {table!r} in {path}")
+            with db.connection() as conn:
+                present = db.columns(conn, table)
+                if not merge and conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                    raise ValueError(f"{table} already has rows; pass merge=True to add to them")
+            keep = [i for i, c in enumerate(item["columns"]) if c in present]
+            columns = ", ".join(item["columns"][i] for i in keep)
+            marks = ", ".join("?" * len(keep))
+            sql = f"INSERT INTO {table} ({columns}) VALUES ({marks}) ON CONFLICT DO NOTHING"
+            counts.setdefault(table, 0)
+        flush()
+        if table:
+            with db.transaction() as conn:
+                db.sync_ids(conn, table)
+    return counts
+
+# Pruning. Each function handles at most ``limit`` rows in one short
+# transaction; prune() calls them repeatedly with a pause in between.
+
+def prune_closed_polls(conn, before: int, limit: int) -> int:
+    ids = [r["message_id"] for r in conn.execute(
+        "SELECT message_id FROM polls WHERE closed = 1 AND closes_at < ? LIMIT ?", (before, limit))]
+    if ids:
+        marks = ",".join("?" * len(ids))
+        conn.execute(f"DELETE FROM poll_votes WHERE poll_id IN ({marks})", ids)
+        conn.execute(f"DELETE FROM polls WHERE message_id IN ({marks})", ids)
+    return len(ids)
+
+def prune_ai_cache(conn, before: int, limit: int) -> int:
+    return conn.execute("DELETE FROM ai_cache WHERE key IN (SELECT key FROM ai_cache WHERE created_at < ? LIMIT ?)",
+                        (before, limit)).rowcount
+
+def reminder_page(conn, after: int, limit: int) -> list:
+    return conn.execute("SELECT id, guild_id, channel_id FROM reminders WHERE id > ? ORDER BY id LIMIT ?",
+                        (after, limit)).fetchall()
+
+def delete_reminder_ids(conn, ids: List[int]) -> int:
+    marks = ",".join("?" * len(ids))
+    return conn.execute(f"DELETE FROM reminders WHERE id IN ({marks})", ids).rowcount
+
+def known_guild_ids(conn) -> List[int]:
+    """Every guild with members, reminders or reaction roles on record; each part reads an index."""
+    return [r["guild_id"] for r in conn.execute(
+        "SELECT guild_id FROM guild_members UNION SELECT guild_id FROM reminders WHERE guild_id IS NOT NULL "
+        "UNION SELECT guild_id FROM reaction_roles WHERE guild_id IS NOT NULL")]
+
+def prune_guild_members(conn, guild_id: int, limit: int) -> int:
+    uids = [r["user_id"] for r in conn.execute(
+        "SELECT user_id FROM guild_members WHERE guild_id = ? LIMIT ?", (guild_id, limit))]
+    conn.executemany("DELETE FROM guild_members WHERE guild_id = ? AND user_id = ?", [(guild_id, u) for u in uids])
+    return len(uids)
+
+def prune_guild_rows(conn, table: str, guild_id: int, limit: int) -> int:
+    """Delete up to limit of a guild's reminders or reaction_roles."""
+    return conn.execute(f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE guild_id = ? LIMIT ?)",
+                        (guild_id, limit)).rowcount
+
+def empty_user_page(conn, after: int, limit: int) -> Tuple[int, List[int]]:
+    """Users after ``after`` with no coins and no pending reminders; also returns the last id looked at."""
+    rows = conn.execute("SELECT user_id, coins FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                        (after, limit)).fetchall()
+    if not rows:
+        return after, []
+    candidates = [r["user_id"] for r in rows if not r["coins"]]
+    if candidates:
+        marks = ",".join("?" * len(candidates))
+        busy = {r["user_id"] for r in conn.execute(
+            f"SELECT DISTINCT user_id FROM reminders WHERE user_id IN ({marks})", candidates)}
+        candidates = [u for u in candidates if u not in busy]
+    return rows[-1]["user_id"], candidates
+
+def delete_users(conn, uids: List[int]) -> List[Tuple[int, int]]:
+    """Delete users that still hold no coins, with their memberships and snapshot; returns (user_id, xp)."""
+    marks = ",".join("?" * len(uids))
+    gone = [(r["user_id"], r["xp"] or 0) for r in conn.execute(
+        f"DELETE FROM users WHERE user_id IN ({marks}) AND coins = 0 RETURNING user_id, xp", uids)]
+    if gone:
+        ids = [uid for uid, _ in gone]
+        marks = ",".join("?" * len(ids))
+        conn.execute(f"DELETE FROM guild_members WHERE user_id IN ({marks})", ids)
+        conn.execute(f"DELETE FROM balance_snapshots WHERE user_id IN ({marks})", ids)
+    return gone
+
+async def _drain(db: Backend, fn, *args) -> int:
+    total = 0
+    while True:
+        n = await db.write(fn, *args, config.PRUNE_BATCH)
+        total += n
+        if n < config.PRUNE_BATCH:
+            return total
+        await asyncio.sleep(config.PRUNE_PAUSE)
+
+async def compact(db: Backend) -> int:
+    """Free pages left by deletes, VACUUM_PAGES at a time."""
+    freed = 0
+    while True:
+        n = await db.compact(config.VACUUM_PAGES)
+        freed += n
+        if n < config.VACUUM_PAGES:
+            return freed
+        await asyncio.sleep(config.PRUNE_PAUSE)
+
+async def channel_gone(bot, guild_id: int, channel_id: int) -> bool:
+    import discord
+
+    if bot.get_channel(channel_id):
+        return False
+    try:
+        await bot.fetch_channel(channel_id)
+    except discord.NotFound:
+        return True
+    except discord.Forbidden:
+        # no access to a channel in a guild the bot has left
+        return bot.get_guild(guild_id) is None
+    except discord.HTTPException:
+        return False
+    return False
+
+async def prune_reminders(app: "App") -> int:
+    """Drop reminders whose channel no longer exists, for the guilds this process serves.
+
+    Each channel is looked up once per run, however many reminders point at it.
+    """
+    bot, removed, after = app.bot, 0, 0
+    gone: Dict[int, bool] = {}
+    while True:
+        rows = await app.db.read(reminder_page, after, config.PRUNE_BATCH)
+        if not rows:
+            return removed
+        after = rows[-1]["id"]
+        rows = [r for r in rows if r["guild_id"] and config.owns_guild(r["guild_id"])]
+        for guild_id, channel_id in {(r["guild_id"], r["channel_id"]) for r in rows}:
+            if channel_id not in gone:
+                gone[channel_id] = await channel_gone(bot, guild_id, channel_id)
+        dead = [r["id"] for r in rows if gone[r["channel_id"]]]
+        if dead:
+            removed += await app.db.write(delete_reminder_ids, dead)
+        await asyncio.sleep(config.PRUNE_PAUSE)
+
+async def prune_left_guilds(app: "App") -> int:
+    """Forget guilds the bot has left (memberships, reminders, reaction roles); returns rows removed.
+
+    Needs every guild in view, so it only runs in a process that serves all shards.
+    """
+    guild_ids = {g.id for g in app.bot.guilds}
+    removed = 0
+    for guild_id in await app.db.read(known_guild_ids):
+        if guild_id in guild_ids:
+            continue
+        removed += await _drain(app.db, prune_guild_members, guild_id)
+        for table in ("reminders", "reaction_roles"):
+            removed += await _drain(app.db, prune_guild_rows, table, guild_id)
+        app.leaderboards.drop_guild(guild_id)
+        for key in [k for k in app.reaction_roles if k[0] == guild_id]:
+            del app.reaction_roles[key]
+    return removed
+
+async def prune_departed(app: "App") -> int:
+    """Delete users the bot shares no guild with and who hold no coins, XP included; returns users removed.
+
+    Opt-in via BOT_PRUNE_USERS, and like prune_left_guilds() only run in a
+    process that serves all shards.
+    """
+    bot, users, after = app.bot, 0, 0
+    while True:
+        last, candidates = await app.db.read(empty_user_page, after, config.PRUNE_BATCH)
+        if last == after:
+            return users
+        after = last
+        departed = [uid for uid in candidates if bot.get_user(uid) is None]
+        if departed:
+            for uid, xp in await app.db.write(delete_users, departed):
+                app.leaderboards.drop_user(uid, {"xp": xp, "coins": 0})
+                users += 1
+        await asyncio.sleep(config.PRUNE_PAUSE)
+
+async def prune(app: Optional["App"], db: Backend) -> Dict[str, int]:
+    """Run every prune step in small transactions, then give the freed pages back.
+
+    Steps that need Discord (dead reminder channels, departed users) are
+    skipped without a ready bot.
+    """
+    now = int(time.time())
+    removed = {
+        "polls": await _drain(db, prune_closed_polls, now - config.POLL_RETENTION),
+        "ai_cache": await _drain(db, prune_ai_cache, now - config.AI_CACHE_TTL),
+    }
+    bot = app.bot if app else None
+    if bot and bot.is_ready():
+        removed["reminders"] = await prune_reminders(app)
+        if config.SHARD_IDS is None:
+            removed["left_guilds"] = await prune_left_guilds(app)
+            if config.PRUNE_USERS:
+                removed["users"] = await prune_departed(app)
+    removed["pages"] = await compact(db)
+    return removed
+
+async def run_prune(app: "App", _):
+    try:
+        removed = await prune(app, app.db)
+        logger.info("Prune finished: %s", ", ".join(f"{k} {v}" for k, v in removed.items()))
+    except Exception:
+        logger.exception("Prune failed")
+    finally:
+        app.scheduler.schedule(time.time() + config.PRUNE_INTERVAL, "prune", None)
+
+async def backup_to_dir(db: Backend, directory: str, keep: int) -> Path:
+    """Write a timestamped backup into directory and delete all but the newest ``keep``."""
+    if db.dialect != "sqlite":
+        raise ValueError("online backups need the SQLite backend; use pg_dump for PostgreSQL")
+    folder = Path(directory)
+    folder.mkdir(parents=True, exist_ok=True)
+    dest = folder / f"{BACKUP_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}.db"
+    size = await db.read(backup_sqlite, str(dest))
+    logger.info("Backed up the database to %s (%d bytes)", dest, size)
+    for old in sorted(folder.glob(f"{BACKUP_PREFIX}*.db"))[:-keep]:
+        old.unlink()
+    return dest
+
+async def run_backup(app: "App", _):
+    try:
+        await backup_to_dir(app.db, config.BACKUP_DIR, config.BACKUP_KEEP)
+    except Exception:
+        logger.exception("Scheduled backup failed")
+    finally:
+        app.scheduler.schedule(time.time() + config.BACKUP_INTERVAL, "backup", None)
+
+def main():
+    import argparse
+
+    from .storage import init_db, open_database
+
+    parser = argparse.ArgumentParser(prog="python -m bongosorous.maintenance")
+    parser.add_argument("--database", default=config.DATABASE_URL or config.DB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backup", help="copy the SQLite database while the bot runs").add_argument("dest")
+    export = sub.add_parser("export", help="write tables to a gzipped JSON-lines file")
+    export.add_argument("file")
+    export.add_argument("--tables", default=",".join(EXPORT_TABLES))
+    load = sub.add_parser("import", help="load a file written by export")
+    load.add_argument("file")
+    load.add_argument("--merge", action="store_true", help="add to tables that already have rows")
+    sub.add_parser("prune", help="delete closed polls and expired AI answers, then compact")
+    full = sub.add_parser("compact", help="return free pages to the filesystem")
+    full.add_argument("--full", action="store_true",
+                      help="VACUUM the whole file (and switch it to incremental auto-vacuum); blocks writers")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    db = open_database(args.database, size=2)
+    try:
+        init_db(db)
+        if args.command == "backup":
+            if db.dialect != "sqlite":
+                parser.error("online backups need the SQLite backend; use pg_dump for PostgreSQL")
+            print(f"{args.dest}: {asyncio.run(db.read(backup_sqlite, args.dest))} bytes")
+        elif args.command == "export":
+            tables = [t for t in args.tables.split(",") if t]
+            unknown = set(tables) - set(EXPORT_TABLES)
+            if unknown:
+                parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+            counts = asyncio.run(db.read(export_tables, args.file, tables, db.snapshot, db.dialect))
+            print(json.dumps(counts))
+        elif args.command == "import":
+            try:
+                print(json.dumps(import_tables(db, args.file, args.merge)))
+            except ValueError as e:
+                parser.error(str(e))
+        elif args.command == "prune":
+            print(json.dumps(asyncio.run(prune(None, db))))
+        elif args.full:
+            if db.dialect != "sqlite":
+                parser.error("--full is SQLite-only; PostgreSQL's autovacuum already does this")
+            with db.connection() as conn:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+            print("vacuumed")
+        else:
+            print(json.dumps({"pages": asyncio.run(compact(db))}))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Sequence, Tuple
+
+# Instruments are plain dicts and lists with no locks. Updates from the
+# event loop are exact; the few updates made from DB worker threads may
+# very rarely lose an increment, which is fine for monitoring.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# keyed by name: registering a name again (e.g. a second create_app()) replaces the old metric
+REGISTRY: Dict[str, "Metric"] = {}
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        REGISTRY[name] = self
+
+    def samples(self) -> Iterator[str]:
+        return iter(())
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(line + "\n" for line in self.samples())
+
+class _Valued(Metric):
+    """Metric holding one value per label set, or reading them from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 fn: Callable[[], Dict[Tuple, float]] = None):
+        super().__init__(name, help, labels)
+        self.values: Dict[Tuple, float] = {}
+        self.fn = fn
+
+    def samples(self):
+        values = self.values
+        if self.fn:
+            try:
+                values = self.fn()
+            except Exception:
+                values = {}
+        for key, value in list(values.items()):
+            yield f"{self.name}{_labels(self.labels, key)} {_fmt(value)}"
+
+class Counter(_Valued):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+class Gauge(_Valued):
+    kind = "gauge"
+
+    def set(self, value: float, *labels):
+        self.values[labels] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            # one slot per bucket, one for +Inf, then the running sum
+            series = self.series.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        for key, series in list(self.series.items()):
+            series = list(series)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = 'le="%s"' % _fmt(bound)
+                yield f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, key)} {_fmt(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labels, key)} {cumulative}"
+
+def render() -> str:
+    return "".join(m.render() for m in list(REGISTRY.values()))
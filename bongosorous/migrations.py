@@ -0,0 +1,281 @@
+"""Ordered schema migrations, recorded in the schema_version table.
+
+    python -m bongosorous.migrations [--database ...] status
+    python -m bongosorous.migrations [--database ...] upgrade [--to N]
+
+init_db() runs every pending migration at startup, each in its own
+transaction, so a database is always at one of the versions below. Add
+changes as a new function at the end of MIGRATIONS and never edit one that
+has shipped. Statements are written for SQLite and go through
+``db.ddl()``, and migrations only add tables, columns and indexes so older
+processes sharing the database keep working.
+"""
+import re
+import time
+import logging
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .storage import Backend
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at INTEGER NOT NULL
+);
+"""
+
+def _baseline(db: "Backend", conn):
+    """The schema init_db() created before migrations; a no-op on databases that already have it."""
+    def ddl(sql: str):
+        conn.execute(db.ddl(sql))
+
+    ddl("""
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        coins INTEGER DEFAULT 0,
+        xp INTEGER DEFAULT 0,
+        level INTEGER DEFAULT 0,
+        last_daily INTEGER DEFAULT 0
+    );
+    """)
+    ddl("""
+    CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        guild_id INTEGER,
+        channel_id INTEGER,
+        remind_at INTEGER,
+        content TEXT,
+        claimed_by TEXT,
+        claimed_until REAL
+    );
+    """)
+    ddl("""
+    CREATE TABLE IF NOT EXISTS reaction_roles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER,
+        message_id INTEGER,
+        emoji TEXT,
+        role_id INTEGER
+    );
+    """)
+    ddl("CREATE INDEX IF NOT EXISTS idx_reminders_remind_at ON reminders(remind_at)")
+    reminder_columns = db.columns(conn, "reminders")
+    if "claimed_by" not in reminder_columns:
+        ddl("ALTER TABLE reminders ADD COLUMN claimed_by TEXT")
+    if "claimed_until" not in reminder_columns:
+        ddl("ALTER TABLE reminders ADD COLUMN claimed_until REAL")
+    if "channel_id" not in db.columns(conn, "reaction_roles"):
+        ddl("ALTER TABLE reaction_roles ADD COLUMN channel_id INTEGER")
+    ddl("CREATE INDEX IF NOT EXISTS idx_reaction_roles_lookup "
+        "ON reaction_roles(guild_id, message_id, emoji, role_id)")
+    ddl("""
+    CREATE TABLE IF NOT EXISTS ai_cache (
+        key TEXT PRIMARY KEY,
+        response TEXT,
+        created_at INTEGER
+    );
+    """)
+    has_ledger = db.table_exists(conn, "ledger")
+    ddl("""
+    CREATE TABLE IF NOT EXISTS ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        delta INTEGER NOT NULL,
+        balance INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        counterparty INTEGER,
+        created_at INTEGER NOT NULL
+    );
+    """)
+    ddl("CREATE INDEX IF NOT EXISTS idx_ledger_user ON ledger(user_id, id)")
+    ddl("""
+    CREATE TABLE IF NOT EXISTS balance_snapshots (
+        user_id INTEGER PRIMARY KEY,
+        ledger_id INTEGER NOT NULL,
+        coins INTEGER NOT NULL
+    );
+    """)
+    ddl("""
+    CREATE TABLE IF NOT EXISTS guild_members (
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        PRIMARY KEY (guild_id, user_id)
+    ) WITHOUT ROWID;
+    """)
+    ddl("CREATE INDEX IF NOT EXISTS idx_users_xp ON users(xp, user_id)")
+    ddl("CREATE INDEX IF NOT EXISTS idx_users_coins ON users(coins, user_id)")
+    ddl("""
+    CREATE TABLE IF NOT EXISTS polls (
+        message_id INTEGER PRIMARY KEY,
+        guild_id INTEGER,
+        channel_id INTEGER NOT NULL,
+        author_id INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        options TEXT NOT NULL,
+        closes_at INTEGER NOT NULL,
+        closed INTEGER NOT NULL DEFAULT 0
+    );
+    """)
+    ddl("CREATE INDEX IF NOT EXISTS idx_polls_open ON polls(closes_at) WHERE closed = 0")
+    ddl("""
+    CREATE TABLE IF NOT EXISTS poll_votes (
+        poll_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        option INTEGER NOT NULL,
+        PRIMARY KEY (poll_id, user_id)
+    ) WITHOUT ROWID;
+    """)
+    ddl("""
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """)
+    ddl("""
+    CREATE TABLE IF NOT EXISTS trivia_channels (
+        channel_id INTEGER PRIMARY KEY,
+        guild_id INTEGER,
+        cycle_start INTEGER NOT NULL,
+        cycle_stride INTEGER NOT NULL,
+        cycle_pos INTEGER NOT NULL,
+        question_index INTEGER,
+        question TEXT,
+        deadline REAL
+    );
+    """)
+    if not has_ledger:
+        # balances that predate the ledger become its opening entries
+        conn.execute("INSERT INTO ledger (user_id, delta, balance, reason, created_at) "
+                     "SELECT user_id, coins, coins, 'opening', ? FROM users WHERE coins != 0", (int(time.time()),))
+
+def _covering_indexes(db: "Backend", conn):
+    """Indexes that answer the remaining lookups without touching the table."""
+    # warm_reminders reads (id, remind_at, guild_id) for every row; from this index alone
+    conn.execute("DROP INDEX IF EXISTS idx_reminders_remind_at")
+    conn.execute(db.ddl("CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(remind_at, id, guild_id)"))
+    # the prune job skips users with pending reminders
+    conn.execute(db.ddl("CREATE INDEX IF NOT EXISTS idx_reminders_user ON reminders(user_id)"))
+    # /reactionroles lists a guild's roles with their channel
+    conn.execute("DROP INDEX IF EXISTS idx_reaction_roles_lookup")
+    conn.execute(db.ddl("CREATE INDEX IF NOT EXISTS idx_reaction_roles_guild "
+                        "ON reaction_roles(guild_id, message_id, emoji, role_id, channel_id)"))
+    # expiry and warm-up of the AI cache
+    conn.execute(db.ddl("CREATE INDEX IF NOT EXISTS idx_ai_cache_created ON ai_cache(created_at)"))
+    # the prune job's closed-poll sweep; the open ones already have idx_polls_open
+    conn.execute(db.ddl("CREATE INDEX IF NOT EXISTS idx_polls_closed ON polls(closes_at) WHERE closed = 1"))
+
+def _guild_dimension(db: "Backend", conn):
+    """Look rows up by guild, and a user's guilds by user, without a scan."""
+    conn.execute(db.ddl("CREATE INDEX IF NOT EXISTS idx_guild_members_user ON guild_members(user_id, guild_id)"))
+    conn.execute(db.ddl("CREATE INDEX IF NOT EXISTS idx_reminders_guild ON reminders(guild_id, id)"))
+
+Migration = Tuple[int, str, Callable[["Backend", object], None]]
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    (1, "baseline", _baseline),
+    (2, "covering indexes", _covering_indexes),
+    (3, "guild dimension", _guild_dimension),
+)
+LATEST = MIGRATIONS[-1][0]
+
+def applied_versions(conn) -> Dict[int, int]:
+    """version -> applied_at for every migration recorded in the database."""
+    return {r["version"]: r["applied_at"] for r in conn.execute("SELECT version, applied_at FROM schema_version")}
+
+def migrate(db: "Backend", target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to target (default: all); returns the versions applied.
+
+    Each runs in its own transaction, under the backend's schema lock, and
+    is skipped if another process recorded it first.
+    """
+    with db.transaction() as conn:
+        db.prepare(conn)
+        conn.execute(db.ddl(SCHEMA_VERSION_TABLE))
+        done = applied_versions(conn)
+    if done and max(done) > LATEST:
+        logger.warning("Database schema is at version %d, newer than this build's %d", max(done), LATEST)
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        start = time.perf_counter()
+        with db.transaction() as conn:
+            db.lock_schema(conn)
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                continue
+            fn(db, conn)
+            conn.execute("INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                         (version, name, int(time.time())))
+        logger.info("Applied migration %d (%s) in %.2fs", version, name, time.perf_counter() - start)
+        applied.append(version)
+    return applied
+
+# Query plan checks (SQLite only). A SCAN step walks a whole table, or a
+# whole index with a table lookup per entry; only a walk over a covering
+# index (which is the data itself) or a partial index (which holds only the
+# matching rows) is acceptable for statements that filter rows. Statements without WHERE want every row and aren't checked.
+
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW$)\w+(?!.*\bCOVERING INDEX\b)(?: USING INDEX (\w+))?")
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+
+def statement_shape(sql: str) -> str:
+    """sql with literals replaced by ? and IN lists collapsed, to group traced statements."""
+    return " ".join(LISTS.sub("?", LITERALS.sub("?", sql)).split())
+
+def query_plan(conn, sql: str, args: Iterable = ()) -> List[str]:
+    return [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(args))]
+
+def full_scans(conn, statements: Iterable[str]) -> Dict[str, List[str]]:
+    """Plan each distinct statement shape; returns shape -> full-scan steps for those that filter rows."""
+    found: Dict[str, List[str]] = {}
+    seen = set()
+    partial = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")}
+    for sql in statements:
+        shape = statement_shape(sql)
+        if shape in seen or " WHERE " not in f" {shape.upper()} ":
+            continue
+        seen.add(shape)
+        scans = []
+        for step in query_plan(conn, sql):
+            match = FULL_SCAN.match(step)
+            if match and match.group(1) not in partial:
+                scans.append(step)
+        if scans:
+            found[shape] = scans
+    return found
+
+def main():
+    import argparse
+
+    from . import config
+    from .storage import open_database
+
+    parser = argparse.ArgumentParser(prog="python -m bongosorous.migrations")
+    parser.add_argument("--database", default=config.DATABASE_URL or config.DB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="list applied and pending migrations")
+    upgrade = sub.add_parser("upgrade", help="apply pending migrations")
+    upgrade.add_argument("--to", type=int, help="stop after this version")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    db = open_database(args.database, size=2)
+    try:
+        if args.command == "upgrade":
+            migrate(db, args.to)
+        with db.connection() as conn:
+            done = applied_versions(conn) if db.table_exists(conn, "schema_version") else {}
+        for version, name, _ in MIGRATIONS:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(done[version])) if version in done else "pending"
+            print(f"{version:>4}  {name:<20}  {when}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
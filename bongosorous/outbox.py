@@ -0,0 +1,222 @@
+import heapq
+import asyncio
+import logging
+import itertools
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
+
+from .config import MAX_RESPONSE_LENGTH, OUTBOX_CONCURRENCY, OUTBOX_MERGE_WINDOW
+from .metrics import Counter
+
+if TYPE_CHECKING:
+    import discord
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, BULK = 0, 1
+PRIORITY_NAMES = ("interactive", "bulk")
+
+OUTBOX_MESSAGES = Counter("bongo_outbox_messages_total", "Messages queued for sending", ["priority"])
+OUTBOX_SENDS = Counter("bongo_outbox_sends_total", "channel.send calls made by the outbox", ["priority", "status"])
+RATE_LIMITED = Counter("bongo_discord_rate_limited_total", "429 responses from Discord", ["scope"])
+
+class RateLimitLog(logging.Filter):
+    """Counts the 429s discord.py retries internally, which it only reports by logging them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.msg, str):
+            if "responded with 429" in record.msg:
+                RATE_LIMITED.inc("route")
+            elif record.msg.startswith("Global rate limit"):
+                RATE_LIMITED.inc("global")
+        return True
+
+RATE_LIMIT_LOG = RateLimitLog()
+
+def split_message(text: str, limit: int = MAX_RESPONSE_LENGTH) -> List[str]:
+    """Cut text into pieces of at most limit characters, preferring line, then word boundaries."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            chunks.append(text[:limit])
+            text = text[limit:]
+        else:
+            chunks.append(text[:cut])
+            text = text[cut + 1:]
+    if text or not chunks:
+        chunks.append(text)
+    return chunks
+
+def pack_messages(contents: List[str], limit: int = MAX_RESPONSE_LENGTH) -> List[Tuple[str, List[int]]]:
+    """Join messages line by line into as few sends as fit under limit.
+
+    Returns (text, indexes of the messages it carries) per send; a message
+    longer than limit is split over several.
+    """
+    packed: List[Tuple[str, List[int]]] = []
+    text, carried = "", []
+    for i, content in enumerate(contents):
+        for part in split_message(content, limit):
+            if carried and len(text) + 1 + len(part) > limit:
+                packed.append((text, carried))
+                text, carried = "", []
+            text = f"{text}\n{part}" if carried else part
+            if not carried or carried[-1] != i:
+                carried.append(i)
+    if carried:
+        packed.append((text, carried))
+    return packed
+
+class SendSlots:
+    """Caps concurrent sends; waiting interactive sends get the next free slot before bulk ones."""
+
+    def __init__(self, size: int):
+        self.free = size
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int):
+        if self.free and not self.waiters:
+            self.free -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self.waiters:
+            _, _, fut = heapq.heappop(self.waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.free += 1
+
+class ChannelQueue:
+    __slots__ = ("channel", "interactive", "bulk", "wake")
+
+    def __init__(self, channel: "discord.abc.Messageable"):
+        self.channel = channel
+        self.interactive: Deque[Tuple[str, asyncio.Future]] = deque()
+        self.bulk: Deque[Tuple[str, asyncio.Future]] = deque()
+        self.wake = asyncio.Event()
+
+class Outbox:
+    """Per-channel queues for the messages the bot posts on its own.
+
+    Bulk notifications (level-ups, reminders, poll results) wait
+    OUTBOX_MERGE_WINDOW seconds so a burst in one channel goes out as a
+    few merged messages instead of one REST call each. Interactive
+    replies skip the wait and go ahead of queued bulk messages, both in
+    their channel and for the OUTBOX_CONCURRENCY send slots shared by all
+    channels. send() returns a future that resolves to True once the
+    message is posted, or its channel no longer exists, and False if it
+    could not be sent.
+    """
+
+    def __init__(self, concurrency: int = OUTBOX_CONCURRENCY, window: float = OUTBOX_MERGE_WINDOW):
+        self.window = window
+        self.slots = SendSlots(concurrency)
+        self.queues: Dict[int, ChannelQueue] = {}
+        self.workers: Dict[int, asyncio.Task] = {}
+
+    def send(self, channel: "discord.abc.Messageable", content: str, interactive: bool = False) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = ChannelQueue(channel)
+        if interactive:
+            queue.interactive.append((content, fut))
+            queue.wake.set()
+        else:
+            queue.bulk.append((content, fut))
+        OUTBOX_MESSAGES.inc(PRIORITY_NAMES[INTERACTIVE if interactive else BULK])
+        if channel.id not in self.workers:
+            self.workers[channel.id] = asyncio.create_task(self._drain(channel.id), name=f"outbox:{channel.id}")
+        return fut
+
+    def depth(self) -> Dict[str, int]:
+        return {"interactive": sum(len(q.interactive) for q in self.queues.values()),
+                "bulk": sum(len(q.bulk) for q in self.queues.values())}
+
+    async def _drain(self, channel_id: int):
+        queue = self.queues[channel_id]
+        try:
+            while queue.interactive or queue.bulk:
+                if not queue.interactive and self.window:
+                    queue.wake.clear()
+                    try:
+                        await asyncio.wait_for(queue.wake.wait(), timeout=self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                if queue.interactive:
+                    priority, batch = INTERACTIVE, [queue.interactive.popleft()]
+                else:
+                    priority, batch = BULK, list(queue.bulk)
+                    queue.bulk.clear()
+                delay = await self._send(queue, priority, batch)
+                if delay:
+                    await asyncio.sleep(delay)
+        except Exception:
+            logger.exception("Outbox for channel %s failed", channel_id)
+        finally:
+            self.workers.pop(channel_id, None)
+            if queue.interactive or queue.bulk:
+                self.workers[channel_id] = asyncio.create_task(self._drain(channel_id), name=f"outbox:{channel_id}")
+            else:
+                self.queues.pop(channel_id, None)
+
+    async def _send(self, queue: ChannelQueue, priority: int, batch: List[Tuple[str, asyncio.Future]]) -> float:
+        """Post a batch; returns how long to wait before the channel's next send."""
+        import discord
+
+        label = PRIORITY_NAMES[priority]
+        ok = [True] * len(batch)
+        packed = pack_messages([content for content, _ in batch])
+        for n, (text, carried) in enumerate(packed):
+            await self.slots.acquire(priority)
+            try:
+                await queue.channel.send(text)
+                OUTBOX_SENDS.inc(label, "ok")
+            except discord.NotFound:
+                OUTBOX_SENDS.inc(label, "gone")
+                break
+            except Exception as e:
+                if isinstance(e, discord.RateLimited) or getattr(e, "status", None) == 429:
+                    # discord.py gave up waiting; put the unsent messages back in front and pause this channel
+                    RATE_LIMITED.inc("outbox")
+                    OUTBOX_SENDS.inc(label, "rate_limited")
+                    unsent = sorted({i for _, idx in packed[n:] for i in idx})
+                    target = queue.interactive if priority == INTERACTIVE else queue.bulk
+                    target.extendleft(reversed([batch[i] for i in unsent]))
+                    self._resolve(batch, ok, skip=set(unsent))
+                    return getattr(e, "retry_after", None) or 5.0
+                OUTBOX_SENDS.inc(label, "error")
+                logger.exception("Failed to send to channel %s", queue.channel.id)
+                for i in carried:
+                    ok[i] = False
+            finally:
+                self.slots.release()
+        self._resolve(batch, ok)
+        return 0
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[str, asyncio.Future]], ok: List[bool], skip: Optional[set] = None):
+        for i, (_, fut) in enumerate(batch):
+            if not fut.done() and not (skip and i in skip):
+                fut.set_result(ok[i])
+
+    async def close(self, timeout: float):
+        """Send what is queued without waiting out merge windows, for up to timeout seconds."""
+        self.window = 0
+        for queue in self.queues.values():
+            queue.wake.set()
+        if self.workers:
+            await asyncio.wait(list(self.workers.values()), timeout=timeout)
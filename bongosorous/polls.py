@@ -0,0 +1,222 @@
+import json
+import time
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import NUMBER_EMOJIS, POLL_FLUSH_INTERVAL, POLL_MAX_DURATION, POLL_MIN_DURATION, owns_guild
+
+if TYPE_CHECKING:
+    import discord
+    from .app import App
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+def create_poll(conn, message_id: int, guild_id: Optional[int], channel_id: int, author_id: int,
+                question: str, options: List[str], closes_at: int):
+    conn.execute("INSERT INTO polls (message_id, guild_id, channel_id, author_id, question, options, closes_at) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                 (message_id, guild_id, channel_id, author_id, question, json.dumps(options), closes_at))
+
+def save_votes(conn, changes: Dict[Tuple[int, int], Optional[int]]):
+    conn.executemany("INSERT INTO poll_votes (poll_id, user_id, option) VALUES (?, ?, ?) "
+                     "ON CONFLICT(poll_id, user_id) DO UPDATE SET option = excluded.option",
+                     [(pid, uid, opt) for (pid, uid), opt in changes.items() if opt is not None])
+    conn.executemany("DELETE FROM poll_votes WHERE poll_id = ? AND user_id = ?",
+                     [key for key, opt in changes.items() if opt is None])
+
+def close_polls(conn, ids: List[int]) -> Dict[int, Dict[int, int]]:
+    """Close the polls still open and return {poll_id: {option: votes}} for them.
+
+    Polls another process already closed are left out, so only one posts
+    the results; the counts come from the table so they include votes
+    every process has flushed.
+    """
+    marks = ",".join("?" * len(ids))
+    closed = {r["message_id"]: {} for r in conn.execute(
+        f"UPDATE polls SET closed = 1 WHERE message_id IN ({marks}) AND closed = 0 RETURNING message_id", ids)}
+    if closed:
+        marks = ",".join("?" * len(closed))
+        for r in conn.execute(f"SELECT poll_id, option, COUNT(*) AS n FROM poll_votes WHERE poll_id IN ({marks}) "
+                              "GROUP BY poll_id, option", list(closed)):
+            closed[r["poll_id"]][r["option"]] = r["n"]
+    return closed
+
+def load_open_polls(conn) -> Tuple[list, list]:
+    polls = conn.execute("SELECT message_id, guild_id, channel_id, question, options, closes_at "
+                         "FROM polls WHERE closed = 0").fetchall()
+    votes = conn.execute("SELECT v.poll_id, v.user_id, v.option FROM poll_votes v "
+                         "JOIN polls p ON p.message_id = v.poll_id WHERE p.closed = 0").fetchall()
+    return polls, votes
+
+POLL_EMOJI_INDEX = {e: i for i, e in enumerate(NUMBER_EMOJIS)}
+
+class Poll:
+    __slots__ = ("message_id", "guild_id", "channel_id", "question", "options", "closes_at", "votes", "tallies")
+
+    def __init__(self, message_id: int, guild_id: Optional[int], channel_id: int, question: str,
+                 options: List[str], closes_at: int):
+        self.message_id = message_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.question = question
+        self.options = options
+        self.closes_at = closes_at
+        self.votes: Dict[int, int] = {}
+        self.tallies = [0] * len(options)
+
+    def vote(self, uid: int, option: Optional[int]) -> bool:
+        """Set or clear a user's vote; returns False if nothing changed."""
+        previous = self.votes.get(uid)
+        if previous == option:
+            return False
+        if previous is not None:
+            self.tallies[previous] -= 1
+        if option is None:
+            del self.votes[uid]
+        else:
+            self.votes[uid] = option
+            self.tallies[option] += 1
+        return True
+
+class PollEngine:
+    """Open polls held in memory and tallied from raw reaction events.
+
+    Each user has at most one vote per poll: reacting with another number
+    moves it, and removing the reaction that holds it withdraws it. Vote
+    changes are written to the database in batches every
+    POLL_FLUSH_INTERVAL, and polls close through the shared scheduler, so
+    open polls cost no task and survive restarts.
+    """
+
+    def __init__(self, app: "App"):
+        self.app = app
+        self.polls: Dict[int, Poll] = {}
+        self.pending: Dict[Tuple[int, int], Optional[int]] = {}
+        self._lock = asyncio.Lock()
+
+    def add(self, poll: Poll):
+        self.polls[poll.message_id] = poll
+        self.app.scheduler.schedule(poll.closes_at, "poll", poll.message_id)
+
+    def react(self, message_id: int, uid: int, emoji: str, added: bool):
+        poll = self.polls.get(message_id)
+        if poll is None:
+            return
+        option = POLL_EMOJI_INDEX.get(emoji)
+        if option is None or option >= len(poll.options):
+            return
+        if not added:
+            if poll.votes.get(uid) != option:
+                return
+            option = None
+        if poll.vote(uid, option):
+            self.pending[(message_id, uid)] = option
+
+    async def flush(self):
+        async with self._lock:
+            if not self.pending:
+                return
+            changes, self.pending = self.pending, {}
+            try:
+                await self.app.db.write(save_votes, changes)
+            except Exception:
+                logger.exception("Poll vote flush failed, requeueing %d change(s)", len(changes))
+                self.pending = {**changes, **self.pending}
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(POLL_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Poll flusher error")
+
+    async def load(self):
+        polls, votes = await self.app.db.read(load_open_polls)
+        for r in polls:
+            if owns_guild(r["guild_id"]):
+                self.add(Poll(r["message_id"], r["guild_id"], r["channel_id"], r["question"],
+                              json.loads(r["options"]), r["closes_at"]))
+        for v in votes:
+            poll = self.polls.get(v["poll_id"])
+            if poll and v["option"] < len(poll.options):
+                poll.vote(v["user_id"], v["option"])
+        logger.info("Loaded %d open polls.", len(self.polls))
+
+    async def close(self, ids: List[int]):
+        bot = self.app.bot
+        await bot.wait_until_ready()
+        closing = [self.polls.pop(i) for i in ids if i in self.polls]
+        if not closing:
+            return
+        await self.flush()
+        results = await self.app.db.write(close_polls, [p.message_id for p in closing])
+        for poll in closing:
+            channel = bot.get_channel(poll.channel_id)
+            if poll.message_id not in results or not channel:
+                continue
+            tallies = results[poll.message_id]
+            lines = [f"**{o}** — {tallies.get(i, 0)} vote(s)" for i, o in enumerate(poll.options)]
+            self.app.outbox.send(channel, f"🗳️ Poll results: {poll.question}\n" + "\n".join(lines))
+
+def parse_poll_options(options: str) -> Optional[List[str]]:
+    opts = [o.strip() for o in options.split(",") if o.strip()]
+    return opts if 2 <= len(opts) <= len(NUMBER_EMOJIS) else None
+
+async def open_poll(app: "App", post: Callable[..., Awaitable["discord.Message"]], guild_id: Optional[int],
+                    author_id: int, question: str, opts: List[str], duration: int):
+    """Post the poll embed via post(embed=...), register it and add the number reactions."""
+    import discord
+
+    closes_at = int(time.time()) + max(POLL_MIN_DURATION, min(duration, POLL_MAX_DURATION))
+    desc = "\n".join(f"{NUMBER_EMOJIS[i]} {o}" for i, o in enumerate(opts))
+    embed = discord.Embed(title=question, description=f"{desc}\n\nCloses <t:{closes_at}:R>")
+    msg = await post(embed=embed)
+    await app.db.write(create_poll, msg.id, guild_id, msg.channel.id, author_id, question, opts, closes_at)
+    app.poll_engine.add(Poll(msg.id, guild_id, msg.channel.id, question, opts, closes_at))
+    for emoji in NUMBER_EMOJIS[:len(opts)]:
+        try:
+            await msg.add_reaction(emoji)
+        except discord.HTTPException:
+            logger.warning("Could not add poll reaction %s", emoji)
+
+def register(bot: "BongoBot"):
+    import discord
+    from discord import app_commands
+
+    app = bot.app
+
+    @bot.tree.command(name="poll", description="Create a poll (2-5 options)")
+    @app_commands.describe(question="Question", options="Comma separated options", duration="seconds")
+    async def poll_slash(interaction: discord.Interaction, question: str, options: str, duration: int = 30):
+        opts = parse_poll_options(options)
+        if not opts:
+            await interaction.response.send_message("Provide 2-5 options.")
+            return
+
+        async def post(**kwargs) -> discord.Message:
+            await interaction.response.send_message(**kwargs)
+            return await interaction.original_response()
+
+        await open_poll(app, post, interaction.guild_id, interaction.user.id, question, opts, duration)
+
+    @bot.command(name="poll")
+    async def poll_prefix(ctx, *, content: str):
+        parts = content.split("|")
+        if len(parts) < 2:
+            await ctx.send("Usage: !poll Question here | option1, option2, option3 | duration_seconds(optional)")
+            return
+        duration = 30
+        if len(parts) >= 3:
+            try:
+                duration = int(parts[2].strip())
+            except ValueError:
+                duration = 30
+        opts = parse_poll_options(parts[1])
+        if not opts:
+            await ctx.send("Provide 2-5 options.")
+            return
+        await open_poll(app, ctx.send, ctx.guild.id if ctx.guild else None, ctx.author.id, parts[0].strip(), opts,
+                        duration)
@@ -0,0 +1,191 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+import weakref
+from collections import Counter as Tally
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from .config import PROFILE_INTERVAL, PROFILE_MAX_SECONDS, PROFILE_TOP, SLOW_CALLBACK_THRESHOLD
+from .metrics import Counter
+
+if TYPE_CHECKING:
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+SLOW_CALLBACKS = Counter("bongo_slow_callbacks_total", "Times a callback blocked the event loop past the threshold",
+                         ["task"])
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_LIMIT = 25
+
+# command names for the tasks running them, so a stall can be blamed on a command
+TASK_LABELS: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+def label_current_task(label: str):
+    task = asyncio.current_task()
+    if task is not None:
+        TASK_LABELS[task] = label
+
+def task_label(loop: asyncio.AbstractEventLoop) -> str:
+    """What the loop is running right now; safe to call from another thread."""
+    task = asyncio.current_task(loop)
+    if task is None:
+        return "callback"
+    return TASK_LABELS.get(task) or task.get_name()
+
+class Watchdog:
+    """Logs the event loop's stack whenever something blocks it for longer than threshold.
+
+    A callback on the loop stamps a heartbeat every threshold/2 seconds and
+    a daemon thread checks it; when the heartbeat is late the thread grabs
+    the loop thread's current frame, so the log shows the code that is
+    blocking rather than the callback that ran after it. Costs one timer
+    callback per heartbeat.
+    """
+
+    def __init__(self, threshold: float = SLOW_CALLBACK_THRESHOLD):
+        self.threshold = threshold
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.tick = 0.0
+        self._thread_id = 0
+        self._stop = threading.Event()
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        if not self.threshold or self.loop:
+            return
+        self.loop = loop
+        self._thread_id = threading.get_ident()
+        self._beat()
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._handle:
+            self._handle.cancel()
+
+    def _beat(self):
+        self.tick = time.monotonic()
+        self._handle = self.loop.call_later(self.threshold / 2, self._beat)
+
+    def _watch(self):
+        reported = None
+        while not self._stop.wait(self.threshold / 4):
+            tick = self.tick
+            if reported is not None and tick != reported:
+                logger.warning("Event loop unblocked after %.0f ms", (tick - reported - self.threshold / 2) * 1000)
+                reported = None
+            late = time.monotonic() - tick - self.threshold / 2
+            if late < self.threshold or reported == tick:
+                continue
+            reported = tick
+            label = task_label(self.loop)
+            frame = sys._current_frames().get(self._thread_id)
+            stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else ""
+            SLOW_CALLBACKS.inc(label)
+            logger.warning("Event loop blocked for %.0f ms so far in %s:\n%s", late * 1000, label, stack)
+
+FunctionKey = Tuple[str, int, str]
+
+class Sampler:
+    """Samples one thread's stack every interval from a background thread.
+
+    Nothing runs unless a sampler is started, so profiling costs nothing
+    when it is off.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.idle = 0
+        self.own: Tally = Tally()
+        self.total: Tally = Tally()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.samples += 1
+            code = frame.f_code
+            # the loop waiting in selector.select() is idle, not hot
+            if code.co_name == "select" and code.co_filename.endswith("selectors.py"):
+                self.idle += 1
+                continue
+            self.own[(code.co_filename, code.co_firstlineno, code.co_name)] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                if key not in seen:
+                    seen.add(key)
+                    self.total[key] += 1
+                frame = frame.f_back
+
+    def report(self, seconds: float, top: int = PROFILE_TOP) -> str:
+        busy = self.samples - self.idle
+        lines = [f"{self.samples} samples over {seconds:g}s, event loop busy {busy / max(1, self.samples):.0%}"]
+        if not busy:
+            return lines[0]
+        lines.append(" self%  total%  function")
+        for key, n in self.own.most_common(top):
+            lines.append(f"{n / busy:6.1%} {self.total[key] / busy:6.1%}  {describe(key)}")
+        return "\n".join(lines)
+
+def describe(key: FunctionKey) -> str:
+    filename, line, name = key
+    if filename.startswith(ROOT):
+        filename = os.path.relpath(filename, ROOT)
+    else:
+        filename = "/".join(filename.split(os.sep)[-2:])
+    return f"{name} ({filename}:{line})"
+
+_profiling = asyncio.Lock()
+
+async def capture_profile(seconds: float) -> str:
+    """Sample the event loop thread for seconds and return the hottest functions."""
+    seconds = max(1.0, min(float(seconds), PROFILE_MAX_SECONDS))
+    if _profiling.locked():
+        return "A profile is already running."
+    async with _profiling:
+        sampler = Sampler(threading.get_ident())
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.get_running_loop().run_in_executor(None, sampler.stop)
+    return sampler.report(seconds)
+
+def register(bot: "BongoBot"):
+    import discord
+    from discord import app_commands
+    from discord.ext import commands
+
+    @bot.tree.command(name="profile", description="Profile the bot for a few seconds (owner only)")
+    @app_commands.describe(seconds=f"How long to sample (1-{PROFILE_MAX_SECONDS})")
+    async def profile_slash(interaction: discord.Interaction, seconds: int = 10):
+        if not await bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can do that.", ephemeral=True)
+            return
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        await interaction.followup.send(f"```\n{await capture_profile(seconds)}\n```", ephemeral=True)
+
+    @bot.command(name="profile")
+    @commands.is_owner()
+    async def profile_cmd(ctx, seconds: int = 10):
+        await ctx.send(f"```\n{await capture_profile(seconds)}\n```")
@@ -0,0 +1,128 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Tuple
+
+BLOCK_SIZE = 1024
+MAX_ID = 2 ** 63 - 1
+
+class RankIndex:
+    """Scores kept sorted by (score, user_id) in blocks of parallel int64 arrays.
+
+    Each block holds up to 2 * BLOCK_SIZE entries and the last key of every
+    block is kept for bisecting, so an update only shifts one small array
+    and ranking is two binary searches plus a sum over the later blocks'
+    lengths. A million users take ~16 MB and rank in microseconds. The
+    caller supplies the old score on update; no per-user dict is kept.
+    """
+
+    def __init__(self):
+        self.scores: List[array] = []
+        self.uids: List[array] = []
+        self.maxes: List[Tuple[int, int]] = []
+        self.lens: List[int] = []
+        self.size = 0
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[int, int]]) -> "RankIndex":
+        """Build from (score, user_id) rows already sorted ascending."""
+        index = cls()
+        scores, uids = array("q"), array("q")
+        for score, uid in rows:
+            scores.append(score)
+            uids.append(uid)
+            if len(scores) == BLOCK_SIZE:
+                index._append_block(scores, uids)
+                scores, uids = array("q"), array("q")
+        if scores:
+            index._append_block(scores, uids)
+        return index
+
+    def _append_block(self, scores: array, uids: array):
+        self.scores.append(scores)
+        self.uids.append(uids)
+        self.maxes.append((scores[-1], uids[-1]))
+        self.lens.append(len(scores))
+        self.size += len(scores)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _slot(self, b: int, score: int, uid: int) -> int:
+        scores = self.scores[b]
+        lo = bisect_left(scores, score)
+        hi = bisect_right(scores, score, lo)
+        return bisect_left(self.uids[b], uid, lo, hi)
+
+    def insert(self, uid: int, score: int):
+        if not self.maxes:
+            self._append_block(array("q", [score]), array("q", [uid]))
+            return
+        b = min(bisect_left(self.maxes, (score, uid)), len(self.maxes) - 1)
+        i = self._slot(b, score, uid)
+        scores, uids = self.scores[b], self.uids[b]
+        scores.insert(i, score)
+        uids.insert(i, uid)
+        self.lens[b] += 1
+        self.size += 1
+        self.maxes[b] = (scores[-1], uids[-1])
+        if self.lens[b] > 2 * BLOCK_SIZE:
+            half = self.lens[b] // 2
+            self.scores[b + 1:b + 1] = [scores[half:]]
+            self.uids[b + 1:b + 1] = [uids[half:]]
+            del scores[half:]
+            del uids[half:]
+            self.maxes[b:b + 1] = [(scores[-1], uids[-1]), self.maxes[b]]
+            self.lens[b:b + 1] = [half, self.lens[b] - half]
+
+    def remove(self, uid: int, score: int) -> bool:
+        b = bisect_left(self.maxes, (score, uid))
+        if b == len(self.maxes):
+            return False
+        i = self._slot(b, score, uid)
+        scores, uids = self.scores[b], self.uids[b]
+        if i == len(scores) or scores[i] != score or uids[i] != uid:
+            return False
+        del scores[i]
+        del uids[i]
+        self.size -= 1
+        self.lens[b] -= 1
+        if scores:
+            self.maxes[b] = (scores[-1], uids[-1])
+        else:
+            del self.scores[b], self.uids[b], self.maxes[b], self.lens[b]
+        return True
+
+    def update(self, uid: int, old: int, new: int):
+        self.remove(uid, old)
+        self.insert(uid, new)
+
+    def rank(self, score: int) -> int:
+        """1-based rank of a score; everyone on the same score shares it."""
+        b = bisect_right(self.maxes, (score, MAX_ID))
+        if b == len(self.maxes):
+            return 1
+        above = self.lens[b] - bisect_right(self.scores[b], score) + sum(self.lens[b + 1:])
+        return above + 1
+
+    def top(self, n: int, offset: int = 0) -> List[Tuple[int, int]]:
+        """(user_id, score) pairs from the top, highest score first."""
+        out: List[Tuple[int, int]] = []
+        for b in range(len(self.lens) - 1, -1, -1):
+            if len(out) >= n:
+                break
+            length = self.lens[b]
+            if offset >= length:
+                offset -= length
+                continue
+            scores, uids = self.scores[b], self.uids[b]
+            for i in range(length - 1 - offset, -1, -1):
+                out.append((uids[i], scores[i]))
+                if len(out) >= n:
+                    break
+            offset = 0
+        return out
+
+    def items(self) -> Iterable[Tuple[int, int]]:
+        """(score, user_id) pairs in ascending order."""
+        for scores, uids in zip(self.scores, self.uids):
+            yield from zip(scores, uids)
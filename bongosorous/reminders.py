@@ -0,0 +1,106 @@
+import time
+import asyncio
+import logging
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from .config import REMINDER_BATCH, REMINDER_LEASE, REMINDER_RETRY, WORKER_ID, owns_guild
+from .metrics import Histogram
+
+if TYPE_CHECKING:
+    from .app import App
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LAG_SECONDS = Histogram("bongo_reminder_lag_seconds", "Reminder send time minus remind_at",
+                                 buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300))
+
+def add_reminder(conn, user_id: int, guild_id: Optional[int], channel_id: int, remind_at: int, content: str) -> int:
+    return conn.execute("INSERT INTO reminders (user_id, guild_id, channel_id, remind_at, content) "
+                        "VALUES (?, ?, ?, ?, ?) RETURNING id",
+                        (user_id, guild_id, channel_id, remind_at, content)).fetchone()["id"]
+
+def pending_reminders(conn) -> List[Tuple[int, int, Optional[int]]]:
+    return [(r["remind_at"], r["id"], r["guild_id"]) for r in conn.execute("SELECT id, remind_at, guild_id FROM reminders")]
+
+def claim_reminders(conn, ids: List[int], worker: str, now: float, lease: float) -> Tuple[list, List[Tuple[float, int]]]:
+    """Lease due reminders to ``worker`` so no other process sends them.
+
+    Returns the claimed rows and (claimed_until, id) for the ones another
+    worker holds; ids that are gone were already sent elsewhere.
+    """
+    marks = ",".join("?" * len(ids))
+    rows = conn.execute(
+        f"UPDATE reminders SET claimed_by = ?, claimed_until = ? WHERE id IN ({marks}) "
+        "AND (claimed_until IS NULL OR claimed_until < ? OR claimed_by = ?) "
+        "RETURNING id, user_id, channel_id, remind_at, content",
+        (worker, now + lease, *ids, now, worker)).fetchall()
+    claimed = {r["id"] for r in rows}
+    busy = [(r["claimed_until"], r["id"]) for r in conn.execute(
+        f"SELECT id, claimed_until FROM reminders WHERE id IN ({marks})", ids) if r["id"] not in claimed]
+    return rows, busy
+
+def delete_reminders(conn, ids: List[int], worker: str):
+    conn.executemany("DELETE FROM reminders WHERE id = ? AND claimed_by = ?", [(i, worker) for i in ids])
+
+async def send_reminder(app: "App", r) -> bool:
+    ch = app.bot.get_channel(r["channel_id"])
+    if not ch:
+        return True
+    sent = await app.outbox.send(ch, f"<@{r['user_id']}> ⏰ Reminder: {r['content']}")
+    if sent:
+        REMINDER_LAG_SECONDS.observe(max(0.0, time.time() - r["remind_at"]))
+    else:
+        logger.warning("Failed to send reminder %s", r["id"])
+    return sent
+
+async def dispatch_reminders(app: "App", ids: List[int]):
+    """Send due reminders this process manages to claim.
+
+    Each process schedules only the reminders of guilds on its shards
+    (warm_reminders at startup, !remindme as they're made). The atomic
+    claim keeps a reminder from going out twice when two processes still
+    hold it, e.g. during a deploy or overlapping shard ranges. Work goes
+    in batches so a backlog never holds a lease longer than sending it
+    takes.
+    """
+    await app.bot.wait_until_ready()
+    for i in range(0, len(ids), REMINDER_BATCH):
+        rows, busy = await app.db.write(claim_reminders, ids[i:i + REMINDER_BATCH], WORKER_ID, time.time(),
+                                        REMINDER_LEASE)
+        # if the other worker dies mid-send its lease runs out and we pick the reminder up
+        for claimed_until, rid in busy:
+            app.scheduler.schedule(claimed_until + 1, "reminder", rid)
+        sent = await asyncio.gather(*(send_reminder(app, r) for r in rows))
+        done = [r["id"] for r, ok in zip(rows, sent) if ok]
+        if done:
+            await app.db.write(delete_reminders, done, WORKER_ID)
+        retry_at = time.time() + REMINDER_RETRY
+        for r, ok in zip(rows, sent):
+            if not ok:
+                app.scheduler.schedule(retry_at, "reminder", r["id"])
+
+async def warm_reminders(app: "App"):
+    pending = [(when, rid) for when, rid, guild_id in await app.db.read(pending_reminders) if owns_guild(guild_id)]
+    app.scheduler.load("reminder", pending)
+    logger.info("Loaded %d pending reminders.", len(pending))
+
+def register(bot: "BongoBot"):
+    app = bot.app
+
+    @bot.command(name="remindme")
+    async def remindme_cmd(ctx, when: str, *, text: str):
+        try:
+            unit = when[-1]
+            num = int(when[:-1])
+            mult = {"s": 1, "m": 60, "h": 3600, "d": 86400}.get(unit)
+            if not mult:
+                raise ValueError()
+        except Exception:
+            await ctx.send("Time format: 10m, 2h, 1d etc.")
+            return
+        remind_at = int(time.time()) + num * mult
+        rid = await app.db.write(add_reminder, ctx.author.id, ctx.guild.id if ctx.guild else None, ctx.channel.id,
+                                 remind_at, text)
+        app.scheduler.schedule(remind_at, "reminder", rid)
+        await ctx.send(f"✅ Reminder set for <t:{remind_at}:R>")
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+from .config import ROLE_BATCH_WINDOW, ROLE_EDIT_INTERVAL, owns_guild
+from .metrics import Counter
+
+if TYPE_CHECKING:
+    from .app import App
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+ROLE_EDITS = Counter("bongo_role_edits_total", "Reaction-role member edits by outcome", ["status"])
+
+def add_reaction_role(conn, guild_id: int, channel_id: int, message_id: int, emoji: str, role_id: int):
+    conn.execute("DELETE FROM reaction_roles WHERE guild_id = ? AND message_id = ? AND emoji = ?",
+                 (guild_id, message_id, emoji))
+    conn.execute("INSERT INTO reaction_roles (guild_id, channel_id, message_id, emoji, role_id) VALUES (?, ?, ?, ?, ?)",
+                 (guild_id, channel_id, message_id, emoji, role_id))
+
+def guild_reaction_roles(conn, guild_id: int, message_id: Optional[int] = None) -> list:
+    sql = "SELECT channel_id, message_id, emoji, role_id FROM reaction_roles WHERE guild_id = ?"
+    args: tuple = (guild_id,)
+    if message_id:
+        sql += " AND message_id = ?"
+        args += (message_id,)
+    return conn.execute(sql, args).fetchall()
+
+def delete_reaction_role(conn, guild_id: int, message_id: int, emoji: str) -> int:
+    return conn.execute("DELETE FROM reaction_roles WHERE guild_id = ? AND message_id = ? AND emoji = ?",
+                        (guild_id, message_id, emoji)).rowcount
+
+def load_reaction_roles(conn) -> list:
+    return conn.execute("SELECT guild_id, message_id, emoji, role_id FROM reaction_roles ORDER BY id").fetchall()
+
+class RoleDispatcher:
+    """Queues reaction-role changes per member and applies them as one member.edit per member.
+
+    Changes wait ROLE_BATCH_WINDOW seconds so bursts can merge; the latest
+    add/remove for a role wins and edits that would change nothing are
+    skipped. Each guild is drained by one worker paced at ROLE_EDIT_INTERVAL.
+    """
+
+    def __init__(self, app: "App"):
+        self.app = app
+        self.pending: Dict[int, "OrderedDict[int, Dict[int, bool]]"] = {}
+        self.workers: Dict[int, asyncio.Task] = {}
+
+    def queue(self, guild_id: int, member_id: int, role_id: int, add: bool):
+        members = self.pending.setdefault(guild_id, OrderedDict())
+        members.setdefault(member_id, {})[role_id] = add
+        if guild_id not in self.workers:
+            self.workers[guild_id] = asyncio.create_task(self._drain(guild_id), name=f"roles:{guild_id}")
+
+    def depth(self) -> int:
+        return sum(len(m) for m in self.pending.values())
+
+    async def _drain(self, guild_id: int):
+        try:
+            await asyncio.sleep(ROLE_BATCH_WINDOW)
+            members = self.pending.get(guild_id)
+            while members:
+                member_id, changes = members.popitem(last=False)
+                delay = await self._apply(guild_id, member_id, changes)
+                if delay:
+                    await asyncio.sleep(delay)
+        except Exception:
+            logger.exception("Role dispatcher for guild %s failed", guild_id)
+        finally:
+            if not self.pending.get(guild_id):
+                self.pending.pop(guild_id, None)
+            self.workers.pop(guild_id, None)
+            if self.pending.get(guild_id):
+                self.workers[guild_id] = asyncio.create_task(self._drain(guild_id), name=f"roles:{guild_id}")
+
+    def _requeue(self, guild_id: int, member_id: int, changes: Dict[int, bool]):
+        members = self.pending.setdefault(guild_id, OrderedDict())
+        members[member_id] = {**changes, **members.get(member_id, {})}
+
+    async def _apply(self, guild_id: int, member_id: int, changes: Dict[int, bool]) -> float:
+        import discord
+
+        guild = self.app.bot.get_guild(guild_id)
+        if not guild:
+            return 0
+        member = guild.get_member(member_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(member_id)
+            except discord.NotFound:
+                return 0
+            except discord.HTTPException:
+                logger.exception("Failed to fetch member %s", member_id)
+                return ROLE_EDIT_INTERVAL
+        current = {r.id for r in member.roles if not r.is_default()}
+        desired = set(current)
+        for role_id, add in changes.items():
+            if not add:
+                desired.discard(role_id)
+            elif guild.get_role(role_id):
+                desired.add(role_id)
+        if desired == current:
+            ROLE_EDITS.inc("noop")
+            return 0
+        try:
+            await member.edit(roles=[discord.Object(id=r) for r in desired], reason="Reaction roles")
+            ROLE_EDITS.inc("ok")
+        except discord.RateLimited as e:
+            ROLE_EDITS.inc("rate_limited")
+            self._requeue(guild_id, member_id, changes)
+            return e.retry_after
+        except discord.HTTPException as e:
+            if e.status == 429:
+                ROLE_EDITS.inc("rate_limited")
+                self._requeue(guild_id, member_id, changes)
+                return 5.0
+            ROLE_EDITS.inc("error")
+            logger.exception("Failed to update roles for member %s", member_id)
+        return ROLE_EDIT_INTERVAL
+
+async def warm_reaction_roles(app: "App"):
+    for r in await app.db.read(load_reaction_roles):
+        if owns_guild(r["guild_id"]):
+            app.reaction_roles[(r["guild_id"], r["message_id"], r["emoji"])] = r["role_id"]
+    logger.info("Loaded %d reaction roles.", len(app.reaction_roles))
+
+def register(bot: "BongoBot"):
+    import discord
+    from discord.ext import commands
+
+    app = bot.app
+
+    @bot.command(name="createreactionrole")
+    @commands.has_permissions(manage_roles=True)
+    async def create_reaction_role(ctx, message_id: int, emoji: str, role: discord.Role):
+        await app.db.write(add_reaction_role, ctx.guild.id, ctx.channel.id, message_id, emoji, role.id)
+        app.reaction_roles[(ctx.guild.id, message_id, emoji)] = role.id
+        try:
+            msg = await ctx.channel.fetch_message(message_id)
+            await msg.add_reaction(emoji)
+        except Exception:
+            pass
+        await ctx.send("Reaction role registered.")
+
+    @bot.command(name="deletereactionrole")
+    @commands.has_permissions(manage_roles=True)
+    async def delete_reaction_role_cmd(ctx, message_id: int, emoji: str):
+        app.reaction_roles.pop((ctx.guild.id, message_id, emoji), None)
+        if await app.db.write(delete_reaction_role, ctx.guild.id, message_id, emoji):
+            await ctx.send("Reaction role removed.")
+        else:
+            await ctx.send("No reaction role found for that message and emoji.")
+
+    @bot.command(name="syncreactionroles")
+    @commands.has_permissions(manage_roles=True)
+    async def sync_reaction_roles(ctx, message_id: Optional[int] = None, mode: str = ""):
+        remove = mode.lower() == "remove"
+        rows = await app.db.read(guild_reaction_roles, ctx.guild.id, message_id)
+        if not rows:
+            await ctx.send("No reaction roles to sync.")
+            return
+        synced = {r["role_id"] for r in rows}
+        if remove and message_id:
+            # a role mapped on other messages or emojis is rightly held through those too
+            rows = [r for r in await app.db.read(guild_reaction_roles, ctx.guild.id) if r["role_id"] in synced]
+        reactors: Dict[int, Set[int]] = {role_id: set() for role_id in synced}
+        unreadable: Set[int] = set()
+        by_message: Dict[int, list] = {}
+        for r in rows:
+            by_message.setdefault(r["message_id"], []).append(r)
+        for mid, mappings in by_message.items():
+            channel = ctx.guild.get_channel(mappings[0]["channel_id"] or ctx.channel.id) or ctx.channel
+            try:
+                msg = await channel.fetch_message(mid)
+            except discord.HTTPException:
+                await ctx.send(f"Could not fetch message {mid}, skipping.")
+                unreadable.update(r["role_id"] for r in mappings)
+                continue
+            for r in mappings:
+                reaction = discord.utils.find(lambda x: str(x.emoji) == r["emoji"], msg.reactions)
+                if reaction:
+                    reactors[r["role_id"]].update([u.id async for u in reaction.users(limit=None) if not u.bot])
+        added = removed = 0
+        for role_id in synced:
+            role = ctx.guild.get_role(role_id)
+            if not role:
+                continue
+            holders = {m.id for m in role.members}
+            for uid in reactors[role_id] - holders:
+                app.role_dispatcher.queue(ctx.guild.id, uid, role.id, True)
+                added += 1
+            # only with every mapping of the role read, and never by default: roles can be given by hand
+            if remove and role_id not in unreadable:
+                for uid in holders - reactors[role_id]:
+                    app.role_dispatcher.queue(ctx.guild.id, uid, role.id, False)
+                    removed += 1
+        if remove:
+            await ctx.send(f"Queued {added} role addition(s) and {removed} removal(s).")
+        else:
+            await ctx.send(f"Queued {added} role addition(s). Add `remove` to also take the roles "
+                           "from members who no longer react.")
@@ -0,0 +1,73 @@
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger("bongosorous.scheduler")
+
+Handler = Callable[[List[Any]], Awaitable[None]]
+
+class Scheduler:
+    """Min-heap of timed jobs keyed on a unix timestamp.
+
+    The run loop sleeps until the earliest job is due (or until a new job
+    lands in front of it), pops everything that is due and hands each
+    kind's payloads to its registered handler as one batch.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, Any]] = []
+        self._seq = itertools.count()
+        self._handlers: Dict[str, Handler] = {}
+        self._wake = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def register(self, kind: str, handler: Handler):
+        self._handlers[kind] = handler
+
+    def schedule(self, when: float, kind: str, payload: Any):
+        entry = (when, next(self._seq), kind, payload)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wake.set()
+
+    def load(self, kind: str, jobs: Iterable[Tuple[float, Any]]):
+        """Bulk-add jobs, e.g. when restoring state at startup."""
+        self._heap.extend((when, next(self._seq), kind, payload) for when, payload in jobs)
+        heapq.heapify(self._heap)
+        self._wake.set()
+
+    def _pop_due(self, now: float) -> Dict[str, List[Any]]:
+        due: Dict[str, List[Any]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            _, _, kind, payload = heapq.heappop(self._heap)
+            due.setdefault(kind, []).append(payload)
+        return due
+
+    async def _dispatch(self, kind: str, payloads: List[Any]):
+        handler = self._handlers.get(kind)
+        if not handler:
+            logger.warning("No handler for %d %r job(s)", len(payloads), kind)
+            return
+        try:
+            await handler(payloads)
+        except Exception:
+            logger.exception("Scheduled %r handler failed", kind)
+
+    async def run(self):
+        while True:
+            self._wake.clear()
+            for kind, payloads in self._pop_due(time.time()).items():
+                task = asyncio.create_task(self._dispatch(kind, payloads))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
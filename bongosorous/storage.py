@@ -0,0 +1,241 @@
+import math
+import queue
+import asyncio
+import sqlite3
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Set, TypeVar
+
+from .metrics import Histogram
+from .migrations import migrate
+
+T = TypeVar("T")
+
+DB_QUERY_SECONDS = Histogram("bongo_db_query_seconds", "Time spent running database work on a DB thread",
+                             ["op", "mode"])
+
+logger = logging.getLogger("bongosorous.storage")
+
+PRAGMAS = (
+    # only takes effect on a new file; maintenance.py compact --full converts an old one
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16384",
+)
+
+def _isqrt(n) -> int:
+    return math.isqrt(max(0, int(n or 0)))
+
+class Backend:
+    """What the rest of the bot needs from a state store.
+
+    Query functions take a DB-API style connection as their first argument
+    and use ``?`` placeholders, ``conn.execute(...)`` / ``executemany`` and
+    rows that index by position and by column name. Coroutines hand them
+    to ``read()``, which runs them on a reader thread, or ``write()``,
+    which runs them on a writer thread inside one transaction, so the
+    event loop never waits on the store. Anything that must hold across
+    several bot processes is a single conditional statement (a claim)
+    inside such a transaction.
+
+    Subclasses provide ``_connect()``, ``transaction()`` and the small
+    schema helpers ``init_db()`` relies on.
+    """
+
+    dialect = ""
+    # starts a read-only transaction that sees one snapshot of every table
+    snapshot = "BEGIN"
+
+    def __init__(self, size: int, writers: int):
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._all = []
+        self._guard = threading.Lock()
+        self._closed = False
+        self._writer = ThreadPoolExecutor(max_workers=writers, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max(1, self.size - writers), thread_name_prefix="db-reader")
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _acquire(self):
+        if self._closed:
+            raise RuntimeError("database is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._guard:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        return self._idle.get()
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def transaction(self):
+        raise NotImplementedError
+
+    def prepare(self, conn):
+        """Backend-specific setup that init_db() runs before creating the schema."""
+
+    def ddl(self, sql: str) -> str:
+        """Adapt a CREATE/ALTER statement written for SQLite to this backend."""
+        return sql
+
+    def lock_schema(self, conn):
+        """Keep other processes out of a migration until the transaction ends."""
+
+    def table_exists(self, conn, table: str) -> bool:
+        raise NotImplementedError
+
+    def columns(self, conn, table: str) -> Set[str]:
+        raise NotImplementedError
+
+    async def compact(self, pages: int) -> int:
+        """Return up to ``pages`` free pages to the filesystem; returns how many were freed."""
+        return 0
+
+    def sync_ids(self, conn, table: str):
+        """Move the table's id generator past ids inserted explicitly (e.g. by an import)."""
+
+    def _run_read(self, fn: Callable[..., T], args: tuple) -> T:
+        start = time.perf_counter()
+        try:
+            with self.connection() as conn:
+                return fn(conn, *args)
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, fn.__name__, "read")
+
+    def _run_write(self, fn: Callable[..., T], args: tuple) -> T:
+        start = time.perf_counter()
+        try:
+            with self.transaction() as conn:
+                return fn(conn, *args)
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, fn.__name__, "write")
+
+    async def read(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` on a reader thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, fn, args)
+
+    async def write(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` inside one transaction on a writer thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._run_write, fn, args)
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self._closed = True
+        with self._guard:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                logger.exception("Failed to close connection")
+
+class Database(Backend):
+    """Small pool of tuned SQLite connections; the default backend.
+
+    Connections run in autocommit mode so plain reads never hold a
+    transaction open; writes go through ``transaction()`` which issues
+    ``BEGIN IMMEDIATE`` and is serialized per process. SQLite's file lock
+    serializes writers across processes too, so several bot processes on
+    one host can share the file.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(self, path: str, size: int = 4, statement_cache: int = 256):
+        super().__init__(size, writers=1)
+        self.path = path
+        self.statement_cache = statement_cache
+        self._write_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                               cached_statements=self.statement_cache)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.create_function("isqrt", 1, _isqrt, deterministic=True)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock, self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def table_exists(self, conn, table: str) -> bool:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        return row is not None
+
+    def columns(self, conn, table: str) -> Set[str]:
+        return {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+    async def compact(self, pages: int) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._compact, pages)
+
+    def _compact(self, pages: int) -> int:
+        start = time.perf_counter()
+        # incremental_vacuum frees one page per step, and only executescript() steps it to the end;
+        # it runs as its own short write transaction
+        with self._write_lock, self.connection() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+            freed = before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        DB_QUERY_SECONDS.observe(time.perf_counter() - start, "compact", "write")
+        return freed
+
+def open_database(target: str, size: int = 4) -> Backend:
+    """A SQLite file path, or a postgresql:// URL for a server shared by several bot processes."""
+    if target.startswith(("postgres://", "postgresql://")):
+        from .postgres import PostgresDatabase
+        return PostgresDatabase(target, size=size)
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    return Database(target, size=size)
+
+def init_db(db: Backend):
+    """Create or upgrade the schema by running pending migrations."""
+    migrate(db)
+
+def get_meta(conn, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else None
+
+def set_meta(conn, key: str, value: str):
+    conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                 (key, value))
+
+def ping_db(conn) -> bool:
+    return conn.execute("SELECT 1").fetchone()[0] == 1
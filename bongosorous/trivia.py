@@ -0,0 +1,310 @@
+import re
+import math
+import time
+import random
+import logging
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from .config import TRIVIA_REWARD, owns_guild
+from .economy import credit_coins
+
+if TYPE_CHECKING:
+    import discord
+    from .app import App
+    from .bot import BongoBot
+
+logger = logging.getLogger(__name__)
+
+_ARTICLES = re.compile(r"^(the|a|an)\s+")
+_NON_WORD = re.compile(r"[^\w\s.]+")
+_SPACES = re.compile(r"\s+")
+
+def normalize_answer(text: str) -> str:
+    """Lowercase, strip accents, punctuation and a leading article."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _NON_WORD.sub("", text.replace("-", " "))
+    text = _SPACES.sub(" ", text).strip().rstrip(".")
+    return _ARTICLES.sub("", text)
+
+def tolerance(answer: str) -> int:
+    """Typos allowed for an answer: none for numbers and short words."""
+    if len(answer) < 5 or any(c.isdigit() for c in answer):
+        return 0
+    return 1 if len(answer) < 9 else 2
+
+def deletions(word: str, depth: int) -> Set[str]:
+    found, frontier = set(), {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+def within(a: str, b: str, limit: int) -> bool:
+    """Optimal string alignment distance <= limit, giving up once a row exceeds it."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= limit
+
+class Question:
+    """A parsed question with its accepted answers and typo neighbourhood precomputed."""
+
+    __slots__ = ("index", "category", "text", "answer", "accepted", "fuzzy", "near", "depth")
+
+    def __init__(self, index: int, category: str, text: str, answers: List[str]):
+        self.index = index
+        self.category = category
+        self.text = text
+        self.answer = answers[0]
+        self.accepted: FrozenSet[str] = frozenset(filter(None, map(normalize_answer, answers)))
+        self.fuzzy: Tuple[Tuple[str, int], ...] = tuple((a, tolerance(a)) for a in self.accepted if tolerance(a))
+        self.depth = max((t for _, t in self.fuzzy), default=0)
+        near: Set[str] = set()
+        for a, t in self.fuzzy:
+            near.add(a)
+            near |= deletions(a, t)
+        self.near: FrozenSet[str] = frozenset(near)
+
+    @classmethod
+    def parse(cls, index: int, line: str) -> "Question":
+        category, text, answers = line.rstrip("\n").split("\t")
+        return cls(index, category, text, answers.split("|"))
+
+    def matches(self, guess: str) -> bool:
+        guess = normalize_answer(guess)
+        if guess in self.accepted:
+            return True
+        if not guess or not any(abs(len(guess) - len(a)) <= t for a, t in self.fuzzy):
+            return False
+        # symmetric deletions: a typo within t edits shares a variant with the answer
+        if guess not in self.near and self.near.isdisjoint(deletions(guess, self.depth)):
+            return False
+        return any(within(guess, a, t) for a, t in self.fuzzy)
+
+class QuestionBank:
+    """Questions stored one per line as ``category<TAB>question<TAB>answer|alias...``.
+
+    Only an array of line offsets is kept in memory; it is built on first
+    use and each question is read and parsed when it is asked.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._offsets: Optional[array] = None
+
+    def _index(self) -> array:
+        if self._offsets is None:
+            offsets = array("q")
+            pos = 0
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        offsets.append(pos)
+                    pos += len(line)
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def get(self, index: int) -> Question:
+        with open(self.path, "rb") as f:
+            f.seek(self._index()[index])
+            return Question.parse(index, f.readline().decode("utf-8"))
+
+class Round(NamedTuple):
+    id: int
+    channel_id: int
+    question: Question
+    deadline: float
+
+class TriviaEngine:
+    """One open question per channel, drawn from the bank without repeats.
+
+    Each channel walks the bank as ``(start + i * stride) % n`` with a
+    random start and a stride coprime to n, so every question comes up
+    once per cycle without storing a shuffled list per channel.
+    """
+
+    def __init__(self, bank: QuestionBank, timeout: float):
+        self.bank = bank
+        self.timeout = timeout
+        self.active: Dict[int, Round] = {}
+        self.cycles: Dict[int, List[int]] = {}
+        self._ids = 0
+
+    def _next_index(self, channel_id: int) -> int:
+        n = len(self.bank)
+        cycle = self.cycles.get(channel_id)
+        if cycle is None or cycle[2] >= n:
+            stride = random.randrange(1, n) if n > 1 else 1
+            while math.gcd(stride, n) != 1:
+                stride = random.randrange(1, n)
+            cycle = self.cycles[channel_id] = [random.randrange(n), stride, 0]
+        start, stride, i = cycle
+        cycle[2] += 1
+        return (start + i * stride) % n
+
+    def start(self, channel_id: int, now: float) -> Tuple[Round, bool]:
+        """Open a question in the channel, or return the one already open (with False)."""
+        current = self.active.get(channel_id)
+        if current:
+            return current, False
+        self._ids += 1
+        question = self.bank.get(self._next_index(channel_id))
+        current = self.active[channel_id] = Round(self._ids, channel_id, question, now + self.timeout)
+        return current, True
+
+    def restore(self, channel_id: int, cycle: Optional[List[int]], index: Optional[int],
+                text: Optional[str], deadline: Optional[float]) -> Optional[Round]:
+        """Reinstate a channel's saved cycle and open question; entries that no longer fit the bank are dropped."""
+        n = len(self.bank)
+        if cycle and 0 <= cycle[0] < n and math.gcd(cycle[1], n) == 1 and 0 <= cycle[2] <= n:
+            self.cycles[channel_id] = list(cycle)
+        if index is None or not 0 <= index < n:
+            return None
+        question = self.bank.get(index)
+        if question.text != text:
+            return None
+        self._ids += 1
+        current = self.active[channel_id] = Round(self._ids, channel_id, question, deadline)
+        return current
+
+    def check(self, channel_id: int, text: str) -> Optional[Round]:
+        """Close and return the channel's round if text answers it."""
+        current = self.active.get(channel_id)
+        if current is None or not current.question.matches(text):
+            return None
+        del self.active[channel_id]
+        return current
+
+    def expire(self, channel_id: int, round_id: int) -> Optional[Round]:
+        current = self.active.get(channel_id)
+        if current is None or current.id != round_id:
+            return None
+        del self.active[channel_id]
+        return current
+
+def save_trivia_round(conn, channel_id: int, guild_id: Optional[int], cycle: List[int],
+                      question_index: int, question: str, deadline: float, now: float):
+    """Record a new open question unless one is still running; returns the running one's row if so.
+
+    The check and the write are one statement, so two processes starting
+    trivia in the same channel can't both open a question.
+    """
+    saved = conn.execute(
+        "INSERT INTO trivia_channels (channel_id, guild_id, cycle_start, cycle_stride, cycle_pos, "
+        "question_index, question, deadline) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(channel_id) DO UPDATE SET guild_id = excluded.guild_id, cycle_start = excluded.cycle_start, "
+        "cycle_stride = excluded.cycle_stride, cycle_pos = excluded.cycle_pos, "
+        "question_index = excluded.question_index, question = excluded.question, deadline = excluded.deadline "
+        "WHERE trivia_channels.deadline IS NULL OR trivia_channels.deadline < ? RETURNING channel_id",
+        (channel_id, guild_id, *cycle, question_index, question, deadline, now)).fetchone()
+    if saved:
+        return None
+    return conn.execute("SELECT * FROM trivia_channels WHERE channel_id = ?", (channel_id,)).fetchone()
+
+def finish_trivia_round(conn, channel_id: int, deadline: float) -> bool:
+    """Clear the channel's open question if it is still the one ending at deadline."""
+    return conn.execute("UPDATE trivia_channels SET question_index = NULL, question = NULL, deadline = NULL "
+                        "WHERE channel_id = ? AND deadline = ?", (channel_id, deadline)).rowcount > 0
+
+def claim_trivia_answer(conn, channel_id: int, deadline: float, uid: int, reward: int) -> Optional[int]:
+    """Close the round and pay the winner in one transaction; returns the new balance, or None if it was already closed."""
+    if not finish_trivia_round(conn, channel_id, deadline):
+        return None
+    return credit_coins(conn, uid, reward, "trivia")
+
+def load_trivia_channels(conn) -> list:
+    return conn.execute("SELECT * FROM trivia_channels").fetchall()
+
+def restore_round(app: "App", r) -> Optional[Round]:
+    current = app.trivia_engine.restore(r["channel_id"], [r["cycle_start"], r["cycle_stride"], r["cycle_pos"]],
+                                        r["question_index"], r["question"], r["deadline"])
+    if current:
+        app.scheduler.schedule(current.deadline, "trivia", (current.channel_id, current.id))
+    return current
+
+async def start_trivia(app: "App", channel_id: int, guild_id: Optional[int]) -> str:
+    engine = app.trivia_engine
+    now = time.time()
+    current, new = engine.start(channel_id, now)
+    if new:
+        try:
+            running = await app.db.write(save_trivia_round, channel_id, guild_id, engine.cycles[channel_id],
+                                         current.question.index, current.question.text, current.deadline, now)
+        except Exception:
+            # nothing will expire or pay out an unsaved round; don't leave it open
+            logger.exception("Trivia start error")
+            engine.expire(channel_id, current.id)
+            return "❌ Couldn't start a trivia question, try again."
+        if running is None:
+            app.scheduler.schedule(current.deadline, "trivia", (channel_id, current.id))
+            return (f"🧠 Trivia ({current.question.category}): {current.question.text} "
+                    f"(answer in chat, ends <t:{int(current.deadline)}:R>)")
+        # another process opened a question first; take that one over instead
+        engine.expire(channel_id, current.id)
+        current = restore_round(app, running)
+        if current is None:
+            return "🧠 A question is already open in this channel."
+    return f"🧠 A question is already open: {current.question.text} (ends <t:{int(current.deadline)}:R>)"
+
+async def reward_answer(app: "App", message: "discord.Message", solved: Round):
+    try:
+        coins = await app.db.write(claim_trivia_answer, message.channel.id, solved.deadline, message.author.id,
+                                   TRIVIA_REWARD)
+        if coins is None:
+            return
+        app.outbox.send(message.channel, f"🎉 {message.author.mention} got it! The answer was **{solved.question.answer}**",
+                        interactive=True)
+        app.leaderboards.update("coins", message.author.id, coins - TRIVIA_REWARD, coins)
+    except Exception:
+        logger.exception("Trivia answer error")
+
+async def expire_trivia(app: "App", payloads: List[Tuple[int, int]]):
+    # rounds that ran out during downtime fire before READY; wait for the channel cache
+    await app.bot.wait_until_ready()
+    for channel_id, round_id in payloads:
+        expired = app.trivia_engine.expire(channel_id, round_id)
+        if not expired or not await app.db.write(finish_trivia_round, channel_id, expired.deadline):
+            continue
+        channel = app.bot.get_channel(channel_id)
+        if channel:
+            app.outbox.send(channel, f"⏰ Time's up! The answer was **{expired.question.answer}**")
+
+async def warm_trivia(app: "App"):
+    restored = 0
+    for r in await app.db.read(load_trivia_channels):
+        if not owns_guild(r["guild_id"]):
+            continue
+        if restore_round(app, r):
+            restored += 1
+    logger.info("Restored %d open trivia questions.", restored)
+
+def register(bot: "BongoBot"):
+    import discord
+
+    app = bot.app
+
+    @bot.tree.command(name="trivia", description="Start a trivia question")
+    async def trivia_slash(interaction: discord.Interaction):
+        await interaction.response.send_message(await start_trivia(app, interaction.channel_id, interaction.guild_id))
+
+    @bot.command(name="trivia")
+    async def trivia_prefix(ctx):
+        await ctx.send(await start_trivia(app, ctx.channel.id, ctx.guild.id if ctx.guild else None))
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from .config import XP_FLUSH_INTERVAL, XP_FLUSH_THRESHOLD
+from .storage import Backend
+
+if TYPE_CHECKING:
+    import discord
+    from .leaderboards import Leaderboards
+    from .outbox import Outbox
+
+logger = logging.getLogger(__name__)
+
+def flush_xp(conn, batch: Dict[int, int], members: Set[Tuple[int, int]]):
+    """Apply buffered XP and guild memberships.
+
+    Returns (user_id, new_level) for every level-up, {user_id: (xp, coins)}
+    for the batch and the (guild_id, user_id) memberships that are new.
+    """
+    levelled: List[Tuple[int, int]] = []
+    totals: Dict[int, Tuple[int, int]] = {}
+    # sorted so concurrent flushes from several processes lock rows in the same order
+    uids = sorted(batch)
+    conn.executemany(
+        "INSERT INTO users(user_id, xp) VALUES(?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET xp = users.xp + excluded.xp",
+        [(uid, batch[uid]) for uid in uids])
+    for i in range(0, len(uids), 500):
+        chunk = uids[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"UPDATE users SET level = isqrt(xp) WHERE user_id IN ({marks}) AND isqrt(xp) > level "
+            "RETURNING user_id, level", chunk).fetchall()
+        levelled.extend((r["user_id"], r["level"]) for r in rows)
+        for r in conn.execute(f"SELECT user_id, xp, coins FROM users WHERE user_id IN ({marks})", chunk):
+            totals[r["user_id"]] = (r["xp"], r["coins"])
+    joined = [pair for pair in sorted(members)
+              if conn.execute("INSERT INTO guild_members (guild_id, user_id) VALUES (?, ?) "
+                              "ON CONFLICT DO NOTHING RETURNING 1", pair).fetchone()]
+    return levelled, totals, joined
+
+class XPBuffer:
+    """Accumulates message XP in memory and writes it out in batches."""
+
+    def __init__(self, db: Backend, leaderboards: "Leaderboards", outbox: "Outbox"):
+        self.db = db
+        self.leaderboards = leaderboards
+        self.outbox = outbox
+        self.pending: Dict[int, int] = {}
+        self.members: Set[Tuple[int, int]] = set()
+        self.channels: Dict[int, "discord.abc.Messageable"] = {}
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    def add(self, uid: int, amount: int, channel: "discord.abc.Messageable", guild_id: Optional[int] = None):
+        self.pending[uid] = self.pending.get(uid, 0) + amount
+        self.channels[uid] = channel
+        if guild_id:
+            self.members.add((guild_id, uid))
+        if len(self.pending) >= XP_FLUSH_THRESHOLD:
+            self._wake.set()
+
+    async def flush(self):
+        async with self._lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            members, self.members = self.members, set()
+            channels, self.channels = self.channels, {}
+            try:
+                levelled, totals, joined = await self.db.write(flush_xp, batch, members)
+            except Exception:
+                logger.exception("XP flush failed, requeueing %d users", len(batch))
+                for uid, amount in batch.items():
+                    self.pending[uid] = self.pending.get(uid, 0) + amount
+                    self.channels.setdefault(uid, channels[uid])
+                self.members |= members
+                return
+        for uid, (xp, coins) in totals.items():
+            self.leaderboards.update("xp", uid, xp - batch[uid], xp)
+        for guild_id, uid in joined:
+            xp, coins = totals[uid]
+            self.leaderboards.add_member(guild_id, uid, {"xp": xp, "coins": coins})
+        for uid, lvl in levelled:
+            ch = channels.get(uid)
+            if ch:
+                self.outbox.send(ch, f"🎉 <@{uid}> reached level **{lvl}**!")
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=XP_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("XP flusher error")
@@ -0,0 +1,679 @@
+"""Regenerate data/trivia.tsv.
+
+    python data/build_trivia.py
+
+One question per line: ``category<TAB>question<TAB>answer|alias|alias``.
+The first answer is the one shown; every alternative is accepted.
+"""
+import random
+from pathlib import Path
+
+OUT = Path(__file__).with_name("trivia.tsv")
+
+# Most questions come from templates over the tables below. Every country
+# and state fact is its own question, so geography is uncapped; elements
+# (four phrasings of one fact) and arithmetic are capped so they don't
+# crowd out the hand-written questions in CURATED. That puts the bank
+# below the "thousands" first asked for: grow it by adding to CURATED,
+# not by raising the caps.
+TEMPLATE_CAPS = {"science": 360, "math": 60}
+
+# country[/alias...] ; capital[/alias...] ; continent[/alias...]
+COUNTRIES = """
+Afghanistan;Kabul;Asia
+Albania;Tirana;Europe
+Algeria;Algiers;Africa
+Andorra;Andorra la Vella;Europe
+Angola;Luanda;Africa
+Antigua and Barbuda;Saint John's/St Johns/St. John's;North America
+Argentina;Buenos Aires;South America
+Armenia;Yerevan;Asia/Europe
+Australia;Canberra;Oceania/Australia
+Austria;Vienna/Wien;Europe
+Azerbaijan;Baku;Asia/Europe
+Bahamas/The Bahamas;Nassau;North America
+Bahrain;Manama;Asia
+Bangladesh;Dhaka/Dacca;Asia
+Barbados;Bridgetown;North America
+Belarus;Minsk;Europe
+Belgium;Brussels/Bruxelles;Europe
+Belize;Belmopan;North America
+Benin;Porto-Novo/Porto Novo;Africa
+Bhutan;Thimphu;Asia
+Bolivia;Sucre/La Paz;South America
+Bosnia and Herzegovina/Bosnia;Sarajevo;Europe
+Botswana;Gaborone;Africa
+Brazil/Brasil;Brasilia/Brasília;South America
+Brunei;Bandar Seri Begawan;Asia
+Bulgaria;Sofia;Europe
+Burkina Faso;Ouagadougou;Africa
+Burundi;Gitega;Africa
+Cambodia;Phnom Penh;Asia
+Cameroon;Yaounde/Yaoundé;Africa
+Canada;Ottawa;North America
+Cape Verde/Cabo Verde;Praia;Africa
+Central African Republic/CAR;Bangui;Africa
+Chad;N'Djamena/Ndjamena;Africa
+Chile;Santiago;South America
+China/People's Republic of China/PRC;Beijing/Peking;Asia
+Colombia;Bogota/Bogotá;South America
+Comoros;Moroni;Africa
+Democratic Republic of the Congo/DRC/DR Congo;Kinshasa;Africa
+Republic of the Congo/Congo-Brazzaville;Brazzaville;Africa
+Costa Rica;San Jose/San José;North America
+Croatia;Zagreb;Europe
+Cuba;Havana/La Habana;North America
+Cyprus;Nicosia;Europe/Asia
+Czech Republic/Czechia;Prague/Praha;Europe
+Denmark;Copenhagen;Europe
+Djibouti;Djibouti;Africa
+Dominica;Roseau;North America
+Dominican Republic;Santo Domingo;North America
+East Timor/Timor-Leste;Dili;Asia
+Ecuador;Quito;South America
+Egypt;Cairo;Africa/Asia
+El Salvador;San Salvador;North America
+Equatorial Guinea;Malabo;Africa
+Eritrea;Asmara;Africa
+Estonia;Tallinn;Europe
+Eswatini/Swaziland;Mbabane;Africa
+Ethiopia;Addis Ababa;Africa
+Fiji;Suva;Oceania/Australia
+Finland;Helsinki;Europe
+France;Paris;Europe
+Gabon;Libreville;Africa
+Gambia/The Gambia;Banjul;Africa
+Georgia;Tbilisi;Asia/Europe
+Germany/Deutschland;Berlin;Europe
+Ghana;Accra;Africa
+Greece;Athens;Europe
+Grenada;Saint George's/St Georges/St. George's;North America
+Guatemala;Guatemala City;North America
+Guinea;Conakry;Africa
+Guinea-Bissau;Bissau;Africa
+Guyana;Georgetown;South America
+Haiti;Port-au-Prince/Port au Prince;North America
+Honduras;Tegucigalpa;North America
+Hungary;Budapest;Europe
+Iceland;Reykjavik/Reykjavík;Europe
+India;New Delhi/Delhi;Asia
+Indonesia;Jakarta;Asia
+Iran;Tehran/Teheran;Asia
+Iraq;Baghdad;Asia
+Ireland/Eire;Dublin;Europe
+Israel;Jerusalem;Asia
+Italy/Italia;Rome/Roma;Europe
+Ivory Coast/Cote d'Ivoire/Côte d'Ivoire;Yamoussoukro;Africa
+Jamaica;Kingston;North America
+Japan;Tokyo;Asia
+Jordan;Amman;Asia
+Kazakhstan;Astana;Asia/Europe
+Kenya;Nairobi;Africa
+Kiribati;Tarawa/South Tarawa;Oceania/Australia
+Kuwait;Kuwait City;Asia
+Kyrgyzstan;Bishkek;Asia
+Laos;Vientiane;Asia
+Latvia;Riga;Europe
+Lebanon;Beirut;Asia
+Lesotho;Maseru;Africa
+Liberia;Monrovia;Africa
+Libya;Tripoli;Africa
+Liechtenstein;Vaduz;Europe
+Lithuania;Vilnius;Europe
+Luxembourg;Luxembourg/Luxembourg City;Europe
+Madagascar;Antananarivo;Africa
+Malawi;Lilongwe;Africa
+Malaysia;Kuala Lumpur/KL;Asia
+Maldives;Male/Malé;Asia
+Mali;Bamako;Africa
+Malta;Valletta;Europe
+Marshall Islands;Majuro;Oceania/Australia
+Mauritania;Nouakchott;Africa
+Mauritius;Port Louis;Africa
+Mexico/México;Mexico City/Ciudad de Mexico;North America
+Micronesia;Palikir;Oceania/Australia
+Moldova;Chisinau/Chișinău;Europe
+Monaco;Monaco;Europe
+Mongolia;Ulaanbaatar/Ulan Bator;Asia
+Montenegro;Podgorica;Europe
+Morocco;Rabat;Africa
+Mozambique;Maputo;Africa
+Myanmar/Burma;Naypyidaw/Nay Pyi Taw;Asia
+Namibia;Windhoek;Africa
+Nauru;Yaren;Oceania/Australia
+Nepal;Kathmandu;Asia
+Netherlands/Holland/The Netherlands;Amsterdam;Europe
+New Zealand/NZ;Wellington;Oceania/Australia
+Nicaragua;Managua;North America
+Niger;Niamey;Africa
+Nigeria;Abuja;Africa
+North Korea/DPRK;Pyongyang;Asia
+North Macedonia/Macedonia;Skopje;Europe
+Norway;Oslo;Europe
+Oman;Muscat;Asia
+Pakistan;Islamabad;Asia
+Palau;Ngerulmud;Oceania/Australia
+Panama;Panama City;North America
+Papua New Guinea/PNG;Port Moresby;Oceania/Australia
+Paraguay;Asuncion/Asunción;South America
+Peru;Lima;South America
+Philippines;Manila;Asia
+Poland;Warsaw/Warszawa;Europe
+Portugal;Lisbon/Lisboa;Europe
+Qatar;Doha;Asia
+Romania;Bucharest;Europe
+Russia/Russian Federation;Moscow;Europe/Asia
+Rwanda;Kigali;Africa
+Saint Kitts and Nevis/St Kitts and Nevis;Basseterre;North America
+Saint Lucia/St Lucia;Castries;North America
+Saint Vincent and the Grenadines/St Vincent and the Grenadines;Kingstown;North America
+Samoa;Apia;Oceania/Australia
+San Marino;San Marino;Europe
+Sao Tome and Principe/São Tomé and Príncipe;Sao Tome/São Tomé;Africa
+Saudi Arabia;Riyadh;Asia
+Senegal;Dakar;Africa
+Serbia;Belgrade/Beograd;Europe
+Seychelles;Victoria;Africa
+Sierra Leone;Freetown;Africa
+Singapore;Singapore;Asia
+Slovakia;Bratislava;Europe
+Slovenia;Ljubljana;Europe
+Solomon Islands;Honiara;Oceania/Australia
+Somalia;Mogadishu;Africa
+South Africa/RSA;Pretoria/Cape Town/Bloemfontein;Africa
+South Korea/Korea/Republic of Korea;Seoul;Asia
+South Sudan;Juba;Africa
+Spain/España;Madrid;Europe
+Sri Lanka;Sri Jayawardenepura Kotte/Kotte/Colombo;Asia
+Sudan;Khartoum;Africa
+Suriname;Paramaribo;South America
+Sweden;Stockholm;Europe
+Switzerland;Bern/Berne;Europe
+Syria;Damascus;Asia
+Taiwan;Taipei;Asia
+Tajikistan;Dushanbe;Asia
+Tanzania;Dodoma;Africa
+Thailand;Bangkok;Asia
+Togo;Lome/Lomé;Africa
+Tonga;Nuku'alofa/Nukualofa;Oceania/Australia
+Trinidad and Tobago;Port of Spain;North America
+Tunisia;Tunis;Africa
+Turkey/Turkiye/Türkiye;Ankara;Asia/Europe
+Turkmenistan;Ashgabat;Asia
+Tuvalu;Funafuti;Oceania/Australia
+Uganda;Kampala;Africa
+Ukraine;Kyiv/Kiev;Europe
+United Arab Emirates/UAE;Abu Dhabi;Asia
+United Kingdom/UK/Great Britain/Britain;London;Europe
+United States/USA/US/America/United States of America;Washington, D.C./Washington/Washington DC;North America
+Uruguay;Montevideo;South America
+Uzbekistan;Tashkent;Asia
+Vanuatu;Port Vila;Oceania/Australia
+Vatican City/Vatican/Holy See;Vatican City;Europe
+Venezuela;Caracas;South America
+Vietnam/Viet Nam;Hanoi;Asia
+Yemen;Sanaa/Sana'a;Asia
+Zambia;Lusaka;Africa
+Zimbabwe;Harare;Africa
+"""
+
+ELEMENTS = """
+H Hydrogen,He Helium,Li Lithium,Be Beryllium,B Boron,C Carbon,N Nitrogen,O Oxygen,F Fluorine,Ne Neon,
+Na Sodium,Mg Magnesium,Al Aluminium/Aluminum,Si Silicon,P Phosphorus,S Sulfur/Sulphur,Cl Chlorine,Ar Argon,
+K Potassium,Ca Calcium,Sc Scandium,Ti Titanium,V Vanadium,Cr Chromium,Mn Manganese,Fe Iron,Co Cobalt,
+Ni Nickel,Cu Copper,Zn Zinc,Ga Gallium,Ge Germanium,As Arsenic,Se Selenium,Br Bromine,Kr Krypton,
+Rb Rubidium,Sr Strontium,Y Yttrium,Zr Zirconium,Nb Niobium,Mo Molybdenum,Tc Technetium,Ru Ruthenium,
+Rh Rhodium,Pd Palladium,Ag Silver,Cd Cadmium,In Indium,Sn Tin,Sb Antimony,Te Tellurium,I Iodine,Xe Xenon,
+Cs Caesium/Cesium,Ba Barium,La Lanthanum,Ce Cerium,Pr Praseodymium,Nd Neodymium,Pm Promethium,Sm Samarium,
+Eu Europium,Gd Gadolinium,Tb Terbium,Dy Dysprosium,Ho Holmium,Er Erbium,Tm Thulium,Yb Ytterbium,
+Lu Lutetium,Hf Hafnium,Ta Tantalum,W Tungsten,Re Rhenium,Os Osmium,Ir Iridium,Pt Platinum,Au Gold,
+Hg Mercury,Tl Thallium,Pb Lead,Bi Bismuth,Po Polonium,At Astatine,Rn Radon,Fr Francium,Ra Radium,
+Ac Actinium,Th Thorium,Pa Protactinium,U Uranium,Np Neptunium,Pu Plutonium,Am Americium,Cm Curium,
+Bk Berkelium,Cf Californium,Es Einsteinium,Fm Fermium,Md Mendelevium,No Nobelium,Lr Lawrencium,
+Rf Rutherfordium,Db Dubnium,Sg Seaborgium,Bh Bohrium,Hs Hassium,Mt Meitnerium,Ds Darmstadtium,
+Rg Roentgenium,Cn Copernicium,Nh Nihonium,Fl Flerovium,Mc Moscovium,Lv Livermorium,Ts Tennessine,Og Oganesson
+"""
+
+STATES = """
+Alabama;Montgomery,Alaska;Juneau,Arizona;Phoenix,Arkansas;Little Rock,California;Sacramento,
+Colorado;Denver,Connecticut;Hartford,Delaware;Dover,Florida;Tallahassee,Georgia;Atlanta,Hawaii;Honolulu,
+Idaho;Boise,Illinois;Springfield,Indiana;Indianapolis,Iowa;Des Moines,Kansas;Topeka,Kentucky;Frankfort,
+Louisiana;Baton Rouge,Maine;Augusta,Maryland;Annapolis,Massachusetts;Boston,Michigan;Lansing,
+Minnesota;Saint Paul/St Paul,Mississippi;Jackson,Missouri;Jefferson City,Montana;Helena,Nebraska;Lincoln,
+Nevada;Carson City,New Hampshire;Concord,New Jersey;Trenton,New Mexico;Santa Fe,New York;Albany,
+North Carolina;Raleigh,North Dakota;Bismarck,Ohio;Columbus,Oklahoma;Oklahoma City,Oregon;Salem,
+Pennsylvania;Harrisburg,Rhode Island;Providence,South Carolina;Columbia,South Dakota;Pierre,
+Tennessee;Nashville,Texas;Austin,Utah;Salt Lake City,Vermont;Montpelier,Virginia;Richmond,
+Washington;Olympia,West Virginia;Charleston,Wisconsin;Madison,Wyoming;Cheyenne
+"""
+
+# Hand-written questions; always shipped in full.
+CURATED = [
+    ("general", "What is the capital of France?", "Paris"),
+    ("science", "What planet is known as the Red Planet?", "Mars"),
+    ("literature", "Who wrote 'Hamlet'?", "Shakespeare|William Shakespeare"),
+    ("science", "What is water's chemical formula?", "H2O"),
+    ("history", "What year did Titanic sink?", "1912"),
+    ("science", "What is the largest planet in the Solar System?", "Jupiter"),
+    ("science", "What is the closest planet to the Sun?", "Mercury"),
+    ("science", "Which planet has the most famous ring system?", "Saturn"),
+    ("science", "What gas do plants absorb from the air for photosynthesis?", "Carbon dioxide|CO2"),
+    ("science", "What is the hardest natural substance?", "Diamond"),
+    ("science", "How many bones are in the adult human body?", "206"),
+    ("science", "What is the boiling point of water at sea level in Celsius?", "100"),
+    ("science", "What is the freezing point of water in Fahrenheit?", "32"),
+    ("science", "What is the speed of light in a vacuum, in km/s (rounded)?", "300000|299792"),
+    ("geography", "What is the longest river in the world?", "Nile|Amazon"),
+    ("geography", "What is the largest ocean?", "Pacific|Pacific Ocean"),
+    ("geography", "What is the tallest mountain on Earth?", "Mount Everest|Everest"),
+    ("geography", "What is the largest desert in the world?", "Antarctica|Antarctic|Sahara"),
+    ("geography", "How many continents are there?", "7|Seven"),
+    ("history", "In which year did World War II end?", "1945"),
+    ("history", "In which year did humans first land on the Moon?", "1969"),
+    ("history", "Who was the first President of the United States?", "George Washington|Washington"),
+    ("literature", "Who wrote '1984'?", "George Orwell|Orwell"),
+    ("literature", "Who wrote 'Pride and Prejudice'?", "Jane Austen|Austen"),
+    ("art", "Who painted the Mona Lisa?", "Leonardo da Vinci|da Vinci|Leonardo"),
+    ("math", "How many sides does a hexagon have?", "6|Six"),
+    ("math", "How many sides does an octagon have?", "8|Eight"),
+    ("math", "What is the value of pi to two decimal places?", "3.14"),
+    ("math", "How many degrees are in a right angle?", "90"),
+    ("math", "How many degrees are in a full circle?", "360"),
+    ("history", "Who was the first Emperor of Rome?", "Augustus|Octavian|Caesar Augustus"),
+    ("history", "In which year did the Berlin Wall fall?", "1989"),
+    ("history", "In which year did World War I begin?", "1914"),
+    ("history", "Who was the British Prime Minister for most of World War II?", "Winston Churchill|Churchill"),
+    ("history", "Which civilization built Machu Picchu?", "Inca|Incas|Inca Empire"),
+    ("history", "In which year did Christopher Columbus first reach the Americas?", "1492"),
+    ("history", "Who was the first woman to win a Nobel Prize?", "Marie Curie|Curie"),
+    ("history", "Which ship carried the Pilgrims to America in 1620?", "Mayflower"),
+    ("history", "In which country did the Industrial Revolution begin?", "Great Britain|Britain|United Kingdom|England|UK"),
+    ("history", "Which French emperor was defeated at Waterloo?", "Napoleon|Napoleon Bonaparte"),
+    ("history", "In which year did the French Revolution begin?", "1789"),
+    ("history", "Which empire was founded by Genghis Khan?", "Mongol Empire|Mongol|Mongols"),
+    ("history", "Who was the main author of the US Declaration of Independence?", "Thomas Jefferson|Jefferson"),
+    ("history", "In which year was the US Declaration of Independence adopted?", "1776"),
+    ("history", "Who was the first person to walk on the Moon?", "Neil Armstrong|Armstrong"),
+    ("history", "What was the first artificial satellite, launched in 1957?", "Sputnik|Sputnik 1"),
+    ("history", "Which pharaoh's tomb did Howard Carter discover in 1922?", "Tutankhamun|Tutankhamen|King Tut"),
+    ("history", "Who was the 16th President of the United States?", "Abraham Lincoln|Lincoln"),
+    ("history", "In which city was Archduke Franz Ferdinand assassinated in 1914?", "Sarajevo"),
+    ("history", "Who led India's nonviolent independence movement?", "Mahatma Gandhi|Gandhi|Mohandas Gandhi"),
+    ("history", "In which year did the Soviet Union dissolve?", "1991"),
+    ("history", "Who was the first Chancellor of unified Germany in 1871?", "Otto von Bismarck|Bismarck"),
+    ("history", "Which queen ruled the United Kingdom from 1837 to 1901?", "Victoria|Queen Victoria"),
+    ("history", "Which Roman city was buried by the eruption of Mount Vesuvius in 79 AD?", "Pompeii|Herculaneum"),
+    ("history", "Who became South Africa's first president elected in a fully democratic election?", "Nelson Mandela|Mandela"),
+    ("history", "Which charter, sealed in 1215, limited the power of the English king?", "Magna Carta"),
+    ("history", "Which Macedonian king conquered the Persian Empire?", "Alexander the Great|Alexander"),
+    ("history", "Which civilization built the city of Tenochtitlan?", "Aztec|Aztecs|Mexica"),
+    ("history", "Which country gave the Statue of Liberty to the United States?", "France"),
+    ("history", "Who was the first female Prime Minister of the United Kingdom?", "Margaret Thatcher|Thatcher"),
+    ("history", "In which year was the Battle of Hastings fought?", "1066"),
+    ("history", "Who discovered penicillin in 1928?", "Alexander Fleming|Fleming"),
+    ("history", "What was the name of the NASA program that landed astronauts on the Moon?", "Apollo|Apollo program"),
+    ("history", "Who was the first human in space?", "Yuri Gagarin|Gagarin"),
+    ("history", "Which city was divided by a wall from 1961 to 1989?", "Berlin"),
+    ("history", "Who was known as the Maid of Orléans?", "Joan of Arc|Jeanne d'Arc"),
+    ("history", "Which English king had six wives?", "Henry VIII|Henry the Eighth"),
+    ("history", "In which year did the American Civil War end?", "1865"),
+    ("history", "Who was the first President of the Russian Federation?", "Boris Yeltsin|Yeltsin"),
+    ("history", "Which ancient wonder stood in the harbour of Rhodes?", "Colossus of Rhodes|Colossus"),
+    ("literature", "Who wrote 'Romeo and Juliet'?", "Shakespeare|William Shakespeare"),
+    ("literature", "Who wrote 'War and Peace'?", "Leo Tolstoy|Tolstoy"),
+    ("literature", "Who wrote 'Don Quixote'?", "Miguel de Cervantes|Cervantes"),
+    ("literature", "Which Greek poet is credited with the 'Odyssey'?", "Homer"),
+    ("literature", "Who wrote 'Moby-Dick'?", "Herman Melville|Melville"),
+    ("literature", "Who wrote 'The Great Gatsby'?", "F. Scott Fitzgerald|Scott Fitzgerald|Fitzgerald"),
+    ("literature", "Who wrote 'To Kill a Mockingbird'?", "Harper Lee"),
+    ("literature", "Who wrote 'Frankenstein'?", "Mary Shelley|Mary Wollstonecraft Shelley"),
+    ("literature", "Who wrote 'Crime and Punishment'?", "Fyodor Dostoevsky|Dostoevsky|Dostoyevsky"),
+    ("literature", "Who wrote 'One Hundred Years of Solitude'?", "Gabriel García Márquez|Garcia Marquez|Marquez"),
+    ("literature", "Who wrote 'The Hobbit'?", "J. R. R. Tolkien|Tolkien"),
+    ("literature", "Who wrote the Harry Potter books?", "J. K. Rowling|Rowling"),
+    ("literature", "Who wrote 'Brave New World'?", "Aldous Huxley|Huxley"),
+    ("literature", "Who wrote 'Animal Farm'?", "George Orwell|Orwell"),
+    ("literature", "Who wrote 'Jane Eyre'?", "Charlotte Brontë|Charlotte Bronte"),
+    ("literature", "Who wrote 'Wuthering Heights'?", "Emily Brontë|Emily Bronte"),
+    ("literature", "Who wrote 'The Divine Comedy'?", "Dante|Dante Alighieri"),
+    ("literature", "Who wrote 'Les Misérables'?", "Victor Hugo|Hugo"),
+    ("literature", "Who wrote 'The Adventures of Tom Sawyer'?", "Mark Twain|Twain|Samuel Clemens"),
+    ("literature", "Who wrote 'A Tale of Two Cities'?", "Charles Dickens|Dickens"),
+    ("literature", "Who wrote 'Oliver Twist'?", "Charles Dickens|Dickens"),
+    ("literature", "Who created the detective Sherlock Holmes?", "Arthur Conan Doyle|Conan Doyle|Doyle"),
+    ("literature", "Who wrote 'The Old Man and the Sea'?", "Ernest Hemingway|Hemingway"),
+    ("literature", "Who wrote 'Dracula'?", "Bram Stoker|Stoker"),
+    ("literature", "Who wrote 'The Catcher in the Rye'?", "J. D. Salinger|Salinger"),
+    ("literature", "Who wrote 'Alice's Adventures in Wonderland'?", "Lewis Carroll|Carroll"),
+    ("literature", "Who wrote 'The Metamorphosis'?", "Franz Kafka|Kafka"),
+    ("literature", "Who wrote 'Madame Bovary'?", "Gustave Flaubert|Flaubert"),
+    ("literature", "Which hobbit carries the One Ring to Mount Doom?", "Frodo|Frodo Baggins"),
+    ("literature", "Who wrote the poem 'The Raven'?", "Edgar Allan Poe|Poe"),
+    ("literature", "Who wrote 'Of Mice and Men'?", "John Steinbeck|Steinbeck"),
+    ("literature", "Who wrote 'Fahrenheit 451'?", "Ray Bradbury|Bradbury"),
+    ("literature", "Who wrote 'The Little Prince'?", "Antoine de Saint-Exupéry|Saint-Exupery|Saint Exupery"),
+    ("literature", "In 'Moby-Dick', what is the name of the captain hunting the whale?", "Ahab|Captain Ahab"),
+    ("literature", "Who wrote 'The Canterbury Tales'?", "Geoffrey Chaucer|Chaucer"),
+    ("art", "Who painted 'The Starry Night'?", "Vincent van Gogh|van Gogh"),
+    ("art", "Who painted the ceiling of the Sistine Chapel?", "Michelangelo"),
+    ("art", "Who painted 'Guernica'?", "Pablo Picasso|Picasso"),
+    ("art", "Who painted 'The Persistence of Memory'?", "Salvador Dalí|Dali"),
+    ("art", "Who painted 'The Last Supper'?", "Leonardo da Vinci|da Vinci|Leonardo"),
+    ("art", "Who sculpted the statue of David in Florence's Accademia?", "Michelangelo"),
+    ("art", "Who painted 'The Scream'?", "Edvard Munch|Munch"),
+    ("art", "Who painted 'Girl with a Pearl Earring'?", "Johannes Vermeer|Vermeer"),
+    ("art", "Who painted 'The Birth of Venus'?", "Sandro Botticelli|Botticelli"),
+    ("art", "Who painted the 'Water Lilies' series?", "Claude Monet|Monet"),
+    ("art", "In which museum does the Mona Lisa hang?", "Louvre|Musée du Louvre"),
+    ("art", "Which pop artist is famous for his Campbell's Soup Cans?", "Andy Warhol|Warhol"),
+    ("art", "Who sculpted 'The Thinker'?", "Auguste Rodin|Rodin"),
+    ("art", "Which art movement is Claude Monet a founder of?", "Impressionism"),
+    ("art", "Which Dutch painter created 'The Night Watch'?", "Rembrandt|Rembrandt van Rijn"),
+    ("art", "Who painted 'The Kiss' (1907–1908)?", "Gustav Klimt|Klimt"),
+    ("music", "Who composed the 'Moonlight Sonata'?", "Ludwig van Beethoven|Beethoven"),
+    ("music", "Who composed 'The Four Seasons'?", "Antonio Vivaldi|Vivaldi"),
+    ("music", "Who composed the opera 'The Magic Flute'?", "Wolfgang Amadeus Mozart|Mozart"),
+    ("music", "How many keys does a standard piano have?", "88"),
+    ("music", "How many strings does a standard guitar have?", "6|Six"),
+    ("music", "Which band released the album 'Abbey Road'?", "The Beatles|Beatles"),
+    ("music", "Who is known as the 'King of Pop'?", "Michael Jackson"),
+    ("music", "Who is known as the 'King of Rock and Roll'?", "Elvis Presley|Elvis"),
+    ("music", "Who composed the ballet 'Swan Lake'?", "Pyotr Ilyich Tchaikovsky|Tchaikovsky"),
+    ("music", "Freddie Mercury was the lead singer of which band?", "Queen"),
+    ("music", "What is the highest standard female singing voice?", "Soprano"),
+    ("music", "How many lines are on a standard musical staff?", "5|Five"),
+    ("music", "Which orchestral instrument usually has 47 strings and seven pedals?", "Harp|Concert harp|Pedal harp"),
+    ("music", "Which country is the band ABBA from?", "Sweden"),
+    ("music", "Who composed the opera 'Carmen'?", "Georges Bizet|Bizet"),
+    ("music", "Who composed 'The Nutcracker'?", "Pyotr Ilyich Tchaikovsky|Tchaikovsky"),
+    ("music", "Which Italian term marks music to be played very loudly?", "Fortissimo"),
+    ("music", "Which jazz trumpeter was nicknamed 'Satchmo'?", "Louis Armstrong|Armstrong"),
+    ("music", "Which instrument did Jimi Hendrix famously play?", "Guitar|Electric guitar"),
+    ("music", "Who composed the 'Brandenburg Concertos'?", "Johann Sebastian Bach|Bach"),
+    ("film", "Who directed 'Jurassic Park' (1993)?", "Steven Spielberg|Spielberg"),
+    ("film", "Which film won the first Academy Award for Best Picture?", "Wings"),
+    ("film", "In 'The Wizard of Oz', what is the name of Dorothy's dog?", "Toto"),
+    ("film", "Who directed 'Psycho' (1960)?", "Alfred Hitchcock|Hitchcock"),
+    ("film", "What is the fictional African nation in 'Black Panther'?", "Wakanda"),
+    ("film", "Who played Jack Dawson in 'Titanic' (1997)?", "Leonardo DiCaprio|DiCaprio"),
+    ("film", "What is the name of the cowboy doll in 'Toy Story'?", "Woody|Sheriff Woody"),
+    ("film", "In 'Star Wars', who is Luke Skywalker's father?", "Darth Vader|Anakin Skywalker|Anakin|Vader"),
+    ("film", "Which Japanese studio made 'Spirited Away'?", "Studio Ghibli|Ghibli"),
+    ("film", "Who directed 'Spirited Away'?", "Hayao Miyazaki|Miyazaki"),
+    ("film", "What is the name of the lion cub in 'The Lion King'?", "Simba"),
+    ("film", "Which film has the line 'Here's looking at you, kid'?", "Casablanca"),
+    ("film", "Who co-created Mickey Mouse with Ub Iwerks?", "Walt Disney|Disney"),
+    ("film", "In which fictional city does Batman fight crime?", "Gotham|Gotham City"),
+    ("film", "What is Superman's home planet?", "Krypton"),
+    ("sports", "How many players does a soccer team have on the field?", "11|Eleven"),
+    ("sports", "How many players does a basketball team have on the court?", "5|Five"),
+    ("sports", "In which sport is the Stanley Cup awarded?", "Ice hockey|Hockey"),
+    ("sports", "Which country hosted the first modern Olympic Games in 1896?", "Greece"),
+    ("sports", "In tennis, what is a score of zero called?", "Love"),
+    ("sports", "How many holes are in a standard round of golf?", "18|Eighteen"),
+    ("sports", "Which sport uses the terms 'strike' and 'spare'?", "Bowling|Ten-pin bowling"),
+    ("sports", "In which sport would you perform a slam dunk?", "Basketball"),
+    ("sports", "How many rings are on the Olympic flag?", "5|Five"),
+    ("sports", "Which country has won the most FIFA World Cups?", "Brazil"),
+    ("sports", "Which city hosted the 2012 Summer Olympics?", "London"),
+    ("sports", "How long is a marathon in kilometres?", "42.195|42.2|42"),
+    ("sports", "In which sport is the Ryder Cup contested?", "Golf"),
+    ("sports", "How many points is a touchdown worth in American football?", "6|Six"),
+    ("sports", "In chess, which piece moves only diagonally?", "Bishop"),
+    ("sports", "How many squares are on a chessboard?", "64"),
+    ("sports", "Which Grand Slam tennis tournament is played on grass in London?", "Wimbledon"),
+    ("sports", "In cricket, how many legal balls make up an over?", "6|Six"),
+    ("sports", "Who set the men's 100 metres world record of 9.58 seconds?", "Usain Bolt|Bolt"),
+    ("sports", "In which country did judo originate?", "Japan"),
+    ("sports", "Which sport is the Tour de France?", "Cycling|Road cycling"),
+    ("sports", "How many players does a volleyball team have on the court?", "6|Six"),
+    ("sports", "How many minutes long is a standard soccer match, excluding stoppage time?", "90|Ninety"),
+    ("sports", "In which sport do players compete for the Webb Ellis Cup?", "Rugby|Rugby union"),
+    ("sports", "What is the highest possible break in snooker with no free balls?", "147"),
+    ("food", "What is the main ingredient of guacamole?", "Avocado|Avocados"),
+    ("food", "Which country does paella come from?", "Spain"),
+    ("food", "What rice-shaped pasta is often used in soups?", "Orzo"),
+    ("food", "What is the main ingredient of hummus?", "Chickpeas|Chickpea|Garbanzo beans"),
+    ("food", "Sushi comes from the cuisine of which country?", "Japan"),
+    ("food", "Which nut is the base of marzipan?", "Almond|Almonds"),
+    ("food", "What is tofu made from?", "Soybeans|Soybean|Soy|Soya"),
+    ("food", "Which spice comes from the stigmas of a crocus flower?", "Saffron"),
+    ("food", "Which fruit is fermented to make wine?", "Grapes|Grape"),
+    ("food", "What kind of rice is traditionally used in risotto?", "Arborio|Arborio rice|Carnaroli"),
+    ("food", "Pho is a noodle soup from which country?", "Vietnam"),
+    ("food", "Kimchi is a staple of which country's cuisine?", "Korea|South Korea"),
+    ("food", "Feta cheese traditionally comes from which country?", "Greece"),
+    ("food", "Which Italian dessert is made with coffee-soaked ladyfingers?", "Tiramisu"),
+    ("food", "What is the main ingredient of the Middle Eastern dish tabbouleh?", "Parsley|Bulgur"),
+    ("food", "Which vegetable is the main ingredient of borscht?", "Beetroot|Beet|Beets"),
+    ("food", "Which country is the home of the pretzel-shaped Brezel and Oktoberfest?", "Germany"),
+    ("language", "Which language has the most native speakers in the world?", "Mandarin|Mandarin Chinese|Chinese"),
+    ("language", "How many letters are in the English alphabet?", "26"),
+    ("language", "Which language is most widely spoken in South America?", "Spanish"),
+    ("language", "What is the official language of Brazil?", "Portuguese"),
+    ("language", "What does the Spanish word 'gracias' mean?", "Thank you|Thanks"),
+    ("language", "Which alphabet is used to write Russian?", "Cyrillic"),
+    ("language", "What is the plural of 'mouse'?", "Mice"),
+    ("language", "Which script did ancient Egyptians use on monuments?", "Hieroglyphs|Hieroglyphics|Hieroglyphic"),
+    ("language", "What is the official language of Iran?", "Persian|Farsi"),
+    ("language", "What does the French word 'bonjour' mean?", "Hello|Good day|Good morning"),
+    ("language", "What is a word that reads the same backwards as forwards called?", "Palindrome"),
+    ("nature", "What is the largest mammal?", "Blue whale"),
+    ("nature", "What is the fastest land animal?", "Cheetah"),
+    ("nature", "How many legs does a spider have?", "8|Eight"),
+    ("nature", "How many legs does an insect have?", "6|Six"),
+    ("nature", "What is a baby kangaroo called?", "Joey"),
+    ("nature", "What is the largest living bird?", "Ostrich|Common ostrich"),
+    ("nature", "Which animal is called the 'ship of the desert'?", "Camel"),
+    ("nature", "What do bees collect from flowers to make honey?", "Nectar"),
+    ("nature", "What is the tallest living animal?", "Giraffe"),
+    ("nature", "What is a group of lions called?", "Pride"),
+    ("nature", "What is a group of crows called?", "Murder"),
+    ("nature", "What is the only mammal capable of true flight?", "Bat"),
+    ("nature", "How many hearts does an octopus have?", "3|Three"),
+    ("nature", "What does a caterpillar turn into?", "Butterfly|Moth|Butterflies|Moths"),
+    ("nature", "What is the largest species of fish?", "Whale shark"),
+    ("nature", "What is the largest living reptile?", "Saltwater crocodile|Crocodile"),
+    ("nature", "Which bird is a traditional symbol of peace?", "Dove"),
+    ("nature", "What is the study of plants called?", "Botany"),
+    ("nature", "What pigment makes plants green?", "Chlorophyll"),
+    ("nature", "Which land mammal has the longest pregnancy?", "Elephant|African elephant"),
+    ("nature", "What is the only continent with no native ants?", "Antarctica"),
+    ("nature", "Which tree produces acorns?", "Oak"),
+    ("nature", "What do pandas mainly eat?", "Bamboo"),
+    ("nature", "How many arms does a starfish usually have?", "5|Five"),
+    ("nature", "Which big cat is the largest?", "Tiger"),
+    ("science", "Which organ pumps blood around the body?", "Heart"),
+    ("science", "What is the largest organ of the human body?", "Skin"),
+    ("science", "Which organelle is called the powerhouse of the cell?", "Mitochondria|Mitochondrion"),
+    ("science", "How many chambers does the human heart have?", "4|Four"),
+    ("science", "What is the largest internal organ of the human body?", "Liver"),
+    ("science", "Which blood type is the universal donor for red cells?", "O negative|O-|O neg"),
+    ("science", "How many teeth does an adult human usually have, including wisdom teeth?", "32"),
+    ("science", "What is the smallest bone in the human body?", "Stapes|Stirrup"),
+    ("science", "Which vitamin does the skin make in sunlight?", "Vitamin D|D"),
+    ("science", "What is the chemical formula for table salt?", "NaCl"),
+    ("science", "What is the most abundant gas in Earth's atmosphere?", "Nitrogen|N2"),
+    ("science", "What is the SI unit of force?", "Newton|N"),
+    ("science", "What is the SI unit of electrical resistance?", "Ohm"),
+    ("science", "What is the SI unit of energy?", "Joule|J"),
+    ("science", "Who developed the general theory of relativity?", "Albert Einstein|Einstein"),
+    ("science", "Who formulated the laws of motion and universal gravitation?", "Isaac Newton|Newton"),
+    ("science", "What is the centre of an atom called?", "Nucleus"),
+    ("science", "Which subatomic particle has a negative charge?", "Electron"),
+    ("science", "What is the pH of pure water at 25 °C?", "7|Seven"),
+    ("science", "What is absolute zero in degrees Celsius?", "-273.15|−273.15|-273"),
+    ("science", "What does DNA stand for?", "Deoxyribonucleic acid"),
+    ("science", "Which planet is closest in size to Earth?", "Venus"),
+    ("science", "What is the name of our galaxy?", "Milky Way|The Milky Way"),
+    ("science", "How many planets are in the Solar System?", "8|Eight"),
+    ("science", "Which planet has the shortest day?", "Jupiter"),
+    ("science", "What is the hottest planet in the Solar System?", "Venus"),
+    ("science", "Which object was reclassified as a dwarf planet in 2006?", "Pluto"),
+    ("science", "What is the largest moon of Saturn?", "Titan"),
+    ("science", "Which astronomer published the Sun-centred model of the Solar System in 1543?", "Nicolaus Copernicus|Copernicus"),
+    ("science", "Roughly how fast does sound travel in air at 20 °C, in metres per second?", "343|340"),
+    ("science", "What is the boiling point of water at sea level in Fahrenheit?", "212"),
+    ("science", "Which metal is liquid at room temperature?", "Mercury"),
+    ("science", "What is the most common element in the universe?", "Hydrogen"),
+    ("science", "Which instrument measures air pressure?", "Barometer"),
+    ("science", "What is the SI unit of frequency?", "Hertz|Hz"),
+    ("science", "What is a substance that speeds up a reaction without being used up called?", "Catalyst"),
+    ("science", "What is the closest star to Earth?", "Sun|The Sun"),
+    ("science", "What is the largest planet's most famous storm called?", "Great Red Spot|Red Spot"),
+    ("science", "What is the chemical formula for carbon dioxide?", "CO2"),
+    ("science", "Which scientist is known for the theory of evolution by natural selection?", "Charles Darwin|Darwin"),
+    ("technology", "What does CPU stand for?", "Central processing unit"),
+    ("technology", "What does HTML stand for?", "HyperText Markup Language"),
+    ("technology", "Who co-founded Microsoft with Paul Allen?", "Bill Gates|Gates"),
+    ("technology", "Who invented the World Wide Web?", "Tim Berners-Lee|Berners-Lee"),
+    ("technology", "What does URL stand for?", "Uniform Resource Locator"),
+    ("technology", "How many bits are in a byte?", "8|Eight"),
+    ("technology", "In which year was the first iPhone released?", "2007"),
+    ("technology", "Which company bought Android Inc. in 2005?", "Google"),
+    ("technology", "Who was granted the first US patent for the telephone in 1876?", "Alexander Graham Bell|Graham Bell|Bell"),
+    ("technology", "Who invented the phonograph?", "Thomas Edison|Edison"),
+    ("technology", "Which programming language is named after a British comedy group?", "Python"),
+    ("technology", "What does RAM stand for?", "Random-access memory|Random access memory"),
+    ("technology", "What is 5 written in binary?", "101"),
+    ("technology", "What does GPS stand for?", "Global Positioning System"),
+    ("technology", "Which company makes the PlayStation?", "Sony"),
+    ("technology", "Who co-founded Apple with Steve Wozniak and Ronald Wayne?", "Steve Jobs|Jobs"),
+    ("technology", "What does USB stand for?", "Universal Serial Bus"),
+    ("geography", "What is the smallest country in the world?", "Vatican City|Vatican|Holy See"),
+    ("geography", "What is the largest country by area?", "Russia"),
+    ("geography", "Which river flows through Paris?", "Seine"),
+    ("geography", "Which river flows through London?", "Thames|River Thames"),
+    ("geography", "What is the largest lake in Africa?", "Lake Victoria|Victoria"),
+    ("geography", "What is the largest island in the world?", "Greenland"),
+    ("geography", "What is the deepest part of the world's oceans?", "Mariana Trench|Challenger Deep|Marianas Trench"),
+    ("geography", "Which mountain range is the traditional boundary between Europe and Asia?", "Ural Mountains|Urals|Ural"),
+    ("geography", "Off the coast of which country is the Great Barrier Reef?", "Australia"),
+    ("geography", "Which desert covers most of North Africa?", "Sahara|Sahara Desert"),
+    ("geography", "In which country is the Taj Mahal?", "India"),
+    ("geography", "In which city is the Colosseum?", "Rome"),
+    ("geography", "In which city is the Eiffel Tower?", "Paris"),
+    ("geography", "What is the longest continental mountain range in the world?", "Andes"),
+    ("geography", "Which strait separates Spain from Morocco?", "Strait of Gibraltar|Gibraltar"),
+    ("geography", "Which canal links the Mediterranean Sea and the Red Sea?", "Suez Canal|Suez"),
+    ("geography", "Which canal links the Atlantic and Pacific oceans through Central America?", "Panama Canal|Panama"),
+    ("geography", "Which US state is made up entirely of islands?", "Hawaii"),
+    ("geography", "Which African country has the largest population?", "Nigeria"),
+    ("geography", "What is the largest country in South America?", "Brazil"),
+    ("geography", "On which river is the Hoover Dam?", "Colorado|Colorado River"),
+    ("geography", "What is the highest uninterrupted waterfall in the world?", "Angel Falls|Salto Angel"),
+    ("geography", "Which country has three capital cities?", "South Africa"),
+    ("geography", "Which city is nicknamed 'the Big Apple'?", "New York|New York City|NYC"),
+    ("geography", "Which is the longest river in Europe?", "Volga"),
+    ("geography", "Which ocean lies between Africa and Australia?", "Indian Ocean|Indian"),
+    ("geography", "In which country are the ancient pyramids of Giza?", "Egypt"),
+    ("mythology", "Who is the king of the gods in Greek mythology?", "Zeus"),
+    ("mythology", "Who is the Norse god of thunder?", "Thor"),
+    ("mythology", "What is the Roman name for the Greek god Ares?", "Mars"),
+    ("mythology", "Who is the Greek goddess of wisdom?", "Athena|Athene"),
+    ("mythology", "Which Greek hero performed twelve labours?", "Heracles|Hercules"),
+    ("mythology", "Which Gorgon had snakes for hair?", "Medusa"),
+    ("mythology", "Who is the Roman god of the sea?", "Neptune"),
+    ("mythology", "Which jackal-headed Egyptian god is linked with the dead?", "Anubis"),
+    ("mythology", "What is the world tree of Norse mythology called?", "Yggdrasil"),
+    ("mythology", "Who opened a jar that released evils into the world?", "Pandora"),
+    ("mythology", "Who is the Greek god of the underworld?", "Hades"),
+    ("mythology", "Which winged horse sprang from Medusa's neck?", "Pegasus"),
+    ("math", "What is the only even prime number?", "2|Two"),
+    ("math", "How many degrees do the angles of a triangle add up to?", "180"),
+    ("math", "What is 15% of 200?", "30"),
+    ("math", "How many sides does a pentagon have?", "5|Five"),
+    ("math", "What number is L in Roman numerals?", "50|Fifty"),
+    ("math", "What number is M in Roman numerals?", "1000|One thousand"),
+    ("math", "How many zeros are in one million?", "6|Six"),
+    ("math", "What is a polygon with 12 sides called?", "Dodecagon"),
+    ("math", "How many minutes are in a day?", "1440"),
+    ("math", "How many seconds are in an hour?", "3600"),
+    ("math", "What is the next number in the Fibonacci sequence 1, 1, 2, 3, 5, 8, ...?", "13"),
+    ("math", "How many edges does a cube have?", "12|Twelve"),
+    ("general", "How many days are in a leap year?", "366"),
+    ("general", "How many hours are in a week?", "168"),
+    ("general", "What colour do you get by mixing blue and yellow paint?", "Green"),
+    ("general", "How many colours are traditionally listed in a rainbow?", "7|Seven"),
+    ("general", "Which month has the fewest days?", "February"),
+    ("general", "What is a 100th anniversary called?", "Centenary|Centennial"),
+    ("general", "What is the currency of Japan?", "Yen|Japanese yen"),
+    ("general", "What is the currency of the United Kingdom?", "Pound sterling|Pound|Pounds|GBP"),
+    ("general", "What is the currency of India?", "Rupee|Indian rupee"),
+    ("general", "What is the currency of Switzerland?", "Swiss franc|Franc"),
+    ("general", "How many years are in a millennium?", "1000|One thousand"),
+    ("general", "What is the opposite of 'north' on a compass?", "South"),
+]
+
+def alts(field: str):
+    return [a.strip() for a in field.split("/") if a.strip()]
+
+def ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+def templated():
+    for line in COUNTRIES.strip().splitlines():
+        country, capital, continent = (alts(f) for f in line.split(";"))
+        yield "geography", f"What is the capital of {country[0]}?", "|".join(capital)
+        if capital[0] != country[0]:
+            yield "geography", f"{capital[0]} is the capital of which country?", "|".join(country)
+        yield "geography", f"On which continent is {country[0]}?", "|".join(continent)
+    elements = [e.split(" ", 1) for e in ELEMENTS.replace("\n", "").split(",")]
+    for number, (symbol, names) in enumerate(elements, 1):
+        names = alts(names)
+        yield "science", f"Which element has the chemical symbol {symbol}?", "|".join(names)
+        yield "science", f"What is the chemical symbol for {names[0]}?", symbol
+        yield "science", f"Which element has atomic number {number}?", "|".join(names)
+        yield "science", f"What is the atomic number of {names[0]}?", str(number)
+    for entry in STATES.replace("\n", "").split(","):
+        state, capital = entry.split(";")
+        yield "geography", f"What is the capital of the US state of {state}?", "|".join(alts(capital))
+    for a in range(3, 13):
+        for b in range(a, 13):
+            yield "math", f"What is {a} × {b}?", str(a * b)
+    for n in range(11, 21):
+        yield "math", f"What is {n} squared?", str(n * n)
+        yield "math", f"What is the square root of {n * n}?", str(n)
+    for n in range(2, 11):
+        yield "math", f"What is {n} cubed?", str(n ** 3)
+    for n in range(1, 17):
+        yield "math", f"What is 2 to the power of {n}?", str(2 ** n)
+    for n in range(1, 26):
+        yield "math", f"What is the {ordinal(n)} prime number?", str(nth_prime(n))
+
+def capped(rows):
+    """Keep at most TEMPLATE_CAPS[category] templated rows per category, in order."""
+    rng = random.Random(2024)
+    by_category = {}
+    for row in rows:
+        by_category.setdefault(row[0], []).append(row)
+    keep = set()
+    for category, group in by_category.items():
+        cap = TEMPLATE_CAPS.get(category, len(group))
+        keep.update(id(row) for row in rng.sample(group, min(cap, len(group))))
+    return [row for row in rows if id(row) in keep]
+
+def nth_prime(n: int) -> int:
+    count, candidate = 0, 1
+    while count < n:
+        candidate += 1
+        if all(candidate % p for p in range(2, int(candidate ** 0.5) + 1)):
+            count += 1
+    return candidate
+
+def main():
+    seen = set()
+    curated, generated = [], []
+    for rows, source in ((curated, CURATED), (generated, templated())):
+        for category, question, answers in source:
+            if question not in seen:
+                seen.add(question)
+                rows.append((category, question, answers))
+    generated = capped(generated)
+    OUT.write_text("".join(f"{c}\t{q}\t{a}\n" for c, q, a in curated + generated), encoding="utf-8")
+    print(f"wrote {len(curated) + len(generated)} questions to {OUT} "
+          f"({len(curated)} curated, {len(generated)} templated)")
+
+if __name__ == "__main__":
+    main()